@@ -0,0 +1,110 @@
+import argparse, csv, math, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.browser_pool import BrowserPool
+from src.memory import current_rss_mb
+
+
+class RssSampler:
+    """背景每 interval 秒取樣一次 Python 程序 + 所有瀏覽器程序樹的 RSS，保留峰值與平均。"""
+
+    def __init__(self, pool: BrowserPool, interval: float = 1.0):
+        self.pool = pool
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            st = self.pool.stats(refresh_rss=True)
+            self.samples.append(((current_rss_mb() or 0.0) + (st["browsers_rss_mb"] or 0.0), st["open_pages"]))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(urls, tabs: int, args) -> dict:
+    per_browser = args.contexts_per_browser * args.pages_per_context
+    browsers = args.browsers or max(1, math.ceil(tabs / per_browser))
+    pool = BrowserPool(
+        max_browsers=browsers,
+        contexts_per_browser=args.contexts_per_browser,
+        pages_per_context=args.pages_per_context,
+        recycle_rss_mb=args.recycle_rss_mb,
+        max_waiting=10_000,
+        queue_timeout=600,
+    )
+    n = args.pages or max(len(urls), tabs * 4)
+    batch = list(islice(cycle(urls), n))
+    try:
+        pool.fetch(urls[0], storage_state=args.storage_state)  # 暖機：啟動瀏覽器與 context
+        ok = 0
+        with RssSampler(pool, args.sample_interval) as sampler:
+            t0 = time.time()
+            with ThreadPoolExecutor(max_workers=tabs) as ex:
+                for html, _ in ex.map(lambda u: pool.fetch(u, storage_state=args.storage_state, timeout=args.timeout), batch):
+                    ok += bool(html)
+            elapsed = time.time() - t0
+        st = pool.stats(refresh_rss=True)
+    finally:
+        pool.close()
+    rss = [s[0] for s in sampler.samples] or [0.0]
+    return {
+        "open_tabs": tabs,
+        "browsers": browsers,
+        "pages": n,
+        "ok": ok,
+        "seconds": round(elapsed, 1),
+        "pages_per_s": round(n / elapsed, 2),
+        "peak_rss_mb": round(max(rss), 1),
+        "avg_rss_mb": round(sum(rss) / len(rss), 1),
+        "rss_per_tab_mb": round(max(rss) / tabs, 1),
+        "recycled": st["recycled"],
+        "queued": st["queued"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BrowserPool：不同同時分頁數下的 pages/s 與 RSS（主機容量規劃用）")
+    ap.add_argument("--urls", required=True, help="每行一個 URL，不足時循環使用")
+    ap.add_argument("--tabs", default="1,2,4,8,16,32", help="要量測的同時分頁數（逗號分隔）")
+    ap.add_argument("--pages", type=int, default=0, help="每一級抓取的頁數（預設 max(URL 數, tabs×4)）")
+    ap.add_argument("--browsers", type=int, default=0, help="固定瀏覽器數（預設依 tabs 與每瀏覽器分頁數計算）")
+    ap.add_argument("--contexts-per-browser", type=int, default=4)
+    ap.add_argument("--pages-per-context", type=int, default=4)
+    ap.add_argument("--recycle-rss-mb", type=float, default=0, help="回收門檻（預設 0 = 量測期間不回收）")
+    ap.add_argument("--storage-state", default=None)
+    ap.add_argument("--timeout", type=int, default=15)
+    ap.add_argument("--sample-interval", type=float, default=1.0)
+    ap.add_argument("--out", help="結果 CSV")
+    args = ap.parse_args()
+
+    urls = [u.strip() for u in Path(args.urls).read_text().splitlines() if u.strip()]
+    rows = []
+    print("open_tabs,browsers,pages,ok,seconds,pages_per_s,peak_rss_mb,avg_rss_mb,rss_per_tab_mb,recycled,queued")
+    for tabs in [int(t) for t in args.tabs.split(",") if t.strip()]:
+        r = run_level(urls, tabs, args)
+        print(",".join(str(v) for v in r.values()), flush=True)
+        rows.append(r)
+
+    if args.out and rows:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse, csv, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from playwright.sync_api import sync_playwright
+
+from src import inspect as I
+from src.page_extract import extract_in_page, render_compact_html, payload_size
+from src.play_fetcher import _load_page
+
+EXTRACTORS = {
+    "owner_slug_role": I._extract_owner_slug_from_role_link,
+    "owner_slug": I._extract_owner_slug_from_html,
+    "owner_anchor": I._extract_owner_from_anchors,
+    "page_slug_label": I._extract_page_slug_by_label,
+    "owner_id": I._extract_owner_id_from_html,
+    "owner_name": I._extract_owner_display_name,
+    "followers": I._extract_followers_from_html,
+}
+
+
+def run_extractors(html: str) -> dict:
+    return {k: f(html) for k, f in EXTRACTORS.items()}
+
+
+def measure(page, url: str, timeout: int) -> dict:
+    _load_page(page, url, timeout)
+
+    t0 = time.time()
+    html = page.content()
+    t1 = time.time()
+    full = run_extractors(html)
+    t2 = time.time()
+
+    obj = extract_in_page(page)
+    t3 = time.time()
+    compact = render_compact_html(obj)
+    small = run_extractors(compact)
+    t4 = time.time()
+
+    return {
+        "url": url,
+        "content_bytes": len(html.encode("utf-8")),
+        "content_ms": int((t1 - t0) * 1000),
+        "content_regex_ms": int((t2 - t1) * 1000),
+        "evaluate_bytes": payload_size(obj),
+        "evaluate_ms": int((t3 - t2) * 1000),
+        "evaluate_regex_ms": int((t4 - t3) * 1000),
+        "agree": sum(1 for k in EXTRACTORS if full[k] == small[k]),
+        "mismatch": ";".join(f"{k}={full[k]!r}/{small[k]!r}" for k in EXTRACTORS if full[k] != small[k]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="比較 page.content() + Python regex 與 page.evaluate 頁內擷取的傳輸量與耗時")
+    ap.add_argument("--urls", required=True)
+    ap.add_argument("--storage-state")
+    ap.add_argument("--timeout", type=int, default=15)
+    ap.add_argument("--out", help="逐筆結果 CSV")
+    args = ap.parse_args()
+
+    urls = [u.strip() for u in Path(args.urls).read_text().splitlines() if u.strip()]
+    rows = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(**({"storage_state": args.storage_state} if args.storage_state else {}))
+        for url in urls:
+            page = context.new_page()
+            try:
+                r = measure(page, url, args.timeout)
+            except Exception as e:
+                print(f"[skip] {url}: {e}")
+                continue
+            finally:
+                page.close()
+            print(f"{url}: content {r['content_bytes']}B {r['content_ms']}+{r['content_regex_ms']}ms | "
+                  f"evaluate {r['evaluate_bytes']}B {r['evaluate_ms']}+{r['evaluate_regex_ms']}ms | "
+                  f"agree {r['agree']}/{len(EXTRACTORS)}")
+            rows.append(r)
+        context.close()
+        browser.close()
+
+    if args.out and rows:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if rows:
+        n = len(rows)
+        cb = sum(r["content_bytes"] for r in rows) / n
+        eb = sum(r["evaluate_bytes"] for r in rows) / n
+        ct = sum(r["content_ms"] + r["content_regex_ms"] for r in rows) / n
+        et = sum(r["evaluate_ms"] + r["evaluate_regex_ms"] for r in rows) / n
+        print("# Averages")
+        print("mode,bytes,ms")
+        print(f"content,{cb:.0f},{ct:.1f}")
+        print(f"evaluate,{eb:.0f},{et:.1f}")
+        print(f"# extractor agreement: {sum(r['agree'] for r in rows)}/{n * len(EXTRACTORS)}")
+
+
+if __name__ == "__main__":
+    main()
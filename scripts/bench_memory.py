@@ -0,0 +1,76 @@
+import argparse, csv, multiprocessing, sys, time, tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.classifier import classify
+from src.memory import peak_rss_mb, current_rss_mb
+
+
+def measure_one(url: str, budget_mb: int) -> dict:
+    """在全新的子程序內執行一次 inspect_url，回傳 RSS 峰值與 Python heap 峰值。"""
+    from src.inspect import inspect_url
+    base_rss = current_rss_mb() or 0.0
+    tracemalloc.start()
+    t0 = time.time()
+    try:
+        result = inspect_url(url, budget_mb=budget_mb)
+        status = result.get("status")
+    except Exception as e:
+        status = f"exception:{type(e).__name__}"
+    elapsed = int((time.time() - t0) * 1000)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak = peak_rss_mb() or 0.0
+    return {
+        "url": url,
+        "type": classify(url),
+        "status": status,
+        "duration_ms": elapsed,
+        "base_rss_mb": round(base_rss, 1),
+        "peak_rss_mb": round(peak, 1),
+        "delta_rss_mb": round(peak - base_rss, 1),
+        "heap_peak_mb": round(heap_peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="每種 URL 類型的 inspect_url 記憶體峰值")
+    ap.add_argument("--urls", required=True)
+    ap.add_argument("--budget-mb", type=int, default=64)
+    ap.add_argument("--out", help="逐筆結果 CSV")
+    args = ap.parse_args()
+
+    urls = [u.strip() for u in Path(args.urls).read_text().splitlines() if u.strip()]
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for url in urls:
+        # 每個 URL 一個新程序，ru_maxrss 才是該次 inspect 的峰值
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+            r = ex.submit(measure_one, url, args.budget_mb).result()
+        print(f"[{r['type']}] {url} → peak {r['peak_rss_mb']}MB (+{r['delta_rss_mb']}MB), heap {r['heap_peak_mb']}MB, {r['status']}")
+        rows.append(r)
+
+    if args.out and rows:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+    grouped = defaultdict(list)
+    for r in rows:
+        grouped[r["type"]].append(r)
+    print("# Peak memory per URL type")
+    print("type,n,avg_delta_rss_mb,max_delta_rss_mb,avg_heap_peak_mb,max_heap_peak_mb")
+    for t, rs in sorted(grouped.items()):
+        d = [r["delta_rss_mb"] for r in rs]
+        h = [r["heap_peak_mb"] for r in rs]
+        print(f"{t},{len(rs)},{sum(d)/len(d):.1f},{max(d):.1f},{sum(h)/len(h):.1f},{max(h):.1f}")
+
+
+if __name__ == "__main__":
+    main()
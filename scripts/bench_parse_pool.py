@@ -0,0 +1,70 @@
+import argparse, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.parse_pool import ParsePool, PARSERS
+
+
+def synthetic_html(target_bytes: int) -> str:
+    """產生近似 m.facebook 貼文頁的合成 HTML（大量 div / script），大小約 target_bytes。"""
+    head = '<html><head><meta property="og:url" content="https://www.facebook.com/nasa/posts/1"></head><body>'
+    block = (
+        '<div class="x1" aria-label="1,234 個讚"><a role="link" href="/nasa/">NASA</a>'
+        '<span>12.3K followers</span><span>56 次分享</span></div>'
+        '<script>{"feedback":{"reaction_count":{"count":1234},"share_count":{"count":56}}}</script>\n'
+    )
+    body = block * max(1, target_bytes // len(block))
+    return head + body + "</body></html>"
+
+
+def run_threads(html: str, func, n: int, workers: int) -> float:
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(lambda _: func(html), range(n)))
+    return n / (time.time() - t0)
+
+
+def run_processes(html: str, func_name: str, n: int, workers: int) -> float:
+    pool = ParsePool(workers, timeout=120)
+    pool.run(func_name, "<html></html>")  # warm up worker processes
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(lambda _: pool.run(func_name, html), range(n)))
+    rate = n / (time.time() - t0)
+    pool.close()
+    return rate
+
+
+def main():
+    ap = argparse.ArgumentParser(description="parse 吞吐量：threads vs process pool，依核心數")
+    ap.add_argument("--html", help="HTML 檔（預設使用合成頁面）")
+    ap.add_argument("--size-kb", type=int, default=1500)
+    ap.add_argument("--type", default="fb_post", choices=sorted(PARSERS))
+    ap.add_argument("--pages", type=int, default=24)
+    ap.add_argument("--workers", default="", help="逗號分隔，預設 1,2,4,...,CPU 核心數")
+    args = ap.parse_args()
+
+    html = Path(args.html).read_text(encoding="utf-8") if args.html else synthetic_html(args.size_kb * 1024)
+    func = PARSERS[args.type]
+    cpu = os.cpu_count() or 1
+    if args.workers:
+        levels = [int(x) for x in args.workers.split(",") if x.strip()]
+    else:
+        levels, w = [], 1
+        while w < cpu:
+            levels.append(w)
+            w *= 2
+        levels.append(cpu)
+
+    print(f"# parse benchmark: {args.type}, {len(html)/1024:.0f} KB/page, {args.pages} pages, cpu={cpu}")
+    print("workers,threads_pages_per_s,processes_pages_per_s,speedup")
+    for w in levels:
+        t_rate = run_threads(html, func, args.pages, w)
+        p_rate = run_processes(html, func.__name__, args.pages, w)
+        print(f"{w},{t_rate:.2f},{p_rate:.2f},{p_rate / t_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
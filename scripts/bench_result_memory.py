@@ -0,0 +1,93 @@
+import argparse, json, random, sys, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.parser import _blank_basic
+from src.result import InspectResult, TAG_TO_KIND, ZH_FIELDS, format_basic_zh
+
+
+def synthetic_result(i: int, rng: random.Random) -> dict:
+    """依 inspect_url 的 schema 造一筆結果（數值隨機、meta 欄位與實際相同）。"""
+    type_tag = rng.choice(list(ZH_FIELDS))
+    basic = _blank_basic(source_hint=rng.choice(["text", "meta", "json"]))
+    for _, key in ZH_FIELDS[type_tag]:
+        basic[key] = rng.randrange(10_000_000) if rng.random() < 0.8 else None
+    data = {
+        "og:title": f"title {i}",
+        "og:description": None,
+        "og:image": None,
+        "og:url": f"https://m.facebook.com/page{i}",
+        "og:site_name": "Facebook",
+        "basic": basic,
+    }
+    zh = format_basic_zh(type_tag, basic)
+    data["基礎資訊"] = zh
+    data["kind"] = TAG_TO_KIND.get(type_tag, "unknown")
+    return {
+        "status": "ok",
+        "type": type_tag,
+        "data": data,
+        "基礎資訊": zh,
+        "meta": {
+            "duration_ms": rng.randrange(200, 20000),
+            "fetched_with": "requests",
+            "was_rewritten": True,
+            "rewritten_url": f"https://m.facebook.com/page{i}",
+            "resolved_url": None,
+            "final_permalink": None,
+            "stages_ms": {"resolve_link": 0, "fetch": 900, "head_meta": 2, "parse": 40, "owner": 0, "share_resolve": 0},
+            "redirect_hops": [],
+            "share_resolved_by": None,
+            "hedge": None,
+            "variants": None,
+            "network_counters": None,
+            "owner_links": None,
+            "memory_budget_mb": 64,
+        },
+        "error": None,
+    }
+
+
+def measure(n: int, build) -> float:
+    """回傳保存 n 筆結果的 Python heap 用量（bytes）。"""
+    rng = random.Random(0)
+    tracemalloc.start()
+    keep = [build(synthetic_result(i, rng), i) for i in range(n)]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return used
+
+
+def main():
+    ap = argparse.ArgumentParser(description="inspect 結果於記憶體中的大小：dict vs InspectResult（換算每百萬筆）")
+    ap.add_argument("-n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    modes = {
+        "dict": lambda r, i: r,
+        "compact": lambda r, i: InspectResult.from_dict(r, url=f"https://www.facebook.com/page{i}"),
+        "compact_no_meta": lambda r, i: InspectResult.from_dict(r, url=f"https://www.facebook.com/page{i}", keep_meta=False),
+    }
+    print("mode,bytes_per_result,mb_per_million")
+    for name, build in modes.items():
+        used = measure(args.n, build)
+        per = used / args.n
+        print(f"{name},{per:.0f},{per * 1_000_000 / 1024 / 1024:.0f}")
+
+    rng = random.Random(1)
+    rows = [synthetic_result(i, rng) for i in range(min(args.n, 50_000))]
+    compact = [InspectResult.from_dict(r, keep_meta=False) for r in rows]
+    t0 = time.time()
+    for r in rows:
+        json.dumps(r, ensure_ascii=False)
+    t1 = time.time()
+    for c in compact:
+        c.to_json()
+    t2 = time.time()
+    print(f"# serialize {len(rows)}: dict json.dumps {t1 - t0:.2f}s, InspectResult.to_json {t2 - t1:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
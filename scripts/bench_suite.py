@@ -0,0 +1,198 @@
+import argparse, json, os, random, sys, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.classifier import classify
+from src.inspect import inspect_url
+from summarize_results import percentile
+
+PCTS = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+
+def bootstrap_ci(values, p, n_boot=1000, alpha=0.05, seed=0):
+    """百分位數的 bootstrap 信賴區間（預設 95%）。"""
+    if len(values) < 2:
+        v = percentile(values, p)
+        return v, v
+    rng = random.Random(seed)
+    n = len(values)
+    stats = sorted(percentile([values[rng.randrange(n)] for _ in range(n)], p) for _ in range(n_boot))
+    lo = stats[int(n_boot * alpha / 2)]
+    hi = stats[min(n_boot - 1, int(n_boot * (1 - alpha / 2)))]
+    return lo, hi
+
+
+def describe(durations, errors=0):
+    n = len(durations) + errors
+    out = {"n": n, "error_rate": round(errors / n, 4) if n else None}
+    if not durations:
+        return out
+    out["avg_ms"] = round(sum(durations) / len(durations), 1)
+    for name, p in PCTS:
+        lo, hi = bootstrap_ci(durations, p)
+        out[name] = round(percentile(durations, p), 1)
+        out[f"{name}_ci"] = [round(lo, 1), round(hi, 1)]
+    return out
+
+
+def run_one(url: str) -> dict:
+    t0 = time.time()
+    try:
+        r = inspect_url(url)
+    except Exception as e:
+        r = {"status": "error", "error": f"exception: {type(e).__name__}", "meta": {}}
+    meta = r.get("meta") or {}
+    return {
+        "url": url,
+        "type": r.get("type") or classify(url),
+        "status": r.get("status"),
+        "error": r.get("error"),
+        "duration_ms": int((time.time() - t0) * 1000),
+        "stages_ms": meta.get("stages_ms") or {},
+        "fetched_with": meta.get("fetched_with"),
+        "got_title": bool((r.get("data") or {}).get("og:title")),
+    }
+
+
+def run_level(urls, trials, concurrency):
+    jobs = [u for _ in range(trials) for u in urls]
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        runs = list(ex.map(run_one, jobs))
+    wall = time.time() - t0
+    return runs, wall
+
+
+def summarize_level(runs, wall):
+    ok = [r for r in runs if r["status"] == "ok"]
+    n_err = len(runs) - len(ok)
+    summary = {
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(runs) / wall, 3) if wall > 0 else None,
+        "overall": describe([r["duration_ms"] for r in ok], n_err),
+        "by_type": {},
+        "by_stage": {},
+        "errors": {},
+    }
+    by_type = defaultdict(list)
+    for r in runs:
+        by_type[r["type"]].append(r)
+    for t, rs in sorted(by_type.items()):
+        good = [r["duration_ms"] for r in rs if r["status"] == "ok"]
+        summary["by_type"][t] = describe(good, len(rs) - len(good))
+    by_stage = defaultdict(list)
+    for r in ok:
+        for stage, ms in r["stages_ms"].items():
+            by_stage[stage].append(ms)
+    for stage, vals in sorted(by_stage.items()):
+        summary["by_stage"][stage] = describe(vals)
+    err_count = defaultdict(int)
+    for r in runs:
+        if r["status"] != "ok":
+            err_count[r["error"] or "unknown"] += 1
+    summary["errors"] = dict(err_count)
+    return summary
+
+
+def compare(current, baseline, tolerance, err_tolerance):
+    """
+    與 baseline 比較，回傳 regression 說明列表。
+    延遲：p95 超過 baseline*(1+tolerance) 且 CI 下界仍高於 baseline p95 才算（避免雜訊誤報）。
+    錯誤率：增加超過 err_tolerance（絕對值）。
+    """
+    problems = []
+    for level, cur in current["levels"].items():
+        base = (baseline.get("levels") or {}).get(level)
+        if not base:
+            continue
+        groups = [("overall", cur["overall"], base.get("overall") or {})]
+        for t, s in cur["by_type"].items():
+            groups.append((f"type={t}", s, (base.get("by_type") or {}).get(t) or {}))
+        for name, c, b in groups:
+            if c.get("p95") is not None and b.get("p95") is not None:
+                limit = b["p95"] * (1 + tolerance)
+                if c["p95"] > limit and c["p95_ci"][0] > b["p95"]:
+                    problems.append(f"c={level} {name}: p95 {c['p95']}ms > baseline {b['p95']}ms (+{tolerance:.0%})")
+            if c.get("error_rate") is not None and b.get("error_rate") is not None:
+                if c["error_rate"] > b["error_rate"] + err_tolerance:
+                    problems.append(f"c={level} {name}: error_rate {c['error_rate']} > baseline {b['error_rate']}")
+        if cur.get("throughput_rps") and base.get("throughput_rps"):
+            if cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                problems.append(f"c={level}: throughput {cur['throughput_rps']} < baseline {base['throughput_rps']}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="inspect_url 效能測試：warmup、併發層級、類型/階段分解、baseline 回歸檢查")
+    ap.add_argument("--urls", required=True)
+    ap.add_argument("--mode", choices=["anon", "login"], default="anon")
+    ap.add_argument("--storage-state", default="state.json")
+    ap.add_argument("--force-playwright", action="store_true")
+    ap.add_argument("--warmup", type=int, default=1, help="每個 URL 不計入結果的暖身次數")
+    ap.add_argument("--trials", type=int, default=3)
+    ap.add_argument("--concurrency", default="1", help="逗號分隔的併發層級，例如 1,4,8")
+    ap.add_argument("--out", required=True, help="結果 JSON")
+    ap.add_argument("--runs-out", help="逐筆結果 CSV（可再用 summarize_results.py 彙整）")
+    ap.add_argument("--baseline", help="baseline 結果 JSON；有 regression 時 exit 1")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="p95 / throughput 允許退步比例")
+    ap.add_argument("--error-tolerance", type=float, default=0.05, help="錯誤率允許增加量（絕對值）")
+    args = ap.parse_args()
+
+    if args.force_playwright:
+        os.environ["FBIG_FORCE_PLAYWRIGHT"] = "1"
+    if args.mode == "login":
+        os.environ["FBIG_STORAGE_STATE"] = args.storage_state
+    else:
+        os.environ.pop("FBIG_STORAGE_STATE", None)
+
+    urls = [u.strip() for u in Path(args.urls).read_text().splitlines() if u.strip()]
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+
+    for i in range(args.warmup):
+        for url in urls:
+            run_one(url)
+        print(f"[warmup] round {i + 1}/{args.warmup} done")
+
+    result = {"mode": args.mode, "urls": len(urls), "trials": args.trials, "levels": {}}
+    all_runs = []
+    for c in levels:
+        runs, wall = run_level(urls, args.trials, c)
+        s = summarize_level(runs, wall)
+        result["levels"][str(c)] = s
+        for r in runs:
+            r["concurrency"] = c
+        all_runs.extend(runs)
+        o = s["overall"]
+        print(f"[c={c}] n={o['n']} p50={o.get('p50')} p95={o.get('p95')} p99={o.get('p99')} "
+              f"rps={s['throughput_rps']} err={o['error_rate']}")
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✅ 已輸出：{out_path}")
+
+    if args.runs_out and all_runs:
+        import csv
+        fields = ["url", "type", "concurrency", "status", "error", "duration_ms", "fetched_with", "got_title"]
+        with open(args.runs_out, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields + ["mode"], extrasaction="ignore")
+            w.writeheader()
+            for r in all_runs:
+                w.writerow(dict(r, mode=args.mode))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(result, baseline, args.tolerance, args.error_tolerance)
+        if problems:
+            print("❌ performance regression:")
+            for p in problems:
+                print("  -", p)
+            sys.exit(1)
+        print("✅ no regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+依主機自動調整同時檢測數（AIMD）：FB / IG 限流嚴重，固定的 worker 數不是太慢就是很快撞上 login wall。
+
+- 每個主機（canonical_url 的子網域合併：facebook.com / instagram.com / 其他）各有一個 limit。
+- 加法增加：成功且延遲健康（不超過基準延遲 × slow_factor）時每筆 +1/limit，約每一輪 +1；
+  只在 limit 真的被用滿（在途 + 等候 ≥ limit）時才增加，閒置時不會無限上升。
+- 延遲取產生 html 的那一次抓取（meta.fetch_ms），不含解析 / owner 頁等後續階段；
+  基準依抓取路徑（meta.fetched_with：requests / playwright / ...）分開計算，
+  避免瀏覽器備援的正常耗時被當成 requests 變慢。沒有 fetch_ms 時退回整筆耗時。
+- 乘法減少：timeout、fetch_failed、login wall 時 limit × decrease（預設 0.5）。
+  login wall 來自 meta.login_wall（任一次抓取被導向登入頁，即使備援成功）或 dead_reason。
+  同一輪（上次減少前就已開始）的失敗不再重複減少，一波失敗只砍一次。
+- 負面快取 / dead filter 直接回傳的結果沒有實際抓取，不影響 limit。
+
+    FBIG_ADAPTIVE=1                 啟用（batch --adaptive、service --adaptive 會設定）
+    FBIG_ADAPTIVE_INITIAL=4         起始 limit
+    FBIG_ADAPTIVE_MIN=1
+    FBIG_ADAPTIVE_MAX=32
+    FBIG_ADAPTIVE_DECREASE=0.5
+    FBIG_ADAPTIVE_SLOW_FACTOR=2.0   延遲超過基準的倍數時不增加
+    FBIG_ADAPTIVE_TIMEOUT_S=30      成功但整筆超過此秒數視同 timeout
+
+metrics() 回傳各主機目前 limit / 在途 / 等候 / 結果計數 / 延遲，以及最近的調整紀錄。
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .utils import canonical_url
+
+_EXTRA_HOSTS = {"fb.watch": "facebook.com", "fb.me": "facebook.com", "instagr.am": "instagram.com"}
+
+# 會觸發減少的結果
+BACKOFF_OUTCOMES = ("timeout", "fetch_failed", "login_wall")
+
+# 延遲 EWMA 的平滑係數；基準延遲取 EWMA 的最低點，之後每筆往上回升 BASELINE_DRIFT
+EWMA_ALPHA = 0.1
+BASELINE_DRIFT = 0.01
+
+
+def host_key(url: str) -> str:
+    host = urlsplit(canonical_url(url)).hostname or ""
+    return _EXTRA_HOSTS.get(host, host)
+
+
+def outcome_of(result: Optional[Dict[str, Any]], elapsed_s: float, timeout_s: float) -> Optional[str]:
+    """inspect_url 結果 → ok / slow 判斷前的分類：ok、timeout、fetch_failed、login_wall、error；沒有實際抓取時回傳 None。"""
+    result = result or {}
+    meta = result.get("meta") or {}
+    if meta.get("negative_cache") or meta.get("dead_filter"):
+        return None
+    if meta.get("login_wall"):
+        return "login_wall"
+    if result.get("status") != "ok":
+        error = str(result.get("error") or "")
+        if error == "fetch_failed":
+            return "fetch_failed"
+        if "timeout" in error.lower():
+            return "timeout"
+        return "error"
+    if meta.get("dead_reason") == "login_wall":
+        return "login_wall"
+    if elapsed_s >= timeout_s:
+        return "timeout"
+    return "ok"
+
+
+def fetch_latency(result: Optional[Dict[str, Any]], elapsed_s: float):
+    """回傳 (抓取路徑, 秒數)：優先用 meta.fetch_ms / meta.fetched_with，沒有時為 ("total", 整筆耗時)。"""
+    meta = (result or {}).get("meta") or {}
+    if meta.get("fetch_ms") is None:
+        return "total", elapsed_s
+    return meta.get("fetched_with") or "unknown", meta["fetch_ms"] / 1000
+
+
+class LatencyBaseline:
+    """單一抓取路徑的延遲 EWMA 與基準。"""
+
+    __slots__ = ("ewma", "base")
+
+    def __init__(self):
+        self.ewma: Optional[float] = None
+        self.base: Optional[float] = None
+
+    def healthy(self, seconds: float, slow_factor: float) -> bool:
+        return self.base is None or seconds <= self.base * slow_factor
+
+    def observe(self, seconds: float) -> None:
+        if self.ewma is None:
+            self.ewma = seconds
+        else:
+            self.ewma += EWMA_ALPHA * (seconds - self.ewma)
+        if self.base is None or self.ewma < self.base:
+            self.base = self.ewma
+        else:
+            self.base += BASELINE_DRIFT * (self.ewma - self.base)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ewma_ms": int(self.ewma * 1000) if self.ewma is not None else None,
+            "base_ms": int(self.base * 1000) if self.base is not None else None,
+        }
+
+
+class Ticket:
+    __slots__ = ("host", "epoch", "t0")
+
+    def __init__(self, host: str, epoch: int):
+        self.host = host
+        self.epoch = epoch
+        self.t0 = time.time()
+
+
+class HostLimit:
+    """單一主機的 AIMD 狀態；由 AdaptiveLimiter 持鎖操作。"""
+
+    def __init__(self, host: str, initial: float):
+        self.host = host
+        self.limit = initial
+        self.inflight = 0
+        self.waiting = 0
+        self.epoch = 0  # 每次減少 +1
+        self.latency: Dict[str, LatencyBaseline] = {}  # 抓取路徑 → 延遲基準
+        self.outcomes: Counter = Counter()
+        self.increases = 0
+        self.decreases = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "outcomes": dict(self.outcomes),
+            "latency": {path: b.snapshot() for path, b in self.latency.items()},
+        }
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        decrease: float = 0.5,
+        slow_factor: float = 2.0,
+        timeout_s: float = 30.0,
+        history: int = 100,
+    ):
+        self.initial = initial
+        self.min_limit = max(1.0, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.timeout_s = timeout_s
+        self._hosts: Dict[str, HostLimit] = {}
+        self._adjustments: deque = deque(maxlen=history)
+        self._cond = threading.Condition()
+
+    def _host(self, host: str) -> HostLimit:
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = HostLimit(host, min(self.max_limit, max(self.min_limit, self.initial)))
+        return h
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> Optional[Ticket]:
+        """等到該主機在途數低於 limit；timeout 秒內等不到回傳 None。"""
+        with self._cond:
+            h = self._host(host_key(url))
+            h.waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: h.inflight < int(h.limit), timeout=timeout):
+                    h.outcomes["queue_timeout"] += 1
+                    return None
+            finally:
+                h.waiting -= 1
+            h.inflight += 1
+            return Ticket(h.host, h.epoch)
+
+    def release(self, ticket: Ticket, result: Optional[Dict[str, Any]]) -> Optional[str]:
+        """回報結果並調整 limit，回傳分類（ok / slow / timeout / fetch_failed / login_wall / error / None）。"""
+        elapsed = time.time() - ticket.t0
+        outcome = outcome_of(result, elapsed, self.timeout_s)
+        with self._cond:
+            h = self._hosts[ticket.host]
+            saturated = h.inflight + h.waiting >= int(h.limit)
+            h.inflight -= 1
+            old = h.limit
+            if outcome == "ok":
+                path, seconds = fetch_latency(result, elapsed)
+                baseline = h.latency.setdefault(path, LatencyBaseline())
+                healthy = baseline.healthy(seconds, self.slow_factor)
+                baseline.observe(seconds)
+                if not healthy:
+                    outcome = "slow"
+                elif saturated and h.limit < self.max_limit:
+                    h.limit = min(self.max_limit, h.limit + 1.0 / h.limit)
+            elif outcome in BACKOFF_OUTCOMES and ticket.epoch == h.epoch:
+                h.limit = max(self.min_limit, h.limit * self.decrease)
+                h.epoch += 1
+            if outcome is not None:
+                h.outcomes[outcome] += 1
+            if int(h.limit) != int(old):
+                if h.limit > old:
+                    h.increases += 1
+                else:
+                    h.decreases += 1
+                    print(f"[adaptive] {h.host} limit {old:.1f} → {h.limit:.1f} ({outcome})", file=sys.stderr)
+                self._adjustments.append({
+                    "t": round(time.time(), 3), "host": h.host,
+                    "from": int(old), "to": int(h.limit), "reason": outcome,
+                })
+            self._cond.notify_all()
+        return outcome
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "hosts": {name: h.snapshot() for name, h in self._hosts.items()},
+                "adjustments": list(self._adjustments),
+            }
+
+
+_limiter_lock = threading.Lock()
+_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_limiter() -> Optional[AdaptiveLimiter]:
+    """FBIG_ADAPTIVE=1 時回傳本程序共用的 AdaptiveLimiter，否則 None。"""
+    global _limiter
+    if os.getenv("FBIG_ADAPTIVE") != "1":
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter(
+                initial=float(os.getenv("FBIG_ADAPTIVE_INITIAL", "4")),
+                min_limit=float(os.getenv("FBIG_ADAPTIVE_MIN", "1")),
+                max_limit=float(os.getenv("FBIG_ADAPTIVE_MAX", "32")),
+                decrease=float(os.getenv("FBIG_ADAPTIVE_DECREASE", "0.5")),
+                slow_factor=float(os.getenv("FBIG_ADAPTIVE_SLOW_FACTOR", "2.0")),
+                timeout_s=float(os.getenv("FBIG_ADAPTIVE_TIMEOUT_S", "30")),
+            )
+        return _limiter
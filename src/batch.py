@@ -0,0 +1,277 @@
+"""
+批次檢測 CLI：逐行讀入 URL（檔案或 stdin），每完成一筆立即寫出一行 JSONL。
+
+    python -m src.batch experiments/urls_benchmark.txt --out results.jsonl -c 4
+    cat urls.txt | python -m src.batch - --out results.jsonl --deadline 3600
+
+- 記憶體有上限：輸入逐行讀取，同時在途的 URL 最多 concurrency * 2 筆。
+- 可中斷續跑：每筆寫出後記錄到 checkpoint（預設 <out>.done），重跑時略過已完成的 URL。
+  結果先寫、checkpoint 後寫，中途被殺最多重複一筆（at-least-once）。
+- --dead-filter：跨次保存的 Bloom filter，已確認失效（預設 not_found）的網址直接寫出
+  error=known_dead 而不檢測；固定記憶體，誤判率由 --dead-filter-fp 決定。
+- 實體去重（entity.py）：指向同一貼文 / 社團 / IG 貼文的不同連結只檢測一次，結果逐一寫給每個 alias
+  （meta.entity 註明實際檢測的網址）；--no-dedupe 停用。
+- --adaptive：依主機 AIMD 調整同時檢測數（adaptive.py），-c 為起始值、--max-concurrency 為上限；
+  結束時的統計附上各主機最後的 limit 與結果計數。
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+from .adaptive import AdaptiveLimiter, get_limiter
+from .entity import EntityIndex, alias_result
+from .export import open_sink
+from .inspect import inspect_url
+from .negative_cache import BloomFilter
+from .result import build_meta
+from .utils import canonical_url
+
+
+def _key(url: str) -> bytes:
+    # checkpoint 以 16 bytes 摘要保存，百萬筆 URL 也只佔數十 MB
+    return hashlib.sha1(url.encode("utf-8")).digest()[:16]
+
+
+def load_checkpoint(path: str, retry_errors: bool = False) -> Set[bytes]:
+    """讀取 checkpoint（每行：status<TAB>url）；retry_errors 時只略過 status=ok 的 URL。"""
+    done: Set[bytes] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            status, _, url = line.rstrip("\n").partition("\t")
+            if not url:
+                continue
+            if retry_errors and status != "ok":
+                continue
+            done.add(_key(url))
+    return done
+
+
+def iter_urls(src: TextIO) -> Iterator[str]:
+    for line in src:
+        u = line.strip()
+        if u and not u.startswith("#"):
+            yield u
+
+
+def _inspect_safe(url: str, budget_mb: Optional[int], limiter: Optional[AdaptiveLimiter] = None) -> dict:
+    ticket = limiter.acquire(url) if limiter is not None else None
+    t0 = time.time()
+    try:
+        result = inspect_url(url, budget_mb=budget_mb)
+    except Exception as e:
+        result = {
+            "status": "error",
+            "type": None,
+            "data": None,
+            "meta": build_meta(duration_ms=int((time.time() - t0) * 1000)),
+            "error": f"exception: {type(e).__name__}: {e}",
+        }
+    if ticket is not None:
+        limiter.release(ticket, result)
+    return result
+
+
+def run_batch(
+    urls: Iterator[str],
+    out: TextIO,
+    checkpoint: TextIO,
+    done: Set[bytes],
+    concurrency: int = 4,
+    deadline: Optional[float] = None,
+    budget_mb: Optional[int] = None,
+    on_result: Optional[Callable[[str, dict], None]] = None,
+    dead_filter: Optional[BloomFilter] = None,
+    dead_reasons: Sequence[str] = ("not_found",),
+    dedupe: bool = True,
+    entity_cache: int = 1000,
+    limiter: Optional[AdaptiveLimiter] = None,
+) -> dict:
+    """
+    主迴圈：有界在途視窗 + 完成即寫出。回傳統計（written / skipped / ok / error / stopped_by_deadline）。
+    deadline 為總秒數，時間到就不再排入新的 URL，等在途的完成後結束。
+    on_result(url, result) 在每筆寫出後呼叫（例如 export.py 的 sink.write）。
+    dead_filter：命中的 URL 不檢測、直接寫出 error=known_dead；meta.dead_reason 屬於 dead_reasons 的結果加入 filter。
+    dedupe：同一實體在途時新的 alias 等它完成；最近完成的 entity_cache 個實體直接沿用結果。
+    limiter：每筆檢測前依主機排隊（AIMD limit），worker 數放大到 limiter.max_limit 讓 limit 有空間上升。
+    """
+    t_end = time.time() + deadline if deadline else None
+    stats = {"written": 0, "skipped": 0, "ok": 0, "error": 0, "dead_filtered": 0, "deduped": 0, "stopped_by_deadline": False}
+    workers = max(1, concurrency, int(limiter.max_limit) if limiter is not None else 0)
+    window = workers * 2
+    pending: Dict = {}  # future → (url, 實體 ID)
+    index = EntityIndex() if dedupe else None
+    members: Dict[str, List[str]] = {}  # 在途實體 → 等待結果的 alias
+    recent: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()  # 最近完成的實體 → (檢測的 url, 結果)
+
+    def emit(url: str, result: dict) -> None:
+        record = {"url": url}
+        record.update(result)
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        if on_result is not None:
+            on_result(url, result)
+        status = result.get("status") or "error"
+        checkpoint.write(f"{status}\t{url}\n")
+        checkpoint.flush()
+        done.add(_key(url))
+        stats["written"] += 1
+        stats["ok" if status == "ok" else "error"] += 1
+        meta = result.get("meta") or {}
+        if dead_filter is not None and meta.get("dead_reason") in dead_reasons:
+            dead_filter.add(canonical_url(url))
+        print(f"[batch] {status} {url} ({meta.get('duration_ms')}ms)", file=sys.stderr)
+
+    def drain() -> None:
+        finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for fut in finished:
+            url, eid = pending.pop(fut)
+            result = fut.result()
+            emit(url, result)
+            if eid is None:
+                continue
+            for alias in members.pop(eid, []):
+                emit(alias, alias_result(result, eid, url))
+            if entity_cache > 0:
+                recent[eid] = (url, result)
+                while len(recent) > entity_cache:
+                    recent.popitem(last=False)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for url in urls:
+            if _key(url) in done or any(u == url for u, _ in pending.values()):
+                stats["skipped"] += 1
+                continue
+            if t_end is not None and time.time() >= t_end:
+                stats["stopped_by_deadline"] = True
+                break
+            if dead_filter is not None and canonical_url(url) in dead_filter:
+                stats["dead_filtered"] += 1
+                emit(url, {
+                    "status": "error", "type": None, "data": None,
+                    "meta": build_meta(duration_ms=0, dead_filter=True), "error": "known_dead",
+                })
+                continue
+            eid = None
+            if index is not None:
+                eid, _ = index.assign(url)
+                if eid in members:
+                    # 同一網址重複出現且已在等待中時只寫出一次
+                    if url in members[eid]:
+                        stats["skipped"] += 1
+                    else:
+                        members[eid].append(url)
+                        stats["deduped"] += 1
+                    continue
+                if eid in recent:
+                    leader, result = recent[eid]
+                    emit(url, alias_result(result, eid, leader))
+                    stats["deduped"] += 1
+                    continue
+                members[eid] = []
+            pending[ex.submit(_inspect_safe, url, budget_mb, limiter)] = (url, eid)
+            while len(pending) >= window:
+                drain()
+        while pending:
+            drain()
+    if limiter is not None:
+        stats["adaptive"] = {
+            host: {k: m[k] for k in ("limit", "increases", "decreases", "outcomes")}
+            for host, m in limiter.metrics()["hosts"].items()
+        }
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.batch", description="串流、可續跑的批次 inspect_url（JSONL 輸出）")
+    ap.add_argument("input", nargs="?", default="-", help="URL 清單檔，'-' 代表 stdin（預設）")
+    ap.add_argument("--out", required=True, help="JSONL 輸出檔（附加寫入）")
+    ap.add_argument("--checkpoint", help="checkpoint 檔（預設 <out>.done）")
+    ap.add_argument("-c", "--concurrency", type=int, default=4)
+    ap.add_argument("--deadline", type=float, help="總時間上限（秒），到時不再排入新的 URL")
+    ap.add_argument("--backend", choices=["auto", "requests", "playwright"], default="auto",
+                    help="auto：requests → Playwright fallback；playwright：強制瀏覽器")
+    ap.add_argument("--storage-state", help="登入狀態檔（等同 FBIG_STORAGE_STATE）")
+    ap.add_argument("--storage-states", help="多帳號狀態檔（等同 FBIG_STORAGE_STATES）")
+    ap.add_argument("--budget-mb", type=int, help="每筆 inspect 的記憶體預算（MB）")
+    ap.add_argument("--retry-errors", action="store_true", help="重跑時重新處理上次失敗的 URL")
+    ap.add_argument("--export", help="同時串流寫出中文基礎資訊表（.csv / .jsonl / .xlsx，只含本次處理的 URL）")
+    ap.add_argument("--dead-filter", help="已知失效網址的 Bloom filter 檔（不存在時新建，結束時寫回）")
+    ap.add_argument("--dead-filter-capacity", type=int, default=1_000_000)
+    ap.add_argument("--dead-filter-fp", type=float, default=1e-4, help="誤判率（被略過的有效網址比例上限）")
+    ap.add_argument("--dead-reasons", default="not_found", help="加入 filter 的 meta.dead_reason，逗號分隔")
+    ap.add_argument("--no-dedupe", action="store_true", help="不做實體去重（每個網址各自檢測）")
+    ap.add_argument("--entity-cache", type=int, default=1000, help="保留結果供 alias 沿用的最近完成實體數")
+    ap.add_argument("--adaptive", action="store_true", help="依主機自動調整同時檢測數（AIMD），-c 為起始值")
+    ap.add_argument("--max-concurrency", type=int, help="--adaptive 的每主機上限（等同 FBIG_ADAPTIVE_MAX，預設 32）")
+    args = ap.parse_args(argv)
+
+    if args.backend == "playwright":
+        os.environ["FBIG_FORCE_PLAYWRIGHT"] = "1"
+    elif args.backend == "requests":
+        os.environ.pop("FBIG_FORCE_PLAYWRIGHT", None)
+        os.environ["FBIG_DISABLE_PLAYWRIGHT"] = "1"
+    if args.storage_state:
+        os.environ["FBIG_STORAGE_STATE"] = args.storage_state
+    if args.storage_states:
+        os.environ["FBIG_STORAGE_STATES"] = args.storage_states
+    if args.adaptive:
+        os.environ["FBIG_ADAPTIVE"] = "1"
+        os.environ["FBIG_ADAPTIVE_INITIAL"] = str(args.concurrency)
+    if args.max_concurrency:
+        os.environ["FBIG_ADAPTIVE_MAX"] = str(args.max_concurrency)
+
+    ckpt_path = args.checkpoint or args.out + ".done"
+    done = load_checkpoint(ckpt_path, retry_errors=args.retry_errors)
+    if done:
+        print(f"[batch] resume: {len(done)} URL(s) already done", file=sys.stderr)
+
+    out_dir = os.path.dirname(os.path.abspath(args.out))
+    os.makedirs(out_dir, exist_ok=True)
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = open_sink(args.export) if args.export else None
+    dead_filter = None
+    if args.dead_filter:
+        if os.path.exists(args.dead_filter):
+            dead_filter = BloomFilter.load(args.dead_filter)
+        else:
+            dead_filter = BloomFilter(args.dead_filter_capacity, args.dead_filter_fp)
+    try:
+        with open(args.out, "a", encoding="utf-8") as out, open(ckpt_path, "a", encoding="utf-8") as ckpt:
+            try:
+                stats = run_batch(
+                    iter_urls(src), out, ckpt, done,
+                    concurrency=args.concurrency,
+                    deadline=args.deadline,
+                    budget_mb=args.budget_mb,
+                    on_result=sink.write if sink else None,
+                    dead_filter=dead_filter,
+                    dead_reasons=[r.strip() for r in args.dead_reasons.split(",") if r.strip()],
+                    dedupe=not args.no_dedupe,
+                    entity_cache=args.entity_cache,
+                    limiter=get_limiter(),
+                )
+            except KeyboardInterrupt:
+                print("[batch] interrupted; rerun the same command to resume", file=sys.stderr)
+                return 130
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if sink is not None:
+            sink.close()
+        if dead_filter is not None:
+            dead_filter.save(args.dead_filter)
+
+    print(f"[batch] done: {json.dumps(stats)}", file=sys.stderr)
+    return 2 if stats["stopped_by_deadline"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
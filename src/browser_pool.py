@@ -0,0 +1,448 @@
+"""
+多分頁共用瀏覽器池：少數幾個 Chromium 程序內同時開多個 context / 分頁，取代「一次抓取一個瀏覽器」。
+
+- Playwright async API 跑在單一背景 event loop 執行緒；任何執行緒呼叫 fetch() / navigate() 都會
+  排進這個 loop，因此不受 sync API 綁定執行緒的限制，多個 worker 共用同一組瀏覽器。
+- 上限：max_browsers 個瀏覽器 × 每個 contexts_per_browser 個 context × 每個 context pages_per_context 個分頁。
+  context 以 (storage_state, user_agent) 為 key 重用（cookies / HTTP cache 保持 warm），
+  同一 key 的分頁先塞進既有 context，滿了才開新 context，再滿才啟動新瀏覽器。
+  持鎖時只登記名額；啟動瀏覽器、建立 / 關閉 context 都在鎖外進行，不會擋住其他分頁的分配與釋放。
+- 准入佇列：沒有空位時排隊等候（最多 max_waiting 個、每個最多 queue_timeout 秒），
+  超過時直接回傳失敗，呼叫端照舊退回其他抓取方式。
+- 回收：瀏覽器整棵程序樹（CDP SystemInfo.getProcessInfo + /proc 的 VmRSS）超過 recycle_rss_mb 時
+  不再分配新分頁，進行中的分頁結束後關閉；需要時再啟動新的。斷線（crash）的瀏覽器直接丟棄。
+
+    FBIG_BROWSER_POOL=1                    啟用（play_fetcher / session_pool 的瀏覽器抓取改走此池）
+    FBIG_POOL_BROWSERS=2                   瀏覽器數上限
+    FBIG_POOL_CONTEXTS_PER_BROWSER=4
+    FBIG_POOL_PAGES_PER_CONTEXT=4
+    FBIG_POOL_BROWSER_RSS_MB=1500          單一瀏覽器 RSS 超過即回收（0 = 不回收）
+    FBIG_POOL_MAX_WAITING=256
+    FBIG_POOL_QUEUE_TIMEOUT=60
+
+RSS 為各程序 VmRSS 加總（共用頁會重複計入），只在 Linux 可量測；其他平台不回收。
+"""
+import asyncio
+import atexit
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+# 兩次量測同一瀏覽器 RSS 的最小間隔（秒）
+RSS_CHECK_INTERVAL = 5.0
+
+
+def _proc_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def _load_page(page, url: str, timeout: int) -> None:
+    # 與 play_fetcher._load_page 相同的兩段式等待
+    await page.goto(url, timeout=timeout * 1000, wait_until="domcontentloaded")
+    try:
+        await page.wait_for_selector("body", timeout=3000)
+    except PlaywrightTimeoutError:
+        pass
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def _page_html(page, compact: bool) -> str:
+    if compact:
+        from .page_extract import EXTRACT_JS, MAX_FRAGMENTS, MAX_LINES, MAX_LINKS, render_compact_html
+        return render_compact_html(await page.evaluate(EXTRACT_JS, [MAX_LINKS, MAX_LINES, MAX_FRAGMENTS]))
+    return await page.content()
+
+
+def _ready_future(ready: bool) -> "asyncio.Future":
+    """ready=True 時回傳已完成的 future；False 時為佔位物件，建立完成後 set_result(True / False)。"""
+    fut = asyncio.get_running_loop().create_future()
+    if ready:
+        fut.set_result(True)
+    return fut
+
+
+class _Context:
+    def __init__(self, key: Tuple[Optional[str], Optional[str]], ctx):
+        self.key = key
+        self.ctx = ctx
+        self.ready = _ready_future(ctx is not None)
+        self.creating = False
+        self.pages = 0
+        self.served = 0
+        self.last_used = time.time()
+
+
+class _Browser:
+    def __init__(self, bid: int, browser):
+        self.id = bid
+        self.browser = browser
+        self.ready = _ready_future(browser is not None)
+        self.launching = False
+        self.contexts: List[_Context] = []
+        self.pages = 0
+        self.served = 0
+        self.draining = False
+        self.rss_mb: Optional[float] = None
+        self.rss_checked = 0.0
+        self.launched_at = time.time()
+        self._cdp = None
+
+    async def measure_rss(self) -> Optional[float]:
+        """瀏覽器程序樹的 RSS（MB）；無法量測時回傳 None。"""
+        self.rss_checked = time.time()
+        try:
+            if self._cdp is None:
+                self._cdp = await self.browser.new_browser_cdp_session()
+            info = await self._cdp.send("SystemInfo.getProcessInfo")
+        except Exception:
+            return None
+        sizes = [_proc_rss_mb(p["id"]) for p in info.get("processInfo", [])]
+        sizes = [s for s in sizes if s is not None]
+        self.rss_mb = round(sum(sizes), 1) if sizes else None
+        return self.rss_mb
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "contexts": len(self.contexts),
+            "pages": self.pages,
+            "served": self.served,
+            "draining": self.draining,
+            "rss_mb": self.rss_mb,
+            "age_s": int(time.time() - self.launched_at),
+        }
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        max_browsers: int = 2,
+        contexts_per_browser: int = 4,
+        pages_per_context: int = 4,
+        recycle_rss_mb: float = 1500,
+        max_waiting: int = 256,
+        queue_timeout: float = 60.0,
+        headless: bool = True,
+    ):
+        self.max_browsers = max(1, max_browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.pages_per_context = max(1, pages_per_context)
+        self.recycle_rss_mb = recycle_rss_mb
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self.headless = headless
+        self.capacity = self.max_browsers * self.contexts_per_browser * self.pages_per_context
+        self.waiting = 0
+        self._browsers: List[_Browser] = []
+        self._next_id = 0
+        self._pw = None
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0, "launched": 0, "recycled": 0, "crashed": 0}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self._cond, self._pw_lock = self._call(self._make_locks())
+        self._closed = False
+
+    async def _make_locks(self) -> Tuple[asyncio.Condition, asyncio.Lock]:
+        return asyncio.Condition(), asyncio.Lock()
+
+    def _call(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    # ── 排程（皆在 loop 執行緒、持有 self._cond 時呼叫，不 await）──
+
+    def _live(self) -> List[_Browser]:
+        for b in [b for b in self._browsers if b.browser is not None and not b.browser.is_connected()]:
+            self._browsers.remove(b)
+            self._stats["crashed"] += 1
+        return [b for b in self._browsers if not b.draining]
+
+    def _try_slot(self, key) -> Optional[Tuple[_Browser, _Context, Optional[_Context]]]:
+        """
+        挑選並登記名額，回傳 (瀏覽器, context, 要關閉的閒置 context)。
+        需要新瀏覽器 / 新 context 時先登記 ready 未完成的佔位物件，實際啟動與建立在鎖外進行（見 _prepare），
+        其他請求可以排進同一個佔位 context，等它建立完成。
+        """
+        live = sorted(self._live(), key=lambda b: b.pages)
+        # 1. 同 key 且還有空位的 context（所在瀏覽器負載低者優先）
+        for b in live:
+            for c in b.contexts:
+                if c.key == key and c.pages < self.pages_per_context:
+                    return b, c, None
+        # 2. 在有空 context 名額的瀏覽器開新 context
+        target = next((b for b in live if len(b.contexts) < self.contexts_per_browser), None)
+        evicted = None
+        # 3. 啟動新瀏覽器
+        if target is None and len(self._browsers) < self.max_browsers:
+            self._next_id += 1
+            target = _Browser(self._next_id, None)
+            self._browsers.append(target)
+        # 4. 關閉別的 key 閒置最久的 context 騰出名額
+        if target is None:
+            idle = [(c, b) for b in live for c in b.contexts if c.pages == 0 and c.ctx is not None]
+            if not idle:
+                return None
+            evicted, target = min(idle, key=lambda cb: cb[0].last_used)
+            target.contexts.remove(evicted)
+        c = _Context(key, None)
+        target.contexts.append(c)
+        return target, c, evicted
+
+    async def _acquire(self, key) -> Optional[Tuple[_Browser, _Context]]:
+        async with self._cond:
+            slot = self._try_slot(key)
+            if slot is None:
+                if self.waiting >= self.max_waiting:
+                    self._stats["rejected"] += 1
+                    return None
+                self._stats["queued"] += 1
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while slot is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["timed_out"] += 1
+                            return None
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                        slot = self._try_slot(key)
+                finally:
+                    self.waiting -= 1
+            b, c, evicted = slot
+            b.pages += 1
+            c.pages += 1
+            self._stats["admitted"] += 1
+        try:
+            await self._prepare(b, c, evicted)
+        except BaseException:
+            await self._unreserve(b, c)
+            raise
+        return b, c
+
+    async def _prepare(self, b: _Browser, c: _Context, evicted: Optional[_Context]) -> None:
+        """鎖外：關閉被淘汰的 context、啟動佔位瀏覽器、建立佔位 context；由登記佔位的請求負責，其他請求等待。"""
+        if evicted is not None:
+            try:
+                await evicted.ctx.close()
+            except Exception:
+                pass
+        if not b.ready.done() and not b.launching:
+            b.launching = True
+            try:
+                async with self._pw_lock:
+                    if self._pw is None:
+                        self._pw = await async_playwright().start()
+                b.browser = await self._pw.chromium.launch(headless=self.headless)
+                self._stats["launched"] += 1
+            finally:
+                b.ready.set_result(b.browser is not None)
+        if not await asyncio.shield(b.ready):
+            raise RuntimeError(f"browser {b.id} failed to launch")
+        if not c.ready.done() and not c.creating:
+            c.creating = True
+            try:
+                storage_state, user_agent = c.key
+                kwargs: Dict[str, Any] = {}
+                if storage_state:
+                    kwargs["storage_state"] = storage_state
+                if user_agent:
+                    # 與 play_fetcher.fetch_with_playwright 的非池路徑相同：自訂 UA 時一併設定 Accept-Language
+                    from .play_fetcher import UA_ACCEPT_LANGUAGE
+                    kwargs["user_agent"] = user_agent
+                    kwargs["extra_http_headers"] = {"Accept-Language": UA_ACCEPT_LANGUAGE}
+                c.ctx = await b.browser.new_context(**kwargs)
+            finally:
+                c.ready.set_result(c.ctx is not None)
+        if not await asyncio.shield(c.ready):
+            raise RuntimeError("browser context creation failed")
+
+    async def _unreserve(self, b: _Browser, c: _Context) -> None:
+        """_prepare 失敗：退回名額並移除建立失敗的佔位物件。"""
+        async with self._cond:
+            b.pages -= 1
+            c.pages -= 1
+            if c.ready.done() and not c.ready.result() and c in b.contexts:
+                b.contexts.remove(c)
+            if b.ready.done() and not b.ready.result() and b in self._browsers:
+                self._browsers.remove(b)
+            self._cond.notify_all()
+
+    async def _release(self, b: _Browser, c: _Context) -> None:
+        if (
+            self.recycle_rss_mb
+            and not b.draining
+            and time.time() - b.rss_checked >= RSS_CHECK_INTERVAL
+        ):
+            rss = await b.measure_rss()
+            if rss is not None and rss > self.recycle_rss_mb:
+                b.draining = True
+                print(f"[browser-pool] recycle browser {b.id}: rss {rss:.0f}MB > {self.recycle_rss_mb:.0f}MB")
+        async with self._cond:
+            b.pages -= 1
+            c.pages -= 1
+            c.served += 1
+            c.last_used = time.time()
+            b.served += 1
+            to_close = b.draining and b.pages == 0 and b in self._browsers
+            if to_close:
+                self._browsers.remove(b)
+                self._stats["recycled"] += 1
+            self._cond.notify_all()
+        if to_close:
+            try:
+                await b.browser.close()
+            except Exception:
+                pass
+
+    async def _navigate(
+        self, url: str, key, timeout: int, compact: bool, owner_links: bool, cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"final_url": None, "html": None, "owner_links": []}
+        try:
+            slot = await self._acquire(key)
+        except Exception as e:
+            print(f"[browser-pool] launch error: {e}")
+            return out
+        if slot is None:
+            return out
+        b, c = slot
+        page = None
+        try:
+            page = await c.ctx.new_page()
+            load = asyncio.ensure_future(_load_page(page, url, timeout))
+            while not load.done():
+                await asyncio.wait({load}, timeout=0.25)
+                if cancel is not None and cancel.is_set() and not load.done():
+                    # 呼叫端已不需要結果：停止等待、關閉分頁釋出名額
+                    load.cancel()
+                    out["final_url"] = page.url
+                    return out
+            load.result()
+            out["final_url"] = page.url
+            if owner_links:
+                from .play_fetcher import _OWNER_LINKS_JS, OWNER_PATH_EXCLUDE
+                try:
+                    out["owner_links"] = await page.evaluate(_OWNER_LINKS_JS, list(OWNER_PATH_EXCLUDE))
+                except Exception:
+                    pass
+            out["html"] = await _page_html(page, compact)
+        except Exception as e:
+            print(f"[browser-pool] error: {e}")
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            await self._release(b, c)
+        return out
+
+    # ── 任意執行緒可呼叫的同步介面 ──
+
+    def navigate(
+        self,
+        url: str,
+        storage_state: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        timeout: int = 15,
+        compact: bool = False,
+        owner_links: bool = False,
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        與 BrowserSession.navigate 相同格式：{"final_url", "html", "owner_links"}；失敗或排不到位時 html 為 None。
+        cancel 被設定時停止載入並關閉分頁（回傳當下的 final_url）。
+        """
+        key = (os.path.abspath(storage_state) if storage_state else None, user_agent)
+        return self._call(self._navigate(url, key, timeout, compact, owner_links, cancel))
+
+    def fetch(self, url: str, **kwargs) -> Tuple[Optional[str], Optional[str]]:
+        """回傳 (html, final_url)，參數同 navigate。"""
+        out = self.navigate(url, **kwargs)
+        return out["html"], out["final_url"]
+
+    async def _snapshot(self, refresh_rss: bool) -> Dict[str, Any]:
+        if refresh_rss:
+            for b in list(self._browsers):
+                await b.measure_rss()
+        async with self._cond:
+            browsers = [b.snapshot() for b in self._browsers]
+        rss = [b["rss_mb"] for b in browsers if b["rss_mb"] is not None]
+        return dict(
+            self._stats,
+            capacity=self.capacity,
+            waiting=self.waiting,
+            open_pages=sum(b["pages"] for b in browsers),
+            browsers_rss_mb=round(sum(rss), 1) if rss else None,
+            browsers=browsers,
+        )
+
+    def stats(self, refresh_rss: bool = False) -> Dict[str, Any]:
+        """計數、目前分頁數與各瀏覽器狀態；refresh_rss=True 時先重新量測 RSS。"""
+        return self._call(self._snapshot(refresh_rss))
+
+    async def _shutdown(self) -> None:
+        for b in self._browsers:
+            if b.browser is None:
+                continue
+            try:
+                await b.browser.close()
+            except Exception:
+                pass
+        self._browsers = []
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+            self._pw = None
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._call(self._shutdown(), timeout=30)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """FBIG_BROWSER_POOL=1 時回傳本程序共用的 BrowserPool，否則 None。"""
+    global _pool
+    if os.getenv("FBIG_BROWSER_POOL") != "1":
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                max_browsers=int(os.getenv("FBIG_POOL_BROWSERS", "2")),
+                contexts_per_browser=int(os.getenv("FBIG_POOL_CONTEXTS_PER_BROWSER", "4")),
+                pages_per_context=int(os.getenv("FBIG_POOL_PAGES_PER_CONTEXT", "4")),
+                recycle_rss_mb=float(os.getenv("FBIG_POOL_BROWSER_RSS_MB", "1500")),
+                max_waiting=int(os.getenv("FBIG_POOL_MAX_WAITING", "256")),
+                queue_timeout=float(os.getenv("FBIG_POOL_QUEUE_TIMEOUT", "60")),
+            )
+            atexit.register(_pool.close)
+        return _pool
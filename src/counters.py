@@ -0,0 +1,269 @@
+"""
+從 GraphQL / XHR 的 JSON 回應擷取計數欄位（追蹤數、讚數、分享數、成員數）。
+
+Playwright 載入頁面時，FB / IG 會以 JSON 取得這些數字；直接讀結構化資料
+比在上 MB 的 DOM 文字裡跑 regex 快也穩定。欄位名稱對應 parse_*_basic 的 basic 欄位。
+回應常夾帶動態牆上其他貼文、推薦粉專 / 社團 / 帳號的計數，因此只採用目標節點下的值（見 walk_target_counters）：
+貼文以網址中的貼文 ID 比對，粉專 / 社團 / 個人檔案以網址中的 slug、username 或數字 ID 比對。
+"""
+import base64
+import binascii
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+# JSON key → basic 欄位；值可以是數字、數字字串或 {"count": n}
+COUNTER_KEYS: Dict[str, str] = {
+    "follower_count": "followers",
+    "followers_count": "followers",
+    "subscriber_count": "followers",
+    "page_likers_count": "followers",
+    "edge_followed_by": "followers",
+    "reaction_count": "likes",
+    "like_count": "likes",
+    "likers": "likes",
+    "edge_liked_by": "likes",
+    "edge_media_preview_like": "likes",
+    "share_count": "shares",
+    "reshare_count": "shares",
+    "group_member_count": "members",
+    "member_count": "members",
+}
+
+# 各類型需要的欄位；都找到即可提早結束導航
+NEEDED_FIELDS: Dict[str, tuple] = {
+    "fb_page": ("followers",),
+    "fb_post": ("likes", "shares"),
+    "fb_group": ("members",),
+    "fb_group_post": ("likes", "shares"),
+    "ig_profile": ("followers",),
+    "ig_post": ("likes",),
+}
+
+# 貼文類型：回應裡常夾帶動態牆上其他貼文的計數，只採用目標貼文節點下的欄位
+POST_TYPES = ("fb_post", "fb_group_post", "ig_post")
+
+# 粉專 / 社團 / 個人檔案：只採用與網址中 slug / ID 相符的節點
+ENTITY_TYPES = ("fb_page", "fb_group", "ig_profile")
+
+# 節點上可與目標貼文 ID 比對的 key（FB feedback / story 的 id 為 base64 的 "feedback:<id>" 等）
+_ID_KEYS = ("id", "post_id", "shortcode", "code")
+# 節點上可與目標粉專 / 社團 / 帳號比對的 key；url 取其路徑中的 slug / ID
+_ENTITY_KEYS = ("id", "username", "vanity", "page_id", "group_id", "url")
+# 不是實體 slug 的第一段路徑
+_NOT_ENTITY = {"profile.php", "share", "watch", "reel", "reels", "p", "story.php", "permalink.php", "login"}
+_POST_PATH = re.compile(r"/(?:posts|permalink|videos|reel|reels|photos|p|tv)/(?:[^/?#]+/)*?([\w-]+)/?(?:$|[?#])", re.I)
+
+# 會帶計數的回應路徑
+RESPONSE_URL_PATTERN = re.compile(r"/api/graphql|/graphql/query|/ajax/|/api/v1/", re.I)
+
+_MAX_BODY = 4 * 1024 * 1024
+
+
+def capture_enabled() -> bool:
+    return os.getenv("FBIG_CAPTURE_COUNTERS") == "1"
+
+
+def _as_count(v: Any) -> Optional[int]:
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, int):
+        return v
+    if isinstance(v, str) and v.isdigit():
+        return int(v)
+    if isinstance(v, dict):
+        return _as_count(v.get("count"))
+    return None
+
+
+def walk_counters(obj: Any, found: Dict[str, int], depth: int = 0) -> None:
+    """遞迴走訪 JSON，將第一次出現的計數寫入 found（已有的欄位不覆寫）。"""
+    if depth > 64:
+        return
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            field = COUNTER_KEYS.get(k)
+            if field and field not in found:
+                n = _as_count(v)
+                if n is not None:
+                    found[field] = n
+                    continue
+            if isinstance(v, (dict, list)):
+                walk_counters(v, found, depth + 1)
+    elif isinstance(obj, list):
+        for v in obj:
+            if isinstance(v, (dict, list)):
+                walk_counters(v, found, depth + 1)
+
+
+def target_ids(url: str) -> Set[str]:
+    """網址中的貼文 ID / pfbid / IG shortcode（不連網）；抽不到時回傳空集合。"""
+    parts = urlsplit(url or "")
+    ids: Set[str] = set()
+    m = None if parts.path.startswith("/share/") else _POST_PATH.search(parts.path.rstrip("/") + "/")
+    if m:
+        ids.add(m.group(1))
+    query = parse_qs(parts.query)
+    for name in ("story_fbid", "fbid", "v"):
+        ids.update(v for v in query.get(name, []) if v)
+    return ids
+
+
+def entity_ids(url: str) -> Set[str]:
+    """粉專 / 社團 / 個人檔案網址中的 slug、username 或數字 ID（小寫，不連網）；抽不到時回傳空集合。"""
+    parts = urlsplit(url or "")
+    segs = [s for s in parts.path.split("/") if s]
+    ids: Set[str] = set(v for v in parse_qs(parts.query).get("id", []) if v)
+    if segs:
+        head = segs[0].lower()
+        if head in ("groups", "pg") and len(segs) > 1:
+            ids.add(segs[1])
+        elif head in ("people", "pages") and len(segs) > 2:
+            # /people/<名稱>/<id>、/pages/<名稱>/<id>
+            ids.add(segs[2])
+        elif head not in _NOT_ENTITY and head not in ("groups", "pg", "people", "pages"):
+            ids.add(segs[0])
+    return {i.lower() for i in ids}
+
+
+def _id_matches(value: Any, targets: Set[str], key: str = "id") -> bool:
+    if isinstance(value, int) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str) or not value:
+        return False
+    if key == "url":
+        return bool(value.startswith("http") and entity_ids(value) & targets)
+    if value in targets or value.lower() in targets:
+        return True
+    try:
+        decoded = base64.b64decode(value + "=" * (-len(value) % 4), validate=True).decode("ascii")
+    except (binascii.Error, ValueError):
+        return False
+    return any(tok in targets for tok in re.split(r"[^\w-]+", decoded))
+
+
+def walk_target_counters(payload: Any, found: Dict[str, int], targets: Set[str], entity: bool = False) -> None:
+    """
+    只從目標節點取計數，其他位置（動態牆、推薦、留言串裡的別則貼文 / 別的粉專）的計數一律略過。
+    貼文（entity=False）：頂層 data.node（單則貼文查詢），以及 id / post_id 與目標相符的節點之下。
+    粉專 / 社團 / 個人檔案（entity=True）：id / username / vanity / url 與目標相符的節點之下。
+    """
+    if not entity and isinstance(payload, dict):
+        data = payload.get("data")
+        if isinstance(data, dict) and isinstance(data.get("node"), dict):
+            walk_counters(data["node"], found)
+    if targets:
+        _walk_matching(payload, found, targets, _ENTITY_KEYS if entity else _ID_KEYS, 0)
+
+
+def _take_direct(obj: Dict[str, Any], found: Dict[str, int]) -> None:
+    """相符節點本身的計數優先於其子節點（例如粉專節點下的推薦粉專）。"""
+    for k, v in obj.items():
+        field = COUNTER_KEYS.get(k)
+        if field and field not in found:
+            n = _as_count(v)
+            if n is not None:
+                found[field] = n
+
+
+def _walk_matching(obj: Any, found: Dict[str, int], targets: Set[str], keys: tuple, depth: int) -> None:
+    if depth > 64:
+        return
+    if isinstance(obj, dict):
+        if any(_id_matches(obj.get(k), targets, k) for k in keys):
+            _take_direct(obj, found)
+            walk_counters(obj, found, depth)
+            return
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return
+    for v in children:
+        if isinstance(v, (dict, list)):
+            _walk_matching(v, found, targets, keys, depth + 1)
+
+
+def parse_json_payloads(body: str) -> Iterable[Any]:
+    """FB 回應可能帶 'for (;;);' 前綴，或一行一個 JSON（串流 GraphQL）。"""
+    body = body.strip()
+    if body.startswith("for (;;);"):
+        body = body[len("for (;;);"):]
+    try:
+        yield json.loads(body)
+        return
+    except ValueError:
+        pass
+    for line in body.splitlines():
+        line = line.strip()
+        if line.startswith(("{", "[")):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class CounterCapture:
+    """
+    收集 page.on("response") 的候選回應；drain() 在主流程讀取 body 並解析。
+    （sync API 的事件 handler 內不呼叫 response.text()，避免卡住事件迴圈。）
+    """
+
+    def __init__(self, type_tag: str, url: Optional[str] = None):
+        self.needed = NEEDED_FIELDS.get(type_tag, ())
+        self.entity = type_tag in ENTITY_TYPES
+        self.scoped = self.entity or type_tag in POST_TYPES
+        self._ids = entity_ids if self.entity else target_ids
+        self.targets: Set[str] = self._ids(url) if url else set()
+        self.found: Dict[str, int] = {}
+        self.responses_seen = 0
+        self._pending: List[Any] = []
+
+    def add_target(self, url: str) -> None:
+        """導航後的最終網址（例如分享連結轉址後）也可能帶貼文 ID / 粉專 slug。"""
+        self.targets |= self._ids(url)
+
+    def on_response(self, response) -> None:
+        if not RESPONSE_URL_PATTERN.search(response.url):
+            return
+        ctype = (response.headers.get("content-type") or "").lower()
+        if "json" in ctype or "javascript" in ctype or "text/html" in ctype:
+            self._pending.append(response)
+
+    def drain(self) -> None:
+        pending, self._pending = self._pending, []
+        for resp in pending:
+            try:
+                body = resp.text()
+            except Exception:
+                continue
+            self.responses_seen += 1
+            if len(body) > _MAX_BODY:
+                continue
+            for payload in parse_json_payloads(body):
+                if self.scoped:
+                    walk_target_counters(payload, self.found, self.targets, self.entity)
+                else:
+                    walk_counters(payload, self.found)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.needed) and all(f in self.found for f in self.needed)
+
+
+def apply_counters(basic: Dict[str, Any], found: Dict[str, int]) -> Dict[str, Any]:
+    """以網路回應擷取到的計數補上 basic 中缺少的欄位。"""
+    filled = False
+    for field, n in found.items():
+        if field in basic and basic.get(field) is None:
+            basic[field] = n
+            filled = True
+            if isinstance(basic.get("provenance"), dict):
+                basic["provenance"][field] = "network"
+    if filled:
+        basic["source_hint"] = "network"
+        if basic.get("note") == "not_found":
+            basic["note"] = None
+    return basic
@@ -0,0 +1,139 @@
+"""
+實體層級去重：不連網，只從網址本身抽出穩定 ID，指向同一貼文 / 社團 / 影片 / IG 貼文的不同連結共用一次檢測。
+
+entity_keys() 產生的 key：
+  fb:post:<id>      /posts/<id>、/permalink/<id>、/videos/…/<id>、/reel/<id>、/photos/…/<id>、
+                    permalink.php / story.php?story_fbid=、photo(.php)?fbid=、watch?v=（數字 ID）
+  fb:story:<owner>:<story_fbid>
+                    story_fbid 搭配 owner（id= 參數或 /<owner>/posts/ 的 owner 片段），數字與 pfbid 皆是；
+                    pfbid 只在同一 owner 下才有意義，因此一律帶 owner，
+                    story.php 與 permalink.php 的同一則貼文因此合併
+  fb:share:<token>  /share/(p|v|r)/<token>、/share/<token>，以及 share_url 參數內的 share 連結
+  fb:watch:<token>  fb.watch/<token>
+  fb:group:<id>     社團主頁（社團貼文不產生此 key，避免同社團不同貼文被合併）
+  fb:page:<slug>    粉專 / 個人頁 /<slug>、profile.php?id=
+  ig:media:<code>   /p/、/reel/、/tv/ 的 shortcode（同一則貼文的 p 與 reel 連結相同）
+  ig:user:<name>
+抽不到任何 key 時以 url:<canonical_url> 代替（只合併寫法不同的同一網址）。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .utils import canonical_url
+
+_FB_HOSTS = ("facebook.com", "fb.com")
+_FB_RESERVED = {
+    "share", "watch", "reel", "reels", "groups", "permalink.php", "photo.php", "photo", "story.php",
+    "login", "profile.php", "events", "marketplace", "gaming", "friends", "pages", "hashtag",
+    "help", "settings", "search", "notifications", "messages",
+}
+_IG_RESERVED = {
+    "explore", "stories", "reels", "reel", "p", "tv", "accounts", "about", "developer", "directory",
+    "topics", "help", "privacy", "terms", "blog", "press", "api", "oauth", "direct",
+}
+# 之後第一個純數字片段即為貼文 / 影片 / 相片 ID
+_FB_ID_SEGMENTS = {"posts", "permalink", "videos", "reel", "photos"}
+
+
+def _is_pfbid(token: str) -> bool:
+    return token.startswith("pfbid") and len(token) > 5 and token.isalnum()
+
+
+def _host_is(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def entity_keys(url: str) -> List[str]:
+    """網址中可辨識的穩定 ID（依具體程度排序，貼文 ID 在前）；不連網。"""
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    segs = [s for s in unquote(parts.path).split("/") if s]
+    low = [s.lower() for s in segs]
+    query = parse_qs(parts.query)
+    keys: List[str] = []
+
+    if host == "fb.watch":
+        if segs:
+            keys.append(f"fb:watch:{segs[0]}")
+    elif _host_is(host, _FB_HOSTS):
+        owner_param = (query.get("id") or [""])[0]
+        for i, seg in enumerate(low[:-1]):
+            if seg in _FB_ID_SEGMENTS:
+                post = next((t for t in segs[i + 1:] if t.isdigit() or _is_pfbid(t)), None)
+                if post and post.isdigit():
+                    keys.append(f"fb:post:{post}")
+                if post and i > 0:
+                    keys.append(f"fb:story:{low[i - 1]}:{post}")
+                if post:
+                    break
+        story = (query.get("story_fbid") or [""])[0]
+        if story.isdigit():
+            keys.append(f"fb:post:{story}")
+        if (story.isdigit() or _is_pfbid(story)) and owner_param.isdigit():
+            keys.append(f"fb:story:{owner_param}:{story}")
+        fbid = (query.get("fbid") or [""])[0]
+        if fbid.isdigit():
+            keys.append(f"fb:post:{fbid}")
+        if low[:1] == ["watch"] and (query.get("v") or [""])[0].isdigit():
+            keys.append(f"fb:post:{query['v'][0]}")
+        if low[:1] == ["share"] and len(segs) >= 2:
+            token = segs[2] if len(segs) >= 3 and low[1] in ("p", "v", "r") else segs[1]
+            keys.append(f"fb:share:{token}")
+        for shared in query.get("share_url", []):
+            keys.extend(k for k in entity_keys(shared) if k.startswith("fb:share:"))
+        if low[:1] == ["groups"] and len(segs) == 2:
+            keys.append(f"fb:group:{low[1]}")
+        elif low == ["profile.php"] and owner_param.isdigit():
+            keys.append(f"fb:page:{owner_param}")
+        elif len(segs) == 1 and low[0] not in _FB_RESERVED:
+            keys.append(f"fb:page:{low[0]}")
+    elif _host_is(host, ("instagram.com",)):
+        if len(segs) >= 2 and low[0] in ("p", "reel", "reels", "tv"):
+            keys.append(f"ig:media:{segs[1]}")
+        elif len(segs) == 1 and low[0] not in _IG_RESERVED:
+            keys.append(f"ig:user:{low[0]}")
+
+    seen = set()
+    return [k for k in keys if not (k in seen or seen.add(k))]
+
+
+def entity_id(url: str) -> str:
+    keys = entity_keys(url)
+    return keys[0] if keys else f"url:{canonical_url(url)}"
+
+
+class EntityIndex:
+    """
+    key → 實體 ID。同一網址的所有 key 都指向第一個出現的實體，之後帶有任一相同 key 的網址即為 alias。
+    以 LRU 保存最多 max_keys 個 key（超過時最舊的先淘汰，之後的 alias 會被當成新實體）。
+    """
+
+    def __init__(self, max_keys: int = 1_000_000):
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def assign(self, url: str) -> Tuple[str, bool]:
+        """回傳 (實體 ID, 是否為新實體)，並把此網址的 key 全部登記到該實體。"""
+        keys = entity_keys(url) or [f"url:{canonical_url(url)}"]
+        with self._lock:
+            eid = next((self._keys[k] for k in keys if k in self._keys), None)
+            is_new = eid is None
+            if is_new:
+                eid = keys[0]
+            for k in keys:
+                if k not in self._keys:
+                    self._keys[k] = eid
+                self._keys.move_to_end(k)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        return eid, is_new
+
+
+def alias_result(result: Dict[str, Any], eid: str, inspected_url: Optional[str]) -> Dict[str, Any]:
+    """把同一實體的檢測結果轉給 alias：內容相同，meta.entity 註明實際檢測的網址。"""
+    out = dict(result)
+    out["meta"] = dict(result.get("meta") or {}, entity={"id": eid, "inspected_url": inspected_url})
+    return out
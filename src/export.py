@@ -0,0 +1,154 @@
+"""
+串流匯出：逐筆把 inspect 結果寫成中文「基礎資訊」欄位的 CSV / JSONL / XLSX。
+
+每筆結果寫出後即丟棄，記憶體用量與筆數無關（XLSX 使用 XlsxWriter 的 constant_memory 模式）。
+
+    python -m src.export results.jsonl --out basic_metrics_zh.xlsx
+    python -m src.batch urls.txt --out results.jsonl --export basic_metrics_zh.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from .result import InspectResult
+
+ZH_COLUMNS = (
+    "網址", "類型", "耗時(ms)",
+    "粉絲專頁追蹤數", "貼文按讚數", "貼文分享數", "貼文所屬粉絲專頁追蹤數",
+    "社團成員數", "貼文所屬社團成員數", "帳號追蹤數", "貼文所屬帳號追蹤數",
+    "數據來源", "備註",
+)
+
+FORMATS = ("csv", "jsonl", "xlsx")
+
+Result = Union[Dict[str, Any], InspectResult]
+
+
+def zh_row(url: str, result: Result) -> List[Any]:
+    """一筆結果 → ZH_COLUMNS 順序的值（缺少的欄位為 None）；失敗的結果把 error 放在「備註」。"""
+    if isinstance(result, InspectResult):
+        type_tag, meta = result.type, {"duration_ms": result.duration_ms}
+        zh = result.zh_basic() if result.status == "ok" else {}
+        error = result.error
+    else:
+        type_tag, meta = result.get("type"), result.get("meta") or {}
+        zh = result.get("基礎資訊") or {}
+        error = result.get("error")
+    row = dict(zh)
+    row["網址"] = url
+    row["類型"] = type_tag
+    row["耗時(ms)"] = meta.get("duration_ms")
+    if error and not row.get("備註"):
+        row["備註"] = error
+    return [row.get(c) for c in ZH_COLUMNS]
+
+
+class CsvSink:
+    """UTF-8 BOM 的 CSV（Excel 可直接開啟，與 experiments/results/basic_metrics_zh.csv 相同）。"""
+
+    def __init__(self, path: str):
+        self._f = open(path, "w", newline="", encoding="utf-8-sig")
+        self._w = csv.writer(self._f)
+        self._w.writerow(ZH_COLUMNS)
+
+    def write(self, url: str, result: Result) -> None:
+        self._w.writerow(["" if v is None else v for v in zh_row(url, result)])
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, url: str, result: Result) -> None:
+        self._f.write(json.dumps(dict(zip(ZH_COLUMNS, zh_row(url, result))), ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class XlsxSink:
+    """XlsxWriter constant_memory：每列寫完即 flush 到暫存檔，只保留目前這一列。"""
+
+    MAX_ROWS = 1_048_576
+
+    def __init__(self, path: str):
+        import xlsxwriter
+
+        self._wb = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+        self._ws = self._wb.add_worksheet("基礎資訊")
+        self._ws.write_row(0, 0, ZH_COLUMNS)
+        self._row = 1
+
+    def write(self, url: str, result: Result) -> None:
+        if self._row >= self.MAX_ROWS:
+            raise ValueError("xlsx worksheet row limit reached; export to csv or jsonl instead")
+        self._ws.write_row(self._row, 0, zh_row(url, result))
+        self._row += 1
+
+    def close(self) -> None:
+        self._wb.close()
+
+
+def open_sink(path: str, fmt: Optional[str] = None):
+    """依 fmt（或副檔名）開啟 CsvSink / JsonlSink / XlsxSink。"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt == "csv":
+        return CsvSink(path)
+    if fmt == "jsonl":
+        return JsonlSink(path)
+    if fmt == "xlsx":
+        return XlsxSink(path)
+    raise ValueError(f"unsupported export format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+def iter_jsonl(src: TextIO) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """逐行讀取 batch 輸出的 JSONL，產出 (url, result)；無法解析的行略過。"""
+    for line in src:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        yield rec.get("url"), rec
+
+
+def export(results: Iterable[Tuple[str, Result]], path: str, fmt: Optional[str] = None) -> int:
+    """把 (url, result) 串流寫到 path，回傳寫出筆數。"""
+    sink = open_sink(path, fmt)
+    n = 0
+    try:
+        for url, result in results:
+            sink.write(url, result)
+            n += 1
+    finally:
+        sink.close()
+    return n
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.export", description="batch JSONL → 中文基礎資訊 CSV / JSONL / XLSX（串流）")
+    ap.add_argument("input", nargs="?", default="-", help="batch 輸出的 JSONL，'-' 代表 stdin（預設）")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--format", choices=FORMATS, help="預設依 --out 副檔名判斷")
+    args = ap.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        n = export(iter_jsonl(src), args.out, args.format)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"[export] {n} row(s) → {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,189 @@
-import random, time
+import codecs, json, os, random, threading, time
 import requests
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
+
+from .memory import current_page_cap
+from .og import HeadMetaStream
 
 UA_POOL = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
 ]
 
-def fetch_html(url: str, timeout=12) -> Optional[str]:
+_STATE_LOCK = threading.Lock()
+_STATE_SESSIONS: Dict[str, Dict[str, Any]] = {}
+
+
+def load_storage_state(session: requests.Session, path: str) -> int:
+    """
+    將 Playwright storage_state（scripts/prepare_login_state.py 產生的 state.json）
+    內的 cookies 載入 requests 的 cookie jar，回傳實際載入的 cookie 數量。
+    已過期的 cookie 會略過；expires = -1 視為 session cookie。
+    """
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    now = time.time()
+    n = 0
+    for c in state.get("cookies") or []:
+        name, value = c.get("name"), c.get("value")
+        if not name or value is None:
+            continue
+        expires = c.get("expires")
+        if isinstance(expires, (int, float)) and 0 < expires < now:
+            continue
+        session.cookies.set(
+            name,
+            value,
+            domain=c.get("domain"),
+            path=c.get("path") or "/",
+            secure=bool(c.get("secure")),
+            expires=int(expires) if isinstance(expires, (int, float)) and expires > 0 else None,
+            rest={"HttpOnly": None} if c.get("httpOnly") else {},
+        )
+        n += 1
+    return n
+
+
+def get_session(storage_state: Optional[str] = None) -> Optional[requests.Session]:
+    """
+    取得帶有登入 cookies 的共用 requests.Session（每個 storage_state 檔各一個）。
+    檔案 mtime 改變時（例如重新執行 prepare_login_state.py）會自動重新載入 cookies。
+    檔案不存在或無法解析時回傳 None。
+    """
+    if not storage_state:
+        return None
+    path = os.path.abspath(storage_state)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _STATE_LOCK:
+        entry = _STATE_SESSIONS.get(path)
+        if entry and entry["mtime"] == mtime:
+            return entry["session"]
+        session = requests.Session()
+        try:
+            n = load_storage_state(session, path)
+        except (OSError, ValueError) as e:
+            print("[fetch] storage_state load failed:", path, e)
+            return None
+        print("[fetch] storage_state loaded:", path, "cookies:", n)
+        _STATE_SESSIONS[path] = {"session": session, "mtime": mtime}
+        return session
+
+
+def looks_like_login_wall(final_url: str, html: Optional[str]) -> bool:
+    """判斷帶 cookies 的回應是否仍被導向登入頁 / checkpoint（代表 cookies 失效或被擋）。"""
+    u = (final_url or "").lower()
+    if "/login" in u or "/checkpoint" in u or "/accounts/login" in u:
+        return True
+    h = html or ""
+    return 'id="login_form"' in h or 'name="login_form"' in h
+
+
+def _charset(r: requests.Response) -> str:
+    """回應宣告的編碼；Python 不認得（LookupError）時退回 utf-8。"""
+    enc = r.encoding or "utf-8"
+    try:
+        codecs.lookup(enc)
+    except LookupError:
+        return "utf-8"
+    return enc
+
+
+def _read_text(
+    r: requests.Response,
+    max_bytes: Optional[int],
+    info: Optional[Dict[str, Any]],
+    on_head: Optional[Callable[[Dict[str, Optional[str]]], None]] = None,
+) -> str:
+    charset = _charset(r)
+    head = HeadMetaStream(charset) if on_head is not None or info is not None else None
+
+    def got_head(meta):
+        if info is not None:
+            info["head_meta"] = meta
+        if on_head is not None:
+            on_head(meta)
+
+    if not max_bytes:
+        if info is not None:
+            info["bytes"] = len(r.content)
+        text = r.text
+        if head is not None:
+            head.feed(text)
+            got_head(head.result())
+        return text
+    chunks, n = [], 0
+    try:
+        for chunk in r.iter_content(64 * 1024):
+            chunks.append(chunk)
+            n += len(chunk)
+            if head is not None and not head.done:
+                meta = head.feed(chunk)
+                if meta is not None:
+                    got_head(meta)  # </head> 已到，body 還在下載
+            if n >= max_bytes:
+                if info is not None:
+                    info["truncated"] = True
+                break
+    finally:
+        r.close()
+    if head is not None and not head.done:
+        got_head(head.result())  # 沒有 </head>（截斷或非 HTML）：以已讀到的部分為準
+    if info is not None:
+        info["bytes"] = n
+    return b"".join(chunks)[:max_bytes].decode(charset, errors="replace")
+
+
+def fetch_html(
+    url: str,
+    timeout=12,
+    storage_state: Optional[str] = None,
+    info: Optional[Dict[str, Any]] = None,
+    max_bytes: Optional[int] = None,
+    on_head: Optional[Callable[[Dict[str, Optional[str]]], None]] = None,
+) -> Optional[str]:
+    """
+    以 requests 抓取 HTML；失敗回傳 None。
+    info 若提供 dict，會寫入診斷欄位：status / final_url / bytes / truncated，
+    login_wall（回應看起來是登入頁；匿名抓取也會標記，但只有帶 storage_state 時回傳 None），
+    network_s（請求 + 讀取 body 的秒數，不含之後的隨機 sleep），
+    以及 head_meta（串流讀取時邊下載邊擷取的 og:* / twitter:* / canonical，見 og.py）。
+    on_head：讀到 </head> 時立即以 head_meta 呼叫（body 尚未下載完），可用來提早回報 og:*。
+    max_bytes：單頁讀取上限（串流讀取，超過即停止）；未指定時沿用目前
+    inspection_budget 的單頁上限（見 memory.py）。
+    """
+    if max_bytes is None:
+        max_bytes = current_page_cap()
     headers = {
         "User-Agent": random.choice(UA_POOL),
         "Accept-Language": "en-US,en;q=0.9",
     }
+    session = None
+    if storage_state:
+        session = get_session(storage_state)
+        if session is None:
+            return None
+    t0 = time.time()
     try:
-        r = requests.get(url, headers=headers, timeout=timeout)
+        r = (session or requests).get(url, headers=headers, timeout=timeout, stream=bool(max_bytes))
+        if info is not None:
+            info["status"] = r.status_code
+            info["final_url"] = r.url
         r.raise_for_status()
+        text = _read_text(r, max_bytes, info, on_head)
+        if info is not None:
+            info["network_s"] = time.time() - t0
         time.sleep(random.uniform(0.8, 1.6))
-        print("[fetch]", r.status_code, r.url, "redirects:", len(r.history))
-        return r.text
+        print("[fetch]", r.status_code, r.url, "redirects:", len(r.history), "login:", bool(session))
+        wall = looks_like_login_wall(r.url, text)
+        if wall and info is not None:
+            info["login_wall"] = True
+        if session is not None and wall:
+            print("[fetch] login wall with storage_state:", r.url)
+            return None
+        return text
     except requests.RequestException:
-        return None
\ No newline at end of file
+        return None
+
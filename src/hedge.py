@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Optional, Tuple, Dict, Any
+
+
+class LatencyTracker:
+    """最近 window 次 requests 抓取的耗時（秒），用來決定 hedge 觸發點。"""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            vals = sorted(self._samples)
+        k = min(len(vals) - 1, max(0, int(round((len(vals) - 1) * p))))
+        return vals[k]
+
+
+class HedgeBudget:
+    """
+    Token bucket：每個一般請求存入 ratio 個 token（上限 burst），每次 hedge 花 1 個。
+    長期下 hedge 次數不超過請求數的 ratio 比例。
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            # 容許浮點誤差：ratio=0.1 累加 10 次是 0.999...，應該剛好夠一次
+            if self._tokens >= 1.0 - 1e-9:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+_tracker = LatencyTracker()
+_budget = HedgeBudget(ratio=float(os.getenv("FBIG_HEDGE_BUDGET", "0.1")))
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0}
+
+
+def hedge_enabled() -> bool:
+    return os.getenv("FBIG_HEDGE") == "1"
+
+
+def hedge_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _bump(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def hedge_delay() -> float:
+    """目前的 hedge 觸發延遲（秒）：requests 近期耗時的 FBIG_HEDGE_PERCENTILE 分位，樣本不足時用 FBIG_HEDGE_DEFAULT_MS。"""
+    p = float(os.getenv("FBIG_HEDGE_PERCENTILE", "0.9"))
+    d = _tracker.percentile(p)
+    if d is None:
+        d = int(os.getenv("FBIG_HEDGE_DEFAULT_MS", "4000")) / 1000
+    return d
+
+
+def hedged_fetch(
+    primary: Callable[[Dict[str, Any]], Optional[str]],
+    backup: Callable[[threading.Event], Tuple[Optional[str], Any]],
+) -> Tuple[Optional[str], str, Dict[str, Any], Any]:
+    """
+    先執行 primary(info)（requests）；網路部分超過 hedge_delay() 仍未完成且 hedge 預算允許時，
+    並行啟動 backup(cancel)（Playwright），採用先回傳可用 HTML 的一方。
+    primary 很快失敗（回傳 None）時不 hedge，直接回傳 None 交給呼叫端原本的 fallback。
+
+    primary 在 info["network_s"] 寫入網路耗時（不含 fetch_html 讀完後的隨機 sleep）：
+    延遲統計只記這一段，且已寫入時代表只剩 sleep，不再 hedge。
+    backup 回傳 (html, extra)；primary 勝出時設定 cancel 讓 backup 停止並關閉瀏覽器。
+    回傳 (html, 勝出者 "primary"/"backup"/"none", 診斷資訊, backup 勝出時的 extra 否則 None)。
+    """
+    _budget.on_request()
+    _bump("requests")
+    delay = hedge_delay()
+    info: Dict[str, Any] = {"delay_ms": int(delay * 1000), "hedged": False}
+    pinfo: Dict[str, Any] = {}
+    cancel = threading.Event()
+
+    def _timed_primary() -> Optional[str]:
+        html = primary(pinfo)
+        if html and pinfo.get("network_s") is not None:
+            _tracker.record(pinfo["network_s"])
+        return html
+
+    ex = ThreadPoolExecutor(max_workers=2)
+    try:
+        f_primary = ex.submit(_timed_primary)
+        done, _ = wait([f_primary], timeout=delay)
+        if done or "network_s" in pinfo:
+            html = f_primary.result()
+            return html, "primary" if html else "none", info, None
+
+        if not _budget.try_spend():
+            _bump("budget_denied")
+            info["budget_denied"] = True
+            html = f_primary.result()
+            return html, "primary" if html else "none", info, None
+
+        _bump("hedged")
+        info["hedged"] = True
+        futs = {f_primary: "primary", ex.submit(backup, cancel): "backup"}
+        while futs:
+            done, _ = wait(list(futs), return_when=FIRST_COMPLETED)
+            for f in done:
+                name = futs.pop(f)
+                try:
+                    res = f.result()
+                except Exception:
+                    res = None
+                html, extra = res if name == "backup" and res else (res, None)
+                if html:
+                    if name == "backup":
+                        _bump("hedge_wins")
+                    return html, name, info, extra
+        return None, "none", info, None
+    finally:
+        cancel.set()
+        ex.shutdown(wait=False)
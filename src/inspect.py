@@ -1,14 +1,30 @@
 from .classifier import classify
 from .fetcher import fetch_html
-from .parser import (
-    parse_fb_page_basic, parse_fb_post_basic,
-    parse_fb_group_basic, parse_fb_group_post_basic,
-    parse_ig_profile_basic, parse_ig_post_basic
-)
+from .session_pool import get_pool
+from .memory import default_budget_mb, inspection_budget, current_page_cap
+from .hedge import hedge_enabled, hedged_fetch
+from .resolver import follow_redirects, resolve_link
+from .og import OG_FIELDS, extract_head_meta
+from .counters import capture_enabled, apply_counters
+from .profiling import should_profile, profile_session
+from .result import InspectResult, TAG_TO_KIND, build_meta, format_basic_zh
+from .variants import VARIANTS, variants_enabled, fetch_variants, ranked_variants, get_stats as get_variant_stats
+from .parse_pool import parse_basic
+from .parser import _blank_basic
+from .provenance import run_strategies, get_stats as get_provenance_stats
+from .progress import Progress, iter_events
+from .shared_cache import get_shared_cache
+from .negative_cache import get_negative_cache, dead_reason
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from typing import Callable, Dict, Any, Iterator, Optional, List, Tuple
 
-from typing import Dict, Any, Optional
+# 目前執行緒這次 inspect 的 BrowserSession（FBIG_BROWSER_SESSION=1），供二段抓取沿用同一個 context
+_session_local = threading.local()
 
 
 
@@ -88,33 +104,21 @@ def _extract_followers_from_html(html: str) -> Optional[int]:
                 return n
     return None
 
-def _resolve_final_url_requests(url: str, timeout: int = 8) -> Optional[str]:
-    """
-    使用 requests 嘗試跟隨 share/r 等短連結的最終轉址（僅拿最終 URL，不取 HTML）
-    """
-    try:
-        import requests
-        r = requests.get(
-            url,
-            timeout=timeout,
-            allow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
-            },
-        )
-        if r.history and r.url:
-            return r.url
-    except Exception:
-        pass
-    return None
-
-def _resolve_final_url_playwright(url: str, timeout_ms: int = 15000, storage_state: Optional[str] = None) -> Optional[str]:
+def _resolve_final_url_playwright(
+    url: str,
+    timeout_ms: int = 15000,
+    storage_state: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Optional[str]:
     """
     使用 Playwright 瀏覽到 share/r 類型網址，等待 networkidle，回傳最終實際 URL。
+    cancel 被設定時提早結束並關閉瀏覽器（競速中其他策略已勝出）。
     """
+    if os.getenv("FBIG_DISABLE_PLAYWRIGHT") == "1":
+        return None
     try:
         from .play_fetcher import resolve_final_url as _resolve_url_play
-        final_u = _resolve_url_play(url, timeout=int(timeout_ms/1000), storage_state=storage_state)
+        final_u = _resolve_url_play(url, timeout=int(timeout_ms/1000), storage_state=storage_state, cancel=cancel)
         return final_u
     except Exception:
         return None
@@ -223,6 +227,75 @@ def _extract_final_permalink_from_html(html: str) -> Optional[str]:
     return None
 
 
+def _race_share_resolution(
+    url: str,
+    html: str,
+    storage_state: Optional[str] = None,
+    hedge_ms: Optional[int] = None,
+) -> Tuple[Optional[str], Optional[str], List[Dict[str, Any]]]:
+    """
+    以競速方式解析 share 連結的最終 permalink：
+      1) html：從已抓到的 HTML 直接抽取（立即開始）
+      2) http：body-less 轉址鏈（同時開始）
+      3) browser：Playwright，只有前兩者在 hedge 延遲（FBIG_SHARE_HEDGE_MS，預設 1500ms）
+         內沒有結果、或都已失敗時才啟動
+    第一個合法（非 /share/）的結果勝出，其餘尚未開始的取消；已啟動的瀏覽器收到 cancel 後關閉。
+    各策略各自記錄轉址鏈，回傳 (final_url, 勝出策略, 勝出策略的 redirect_hops)。
+    """
+    if hedge_ms is None:
+        hedge_ms = int(os.getenv("FBIG_SHARE_HEDGE_MS", "1500"))
+    allow_browser = os.getenv("FBIG_DISABLE_PLAYWRIGHT") != "1"
+    cancel = threading.Event()
+    shared = get_shared_cache()
+    hit = shared.get("share", url) if shared else None
+    if hit and hit.get("final_url"):
+        return hit["final_url"], "shared_cache", []
+
+    def _valid(u: Optional[str]) -> bool:
+        return bool(u) and "facebook.com/share/" not in u
+
+    def _html() -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        return _extract_final_permalink_from_html(html), []
+
+    def _http() -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        res = follow_redirects(url, storage_state=storage_state)
+        return (res["final_url"] if res["hops"] else None), res["hops"]
+
+    def _browser() -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        return _resolve_final_url_playwright(url, 15000, storage_state, cancel), []
+
+    ex = ThreadPoolExecutor(max_workers=3)
+    futs = {
+        ex.submit(_html): "html",
+        ex.submit(_http): "http",
+    }
+    browser_started = False
+    hedge_at = time.time() + hedge_ms / 1000
+    try:
+        while futs:
+            timeout = None if browser_started or not allow_browser else max(0.0, hedge_at - time.time())
+            done, _ = wait(list(futs), timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                name = futs.pop(f)
+                try:
+                    u, hops = f.result()
+                except Exception:
+                    u, hops = None, []
+                if _valid(u):
+                    if shared:
+                        shared.put("share", url, {"final_url": u, "by": name})
+                    return u, name, hops
+            if allow_browser and not browser_started and (not futs or time.time() >= hedge_at):
+                futs[ex.submit(_browser)] = "browser"
+                browser_started = True
+        return None, None, []
+    finally:
+        cancel.set()
+        for f in futs:
+            f.cancel()
+        ex.shutdown(wait=False)
+
+
 def _extract_owner_id_from_html(html: str) -> Optional[str]:
     """
     從 HTML 中抽出 owner/page/profile 的數字 ID，常見鍵：owner_id/pageID/entity_id/profile_id。
@@ -489,6 +562,192 @@ def _extract_page_slug_by_label(html: str) -> Optional[str]:
     return None
 
 
+# ---------- owner_url 具名策略（依序嘗試，順序與停用見 provenance.strategy_order） ----------
+
+_OWNER_SLUG_BAD = ("share", "reel", "watch", "photo.php", "story.php", "permalink.php", "marketplace", "gaming", "friends")
+
+
+def _owner_slug_url(slug: Optional[str]) -> Optional[str]:
+    if slug and slug.lower() not in _OWNER_SLUG_BAD:
+        return f"https://m.facebook.com/{slug}"
+    return None
+
+
+def _owner_by_reels_link(html: str) -> Optional[str]:
+    import re
+    m = re.search(r'href="/([A-Za-z0-9._-]+)/reels/', html)
+    return _owner_slug_url(m.group(1)) if m else None
+
+
+def _owner_by_content_permalink(html: str) -> Optional[str]:
+    import re
+    m = re.search(r'href="/([A-Za-z0-9._-]+)\?[^\"]*ref=content_permalink', html)
+    return _owner_slug_url(m.group(1)) if m else None
+
+
+def _owner_by_profile_url_json(html: str) -> Optional[str]:
+    import re
+    m = re.search(r'"ownerProfileUrl"\s*:\s*"https:\\/\\/m\\.facebook\\.com\\/([^"\\]+)"', html)
+    return _owner_slug_url(m.group(1).split("\\/")[0]) if m else None
+
+
+def _owner_by_abs_anchor(html: str) -> Optional[str]:
+    import re
+    m = re.search(
+        r'<a[^>]+href=["\']https?://(?:www|m)\.facebook\.com/([A-Za-z0-9._-]+)(?:/([A-Za-z0-9._-]+))?(?:\?[^"\']*)?["\']',
+        html,
+        flags=re.I | re.S
+    )
+    if not m:
+        return None
+    cand, nxt = m.group(1), (m.group(2) or "").lower()
+    bad = {"share","reel","watch","photo.php","story.php","permalink.php","marketplace","gaming","friends","groups",
+           "profile.php","data","privacy_sandbox","help","settings","policy","login","pages"}
+    allowed_next = {"","reels","posts","videos","photos","about","pg","timeline"}
+    if cand.lower() not in bad and nxt in allowed_next:
+        return _owner_slug_url(cand)
+    return None
+
+
+def _owner_by_profile_id_link(html: str) -> Optional[str]:
+    import re
+    m = re.search(r'href="/profile\.php\?[^\"]*\bid=(\d+)', html)
+    return f"https://m.facebook.com/profile.php?id={m.group(1)}" if m else None
+
+
+def _owner_by_reels_tab(html: str) -> Optional[str]:
+    import re
+    m = re.search(r'href="/([A-Za-z0-9._-]+)/\?[^\"]*reels_tab', html)
+    return _owner_slug_url(m.group(1)) if m else None
+
+
+def _owner_by_html_slug(html: str) -> Optional[str]:
+    slug = _extract_owner_slug_from_html(html)
+    return f"https://m.facebook.com/{slug}" if slug else None
+
+
+def _owner_by_profile_aria(html: str) -> Optional[str]:
+    import re
+    from urllib.parse import urljoin
+    m = re.search(r'aria-label="查看擁有者個人檔案"[^>]+href="(/profile\.php\?[^"\\\']+)"', html)
+    if not m:
+        m = re.search(r'aria-label="View owner profile"[^>]+href="(/profile\.php\?[^"\\\']+)"', html)
+    if not m:
+        return None
+    href = m.group(1).replace("&amp;", "&")
+    return urljoin("https://m.facebook.com", href.split("&")[0])
+
+
+def _owner_by_role_link(html: str) -> Optional[str]:
+    slug = _extract_owner_slug_from_role_link(html)
+    return f"https://m.facebook.com/{slug}" if slug else None
+
+
+OWNER_HTML_STRATEGIES = (
+    ("reels_link", _owner_by_reels_link),
+    ("content_permalink", _owner_by_content_permalink),
+    ("owner_profile_url", _owner_by_profile_url_json),
+    ("abs_anchor", _owner_by_abs_anchor),
+    ("profile_id_link", _owner_by_profile_id_link),
+    ("reels_tab", _owner_by_reels_tab),
+    ("html_slug", _owner_by_html_slug),
+    ("owner_profile_aria", _owner_by_profile_aria),
+    ("role_link", _owner_by_role_link),
+)
+
+
+def _note_owner_source(data: Dict[str, Any], source: str) -> None:
+    """在 basic.provenance 記下最後設定 owner_url 的步驟（parser 策略以外的 inspect 步驟）。"""
+    prov = (data.get("basic") or {}).get("provenance")
+    if isinstance(prov, dict):
+        prov["owner_url"] = source
+
+def _fetch_follow_up(
+    url: str, storage_state: Optional[str] = None, info: Optional[Dict[str, Any]] = None,
+) -> Optional[str]:
+    """
+    二段抓取（owner 頁 / 追蹤數變體 / final permalink）共用流程，順序與主抓取相同：
+    有登入狀態時先用帶 cookies 的 requests（成本約為 headless 載入的 1/20），
+    再退回匿名 requests，兩者都失敗才開 Playwright。
+    瀏覽器步驟只在有登入狀態或本次 inspect 已有 BrowserSession 時進行（後者在同一個 context 開頁）。
+    設定 FBIG_STORAGE_STATES 時改由多帳號池分配登入 session。
+    info 若提供 dict，寫入最後一次抓取的診斷欄位（bytes 等，見 fetcher.fetch_html）；
+    由瀏覽器取得時 bytes 為 HTML 的 UTF-8 長度。
+    """
+    html = None
+    no_play = os.getenv("FBIG_DISABLE_PLAYWRIGHT") == "1"
+    session = getattr(_session_local, "session", None)
+    pool = get_pool()
+    if pool is not None:
+        html, _ = pool.fetch(url, browser=False, info=info)
+    elif storage_state:
+        html = fetch_html(url, storage_state=storage_state, info=info)
+    if not html:
+        html = fetch_html(url, info=info)
+    if not html and not no_play:
+        if pool is not None:
+            html, _ = pool.fetch(url, http=False)
+        if not html and session is not None:
+            html = session.fetch(url)
+        elif not html and pool is None and storage_state:
+            from .play_fetcher import fetch_with_playwright as _play_fetch
+            html = _play_fetch(url, storage_state=storage_state)
+        if html and info is not None:
+            info["bytes"] = len(html.encode("utf-8"))
+    return html
+
+
+def _page_followers_from_html(html: Optional[str]) -> Optional[int]:
+    """
+    把 owner 頁 HTML 立即化約成追蹤數（parse_fb_page_basic → 直接 regex 備援），
+    呼叫端不必再保留整頁 HTML 或 DOM。
+    """
+    if not html:
+        return None
+    n = parse_basic("fb_page", html).get("followers")
+    if n is None:
+        n = _extract_followers_from_html(html)
+    return n if isinstance(n, int) else None
+
+
+def _fetch_page_followers(
+    url: str, storage_state: Optional[str] = None, info: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """
+    抓取 owner 頁（或其變體）並只回傳追蹤數；HTML 在函式返回時即釋放。共用快取命中時不抓取。
+    info 同 _fetch_follow_up（快取命中時不寫入）。
+    """
+    n = _owner_cached(url).get("followers")
+    if n is None:
+        n = _page_followers_from_html(_fetch_follow_up(url, storage_state, info))
+        _owner_remember(url, followers=n)
+    return n
+
+
+def _owner_followers_by_variants(owner_url: str, storage_state: Optional[str] = None) -> Optional[int]:
+    """owner 頁本身沒有追蹤數時，依 fb_owner 變體（/about、?v=followers）的記錄成功率逐一嘗試並回報統計。"""
+    for vname, ov in ranked_variants("fb_owner", owner_url):
+        vinfo: Dict[str, Any] = {}
+        n = _fetch_page_followers(ov, storage_state, vinfo)
+        get_variant_stats().record("fb_owner", vname, n is not None, vinfo.get("bytes"))
+        if n is not None:
+            return n
+    return None
+
+
+def _owner_cached(owner_url: str) -> Dict[str, Any]:
+    """FBIG_SHARED_CACHE 中此 owner 頁已擷取過的欄位（followers / name），其他 worker 程序寫入的也算。"""
+    shared = get_shared_cache()
+    return (shared.get("owner", owner_url) if shared else None) or {}
+
+
+def _owner_remember(owner_url: str, **fields: Any) -> None:
+    shared = get_shared_cache()
+    fields = {k: v for k, v in fields.items() if v is not None}
+    if shared is not None and fields:
+        shared.put("owner", owner_url, {**_owner_cached(owner_url), **fields})
+
+
 def _upgrade_profile_to_page_slug(owner_url: Optional[str], storage_state: Optional[str] = None) -> Optional[str]:
     """
     若 owner_url 是 profile.php?id=...，嘗試開啟該頁並從頁內抽取可用的粉專 slug，
@@ -501,13 +760,7 @@ def _upgrade_profile_to_page_slug(owner_url: Optional[str], storage_state: Optio
         return None
     try:
         
-        html_owner = None
-        if storage_state:
-            from .play_fetcher import fetch_with_playwright as _play_fetch
-            html_owner = _play_fetch(owner_url, storage_state=storage_state)
-        if not html_owner:
-            from .fetcher import fetch_html as _fetch_html
-            html_owner = _fetch_html(owner_url)
+        html_owner = _fetch_follow_up(owner_url, storage_state)
         if not html_owner:
             return None
 
@@ -551,40 +804,127 @@ def _upgrade_profile_to_page_slug(owner_url: Optional[str], storage_state: Optio
 def _format_basic_zh(kind: str, basic: Dict[str, Any]) -> Dict[str, Any]:
     """
     將 internal basic 欄位轉換為中文「基礎資訊」欄位。
-    只輸出需求列的欄位，並附加「數據來源」「備註」。
+    只輸出需求列的欄位，並附加「數據來源」「備註」（欄位對應見 result.ZH_FIELDS）。
     """
-    basic = basic or {}
-    zh: Dict[str, Any] = {}
-    if kind == "fb_page":
-        zh["粉絲專頁追蹤數"] = basic.get("followers")
-    elif kind == "fb_post":
-        zh["貼文按讚數"] = basic.get("likes")
-        zh["貼文分享數"] = basic.get("shares")
-        zh["貼文所屬粉絲專頁追蹤數"] = basic.get("page_followers")
-    elif kind == "fb_group":
-        zh["社團成員數"] = basic.get("members")
-    elif kind == "fb_group_post":
-        zh["貼文按讚數"] = basic.get("likes")
-        zh["貼文分享數"] = basic.get("shares")
-        zh["貼文所屬社團成員數"] = basic.get("group_members")
-    elif kind == "ig_profile":
-        zh["帳號追蹤數"] = basic.get("followers")
-    elif kind == "ig_post":
-        zh["貼文按讚數"] = basic.get("likes")
-        zh["貼文所屬帳號追蹤數"] = basic.get("owner_followers")
-    zh["數據來源"] = basic.get("source_hint")
-    zh["備註"] = basic.get("note")
-    return zh
-
-def inspect_url(url: str) -> dict:
+    return format_basic_zh(kind, basic)
+
+def inspect_url(
+    url: str,
+    budget_mb: Optional[int] = None,
+    compact: bool = False,
+    profile: Optional[bool] = None,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+):
     """
-    Inspect a social URL: classify -> (optional rewrite) -> fetch -> parse.
-
-    - Rewrites www.facebook.com to m.facebook.com for better unauthenticated access.
-    - Returns a stable schema with meta diagnostics.
+    Inspect a social URL: resolve link -> classify -> (optional rewrite) -> fetch -> parse.
+
+    - l.facebook.com / lm.facebook.com / instagram.com/l/ wrappers are decoded locally;
+      third-party short links are followed without downloading pages (cached in
+      FBIG_RESOLVE_CACHE when set).
+
+    - Rewrites www.facebook.com to m.facebook.com for better unauthenticated access; anonymous
+      fetches try lightweight variants (m / mbasic / www, IG embed, owner /about) ranked by
+      recorded success rate and bytes (FBIG_VARIANT_STATS; FBIG_VARIANTS=0 disables).
+    - With FBIG_STORAGE_STATE set, tries cookie-authenticated requests before any browser.
+    - With FBIG_STORAGE_STATES set, logged-in fetches are spread over a pool of accounts.
+    - budget_mb (default FBIG_MEMORY_BUDGET_MB) reserves memory for this call; concurrent
+      calls wait until the host limit (FBIG_MEMORY_LIMIT_MB) has room, and each page
+      read is capped at budget_mb / 8.
+    - FBIG_FORCE_PLAYWRIGHT=1 skips requests; FBIG_DISABLE_PLAYWRIGHT=1 never launches a browser.
+    - FBIG_HEDGE=1 starts Playwright in parallel when requests is slower than its recent
+      FBIG_HEDGE_PERCENTILE latency, within a FBIG_HEDGE_BUDGET share of requests.
+    - FBIG_CAPTURE_COUNTERS=1 reads counters from GraphQL/XHR JSON responses during
+      Playwright loads and stops waiting once the fields for the URL type are found.
+    - FBIG_BROWSER_SESSION=1 makes the browser fallback a single navigation that also
+      yields the final URL and owner links; owner pages open in the same warm context.
+    - FBIG_SHARED_CACHE=/dev/shm/<file> shares owner followers / names and share-link
+      resolutions between all worker processes on the host (see shared_cache.py).
+    - Known-dead URLs (fetch_failed / login_wall / not_found, keyed by canonical URL) return
+      the cached reason within a per-reason TTL (see negative_cache.py; FBIG_NEGATIVE_CACHE=0
+      disables); meta.dead_reason reports the reason (meta.negative_cache is set on a
+      cached hit). Dead not_found / login_wall results have the same shape either way:
+      status "ok" with blank fields; fetch_failed is status "error" with data None.
+    - FBIG_EXTRACT_MODE=evaluate extracts anchors / meta / counter text inside the page
+      instead of transferring the full DOM from Playwright.
+    - profile=True (or sampling with FBIG_PROFILE_RATE) records a sampling / cProfile
+      profile plus per-call-site regex timings and BeautifulSoup counts in meta.profile
+      (files under FBIG_PROFILE_DIR when set; see profiling.py).
+    - on_update(event) receives progressive results (see progress.py): "primary" right
+      after the first fetch + parse, "update" as page_followers / owner_url / owner_name /
+      final_permalink arrive, then "final" with the same value this call returns.
+      iter_inspect() is the generator form.
+    - Returns a stable schema with meta diagnostics; compact=True returns a slotted
+      InspectResult (see result.py) whose to_dict() gives the same schema.
+    """
+    budget = budget_mb or default_budget_mb()
+    profile_summary = None
+    progress = Progress(on_update) if on_update is not None else None
+    with inspection_budget(budget):
+        try:
+            if should_profile(profile):
+                with profile_session(url) as profile_summary:
+                    result = _inspect_url(url, progress)
+            else:
+                result = _inspect_url(url, progress)
+        finally:
+            _session_local.session = None
+    result["meta"]["memory_budget_mb"] = budget
+    if profile_summary is not None:
+        result["meta"]["profile"] = profile_summary
+    if compact:
+        result = InspectResult.from_dict(result, url=url)
+    if progress is not None:
+        progress.final(result)
+    return result
+
+
+def iter_inspect(url: str, **kwargs) -> Iterator[Dict[str, Any]]:
+    """inspect_url 的 generator 形式：依序產出 primary / update / final 事件（見 progress.py）。"""
+    return iter_events(lambda on_update: inspect_url(url, on_update=on_update, **kwargs))
+
+
+def _browser_fetch(
+    url: str,
+    type_tag: str,
+    storage_state: Optional[str],
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[Optional[str], Dict[str, int]]:
     """
+    Playwright 抓取，回傳 (html, 計數)；FBIG_CAPTURE_COUNTERS=1 時計數為網路回應中擷取到的值，否則為空。
+    FBIG_EXTRACT_MODE=evaluate 時在頁內擷取所需片段，回傳精簡 HTML 而非整份 DOM。
+    cancel 被設定時放棄載入並關閉瀏覽器（hedge 中 requests 先勝出）。
+    """
+    compact = os.getenv("FBIG_EXTRACT_MODE") == "evaluate"
+    if capture_enabled():
+        from .play_fetcher import fetch_with_capture
+        return fetch_with_capture(url, type_tag, storage_state=storage_state, compact=compact, cancel=cancel)
+    from .play_fetcher import fetch_with_playwright
+    return fetch_with_playwright(url, storage_state=storage_state, compact=compact, cancel=cancel), {}
+
+
+def _lap(stages: Dict[str, int], name: str, t_start: float) -> float:
+    """記錄一個階段的耗時（ms，累加），回傳下一階段的起點。"""
+    now = time.time()
+    stages[name] = stages.get(name, 0) + int((now - t_start) * 1000)
+    return now
+
+
+def _inspect_url(url: str, progress: Optional[Progress] = None) -> dict:
     t0 = time.time()
+    stages: Dict[str, int] = {}
+    redirect_hops: List[Dict[str, Any]] = []
+    share_resolved_by = None
     fetched_with = "requests"
+    storage_state = os.getenv("FBIG_STORAGE_STATE")
+
+    # 外連包裝 / 第三方短網址先解析成真正的 FB / IG 網址再分類
+    t_stage = time.time()
+    input_url = url
+    link = resolve_link(url, storage_state=storage_state)
+    if link["final_url"] != url:
+        url = link["final_url"]
+        redirect_hops.extend(link["hops"])
+    _lap(stages, "resolve_link", t_stage)
     type_tag = classify(url)
 
     
@@ -602,130 +942,208 @@ def inspect_url(url: str) -> dict:
             
 
     force_play = os.getenv("FBIG_FORCE_PLAYWRIGHT") == "1"
-    storage_state = os.getenv("FBIG_STORAGE_STATE")
-
+    no_play = os.getenv("FBIG_DISABLE_PLAYWRIGHT") == "1" and not force_play
+
+    pool = get_pool()
+
+    # 已知失效（刪除 / 不存在 / 總是失敗）的網址在 TTL 內直接回傳上次的原因
+    neg = get_negative_cache() if not force_play else None
+    if neg is not None:
+        logged_in = bool(storage_state or pool)
+        known = neg.check(url, logged_in) or (neg.check(input_url, logged_in) if input_url != url else None)
+        if known:
+            reason = known[0]
+            meta = build_meta(
+                duration_ms=int((time.time() - t0) * 1000),
+                resolved_url=url if url != input_url else None,
+                stages_ms=stages,
+                redirect_hops=redirect_hops,
+                dead_reason=reason,
+                negative_cache={"reason": reason, "expires_in_s": int(known[1])},
+            )
+            if reason == "fetch_failed":
+                return {"status": "error", "type": type_tag, "data": None, "meta": meta, "error": reason}
+            # not_found / login_wall：與新檢測判定失效時相同的形狀（status ok、空白欄位、meta.dead_reason）
+            data = {k: None for k in OG_FIELDS}
+            data["basic"] = dict(_blank_basic(note="not_found"), provenance={})
+            zh_basic = _format_basic_zh(type_tag, data["basic"])
+            data["基礎資訊"] = zh_basic
+            data["kind"] = TAG_TO_KIND.get(type_tag, "unknown")
+            return {"status": "ok", "type": type_tag, "data": data, "基礎資訊": zh_basic, "meta": meta, "error": None}
+
+    t_stage = time.time()
     html = None
-    if not force_play:
-        html = fetch_html(rewritten_url)
-
-    if not html:
-        from .play_fetcher import fetch_with_playwright
-        html = fetch_with_playwright(rewritten_url, storage_state=storage_state)
+    # 每次抓取的診斷（fetcher.fetch_html / SessionPool.fetch 的 info）：login_wall 訊號與網路耗時。
+    # used_info 為產生最後採用 html 的那一次；requests 串流讀到 </head> 時已擷取的 og:*
+    # （info["head_meta"]）只沿用這一次的，其餘路徑之後再掃描 html
+    fetch_infos: List[Dict[str, Any]] = []
+    used_info: Optional[Dict[str, Any]] = None
+    fetch_s: Optional[float] = None  # 產生 html 的單次抓取耗時（adaptive 的延遲依此判斷）
+    on_head = (lambda meta: progress.head(type_tag, meta)) if progress is not None else None
+
+    def _fetch_main(info: Dict[str, Any], **kwargs) -> Optional[str]:
+        fetch_infos.append(info)
+        return fetch_html(rewritten_url, info=info, on_head=on_head, **kwargs)
+
+    pool_account = None  # 帳號池 requests 步驟用的帳號；之後的瀏覽器備援沿用，不再等 rate limit
+    if pool is not None and not force_play:
+        info: Dict[str, Any] = {}
+        fetch_infos.append(info)
+        html, via = pool.fetch(rewritten_url, browser=False, info=info)
+        pool_account = info.get("account")
         if html:
+            fetched_with, used_info = via, info
+    elif storage_state and not force_play:
+        info = {}
+        html = _fetch_main(info, storage_state=storage_state)
+        if html:
+            fetched_with, used_info = "requests_login", info
+    hedge_info = None
+    variant_basic, variant_report = None, None
+    network_counters: Dict[str, int] = {}
+    if not html and not force_play and hedge_enabled() and not no_play:
+        # requests 慢於近期分位數時並行啟動 Playwright，取先回傳者
+        page_cap = current_page_cap()
+        primary_info: Dict[str, Any] = {}
+        backup_t0: List[float] = []
+
+        def _backup(cancel):
+            backup_t0.append(time.time())
+            return _browser_fetch(rewritten_url, type_tag, storage_state, cancel)
+
+        html, winner, hedge_info, found = hedged_fetch(
+            lambda info: _fetch_main(primary_info.setdefault("info", info), max_bytes=page_cap),
+            _backup,
+        )
+        if winner == "primary":
+            used_info = primary_info["info"]
+        elif winner == "backup":
+            fetch_s = time.time() - backup_t0[0]
             fetched_with = "playwright_login" if storage_state else "playwright"
+            # 計數只在 backup 勝出時採用；落敗的 backup 已被取消，不會再寫入
+            network_counters.update(found or {})
+    elif not html and not force_play:
+        if variants_enabled() and type_tag in VARIANTS:
+            # 依成功率 / 位元組排序的輕量變體，先試預期成本最低者
+            variant_infos: List[Dict[str, Any]] = []
+            html, variant_basic, variant_url, variant_report = fetch_variants(
+                url, type_tag, infos=variant_infos, on_head=on_head,
+            )
+            fetch_infos.extend(variant_infos)
+            if variant_url:
+                rewritten_url = variant_url
+                was_rewritten = variant_url != url
+                # 報告與 infos 同序，且各變體網址不重複
+                used_info = next(i for r, i in zip(variant_report, variant_infos) if r["url"] == variant_url)
+        else:
+            info = {}
+            html = _fetch_main(info)
+            if html:
+                used_info = info
+
+    if not html and pool is not None and not no_play:
+        info = {}
+        fetch_infos.append(info)
+        html, via = pool.fetch(rewritten_url, http=False, info=info, account=pool_account)
+        if html:
+            fetched_with, used_info = via, info
+    browser_nav = None
+    if not html and not no_play:
+        t_browser = time.time()
+        if os.getenv("FBIG_BROWSER_SESSION") == "1" and not capture_enabled():
+            # 一次導航取得最終網址 + HTML + owner 連結；後續 owner 頁沿用同一個 context
+            from .play_fetcher import BrowserSession
+            session = BrowserSession(storage_state, compact=os.getenv("FBIG_EXTRACT_MODE") == "evaluate")
+            _session_local.session = session
+            browser_nav = session.navigate(rewritten_url)
+            html = browser_nav["html"]
+        else:
+            html, found = _browser_fetch(rewritten_url, type_tag, storage_state)
+            network_counters.update(found)
+        if html:
+            fetch_s = time.time() - t_browser
+            fetched_with = "playwright_login" if storage_state else "playwright"
+    t_stage = _lap(stages, "fetch", t_stage)
+    if used_info is not None and used_info.get("network_s") is not None:
+        fetch_s = used_info["network_s"]
+    head_meta = used_info.get("head_meta") if used_info is not None else None
+    # 任一次抓取遇到登入牆（cookies 失效 / 被導向登入頁）都回報給 adaptive，即使之後的備援成功
+    login_wall = any(i.get("login_wall") for i in fetch_infos)
+    fetch_ms = int(fetch_s * 1000) if fetch_s is not None else None
 
     if not html:
+        if neg is not None:
+            neg.record(url, "fetch_failed")
         return {
             "status": "error",
             "type": type_tag,
             "data": None,
-            "meta": {
-                "duration_ms": int((time.time() - t0) * 1000),
-                "fetched_with": fetched_with,
-                "was_rewritten": was_rewritten,
-                "rewritten_url": rewritten_url if was_rewritten else None,
-            },
+            "meta": build_meta(
+                duration_ms=int((time.time() - t0) * 1000),
+                fetched_with=fetched_with,
+                was_rewritten=was_rewritten,
+                rewritten_url=rewritten_url if was_rewritten else None,
+                resolved_url=url if url != input_url else None,
+                stages_ms=stages,
+                redirect_hops=redirect_hops,
+                hedge=hedge_info,
+                variants=variant_report,
+                network_counters=network_counters or None,
+                owner_links=(browser_nav or {}).get("owner_links") or None,
+                login_wall=login_wall,
+                dead_reason="fetch_failed",
+            ),
             "error": "fetch_failed",
         }
 
-    data = {
-        "og:title": None,
-        "og:description": None,
-        "og:image": None,
-        "og:url": None,
-        "og:site_name": None,
-    }
+    # og:* 只掃描 <head>，不建 DOM；requests 串流時已邊下載邊擷取過
+    head = head_meta if head_meta is not None else extract_head_meta(html)
+    data = {k: head[k] for k in OG_FIELDS}
+    t_stage = _lap(stages, "head_meta", t_stage)
 
     try:
-        if type_tag == "fb_page":
-            data["basic"] = parse_fb_page_basic(html)
-        elif type_tag == "fb_post":
-            data["basic"] = parse_fb_post_basic(html)
-        elif type_tag == "fb_group":
-            data["basic"] = parse_fb_group_basic(html)
-        elif type_tag == "fb_group_post":
-            data["basic"] = parse_fb_group_post_basic(html)
-        elif type_tag == "ig_profile":
-            data["basic"] = parse_ig_profile_basic(html)
-        elif type_tag == "ig_post":
-            data["basic"] = parse_ig_post_basic(html)
-        else:
-            data["basic"] = {}
+        data["basic"] = variant_basic if variant_basic is not None else parse_basic(type_tag, html)
     except Exception as e:
         data["basic"] = {"error": str(e)}
+    if network_counters and "error" not in data["basic"]:
+        apply_counters(data["basic"], network_counters)
+    # 失效判定先用來略過後續步驟；是否記入負面快取等所有後續步驟結束後再決定
+    dead = dead_reason(html, data["basic"])
+    t_stage = _lap(stages, "parse", t_stage)
+    if progress is not None:
+        # 主要欄位先送出；之後 owner / 分享連結步驟寫入的欄位會逐一送出 update
+        data = progress.watch(data)
+        primary = dict(data)
+        primary["基礎資訊"] = _format_basic_zh(type_tag, data.get("basic", {}))
+        primary["kind"] = TAG_TO_KIND.get(type_tag, "unknown")
+        progress.primary(type_tag, primary)
 
     
+    # 匿名開啟 /share/ 連結常落在帶有「內容無法顯示」文案的中介頁；分享連結要先解析完才判斷是否失效
+    is_fb_share = "facebook.com/share/" in (rewritten_url or url)
     try:
         
-        if type_tag in ("fb_post", "fb_group_post"):
+        if type_tag in ("fb_post", "fb_group_post") and (dead != "not_found" or is_fb_share):
             basic = data.get("basic") or {}
-            
+            import re as _reG
+
             if not basic.get("owner_url"):
-                import re as _reG
-                slugG = None
-                m = _reG.search(r'href="/([A-Za-z0-9._-]+)/reels/', html)
-                if m:
-                    slugG = m.group(1)
-                if not slugG:
-                    m = _reG.search(r'href="/([A-Za-z0-9._-]+)\?[^\"]*ref=content_permalink', html)
-                    if m:
-                        slugG = m.group(1)
-                if not slugG:
-                    m = _reG.search(r'"ownerProfileUrl"\s*:\s*"https:\\/\\/m\\.facebook\\.com\\/([^"\\]+)"', html)
-                    if m:
-                        slugG = m.group(1).split("\\/")[0]
-                
-                if not slugG:
-                    m = _reG.search(
-                        r'<a[^>]+href=["\']https?://(?:www|m)\.facebook\.com/([A-Za-z0-9._-]+)(?:/([A-Za-z0-9._-]+))?(?:\?[^"\']*)?["\']',
-                        html,
-                        flags=_reG.I | _reG.S
-                    )
-                    if m:
-                        cand, nxt = m.group(1), (m.group(2) or "").lower()
-                        bad = {"share","reel","watch","photo.php","story.php","permalink.php","marketplace","gaming","friends","groups",
-                               "profile.php","data","privacy_sandbox","help","settings","policy","login","pages"}
-                        allowed_next = {"","reels","posts","videos","photos","about","pg","timeline"}
-                        if cand.lower() not in bad and nxt in allowed_next:
-                            slugG = cand
-                if slugG and slugG.lower() not in ("share", "reel", "watch", "photo.php", "story.php", "permalink.php", "marketplace", "gaming", "friends"):
-                    data.setdefault("basic", {})["owner_url"] = f"https://m.facebook.com/{slugG}"
-                if not data["basic"].get("owner_url"):
-                    m = _reG.search(r'href="/profile\.php\?[^\"]*\bid=(\d+)', html)
-                    if m:
-                        data["basic"]["owner_url"] = f"https://m.facebook.com/profile.php?id={m.group(1)}"
-                if not data["basic"].get("owner_url"):
-                    m = _reG.search(r'href="/([A-Za-z0-9._-]+)/\?[^\"]*reels_tab', html)
-                    if m:
-                        _slug2 = m.group(1)
-                        if _slug2.lower() not in ("share", "reel", "watch", "photo.php", "story.php", "permalink.php", "marketplace", "gaming", "friends"):
-                            data["basic"]["owner_url"] = f"https://m.facebook.com/{_slug2}"
-                
-                if not data["basic"].get("owner_url") and not slugG:
-                    _slug_auto = _extract_owner_slug_from_html(html)
-                    if _slug_auto:
-                        data["basic"]["owner_url"] = f"https://m.facebook.com/{_slug_auto}"
-            
-            if not data["basic"].get("owner_url"):
-                m = _reG.search(r'aria-label="查看擁有者個人檔案"[^>]+href="(/profile\.php\?[^"\\\']+)"', html)
-                if not m:
-                    
-                    m = _reG.search(r'aria-label="View owner profile"[^>]+href="(/profile\.php\?[^"\\\']+)"', html)
-                if m:
-                    href = m.group(1).replace("&amp;", "&")
-                    from urllib.parse import urljoin
-                    owner_url = urljoin("https://m.facebook.com", href.split("&")[0])
-                    data["basic"]["owner_url"] = owner_url
-            
-            if not data["basic"].get("owner_url"):
-                _slug_role = _extract_owner_slug_from_role_link(html)
-                if _slug_role:
-                    data["basic"]["owner_url"] = f"https://m.facebook.com/{_slug_role}"
+                owner_prov: Dict[str, Any] = {}
+                owner_url = run_strategies(
+                    "inspect", "owner_url",
+                    [(name, partial(fn, html)) for name, fn in OWNER_HTML_STRATEGIES],
+                    owner_prov,
+                )
+                get_provenance_stats().observe("inspect", owner_prov)
+                if owner_url:
+                    data.setdefault("basic", {})["owner_url"] = owner_url
+                    _note_owner_source(data, "inspect:" + owner_prov["owner_url"]["by"])
             
             if not data["basic"].get("owner_url") or "profile.php" in (data["basic"].get("owner_url") or ""):
                 _slug_from_a = _extract_owner_from_anchors(html)
                 if _slug_from_a:
                     data["basic"]["owner_url"] = f"https://m.facebook.com/{_slug_from_a}"
+                    _note_owner_source(data, "inspect:anchors")
 
             
             try:
@@ -734,6 +1152,7 @@ def inspect_url(url: str) -> dict:
                     upgraded = _upgrade_profile_to_page_slug(cur_owner, storage_state)
                     if upgraded:
                         data["basic"]["owner_url"] = upgraded
+                        _note_owner_source(data, "inspect:profile_upgrade")
             except Exception:
                 pass
             
@@ -779,25 +1198,30 @@ def inspect_url(url: str) -> dict:
             except Exception:
                 pass
 
+            if not data.get("basic", {}).get("owner_url") and browser_nav and browser_nav["owner_links"]:
+                data.setdefault("basic", {})["owner_url"] = browser_nav["owner_links"][0]
+                _note_owner_source(data, "inspect:owner_links")
+
             owner_for_follow = data.get("basic", {}).get("owner_url")
             
             if not data.get("basic", {}).get("owner_name"):
                 
                 try:
-                    html_owner2 = fetch_html(owner_for_follow)
+                    dn2 = _owner_cached(owner_for_follow).get("name")
+                    if not dn2:
+                        dn2 = _extract_owner_display_name(fetch_html(owner_for_follow) or "")
+                        _owner_remember(owner_for_follow, name=dn2)
                 except Exception:
-                    html_owner2 = None
-                dn2 = _extract_owner_display_name(html_owner2 or "")
+                    dn2 = None
                 if dn2:
                     data.setdefault("basic", {})["owner_name"] = dn2
+            if owner_for_follow and data["basic"].get("page_followers") is None:
+                cached_n = _owner_cached(owner_for_follow).get("followers")
+                if cached_n is not None:
+                    data["basic"]["page_followers"] = cached_n
             if owner_for_follow and (data["basic"].get("page_followers") is None and "/groups/" not in owner_for_follow):
                 
-                html_owner = None
-                if storage_state:
-                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                    html_owner = _play_fetch(owner_for_follow, storage_state=storage_state)
-                if not html_owner:
-                    html_owner = fetch_html(owner_for_follow)
+                html_owner = _fetch_follow_up(owner_for_follow, storage_state)
                 
                 try:
                     if "profile.php" in owner_for_follow and "/groups/" not in owner_for_follow and html_owner:
@@ -815,67 +1239,24 @@ def inspect_url(url: str) -> dict:
                                 
                                 owner_for_follow = f"https://m.facebook.com/{cand}"
                                 data.setdefault("basic", {})["owner_url"] = owner_for_follow
-                                html_owner = None
-                                if storage_state:
-                                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                                    html_owner = _play_fetch(owner_for_follow, storage_state=storage_state)
-                                if not html_owner:
-                                    html_owner = fetch_html(owner_for_follow)
+                                html_owner = _fetch_follow_up(owner_for_follow, storage_state)
                 except Exception:
                     pass
                 if html_owner:
-                    page_basic = parse_fb_page_basic(html_owner)
-                    if page_basic.get("followers") is not None:
-                        data["basic"]["page_followers"] = page_basic["followers"]
-                    if data["basic"].get("page_followers") is None:
-                        n = _extract_followers_from_html(html_owner)
-                        if isinstance(n, int):
-                            data["basic"]["page_followers"] = n
+                    n_owner = _page_followers_from_html(html_owner)
+                    html_owner = None
+                    if n_owner is not None:
+                        data["basic"]["page_followers"] = n_owner
+                        _owner_remember(owner_for_follow, followers=n_owner)
                     if data["basic"].get("page_followers") is None:
-                        
-                        n_vis = _extract_followers_from_html(html_owner)
-                        if isinstance(n_vis, int):
-                            data["basic"]["page_followers"] = n_vis
-                    if data["basic"].get("page_followers") is None:
-                        variants = []
-                        base = owner_for_follow.rstrip("/")
-                        if "profile.php?id=" in owner_for_follow:
-                            sep = "&" if "?" in owner_for_follow else "?"
-                            variants += [
-                                f"{owner_for_follow}{sep}sk=followers",
-                                f"{owner_for_follow}{sep}v=followers",
-                            ]
-                        else:
-                            variants += [f"{base}/about", f"{base}?v=followers"]
-                        for ov in variants:
-                            html_owner2 = None
-                            if storage_state:
-                                from .play_fetcher import fetch_with_playwright as _play_fetch
-                                html_owner2 = _play_fetch(ov, storage_state=storage_state)
-                            if not html_owner2:
-                                html_owner2 = fetch_html(ov)
-                            if not html_owner2:
-                                continue
-                            pb2 = parse_fb_page_basic(html_owner2)
-                            if pb2.get("followers") is not None:
-                                data["basic"]["page_followers"] = pb2["followers"]
-                                break
-                            n2 = _extract_followers_from_html(html_owner2)
-                            if isinstance(n2, int):
-                                data["basic"]["page_followers"] = n2
-                                break
+                        n2 = _owner_followers_by_variants(owner_for_follow, storage_state)
+                        if n2 is not None:
+                            data["basic"]["page_followers"] = n2
             elif owner_for_follow and "/groups/" in owner_for_follow and data["basic"].get("group_members") is None:
                 
-                html_owner = None
-                if storage_state:
-                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                    html_owner = _play_fetch(owner_for_follow, storage_state=storage_state)
-                if not html_owner:
-                    html_owner = fetch_html(owner_for_follow)
-                if html_owner:
-                    grp_basic = parse_fb_group_basic(html_owner)
-                    if grp_basic.get("members") is not None:
-                        data["basic"]["group_members"] = grp_basic["members"]
+                grp_basic = parse_basic("fb_group", _fetch_follow_up(owner_for_follow, storage_state) or "")
+                if grp_basic.get("members") is not None:
+                    data["basic"]["group_members"] = grp_basic["members"]
 
         
         if type_tag == "ig_post":
@@ -896,39 +1277,34 @@ def inspect_url(url: str) -> dict:
                         uname = m.group(1)
                 if uname:
                     prof = f"https://www.instagram.com/{uname}/"
-                    html_prof = None
-                    if storage_state:
-                        from .play_fetcher import fetch_with_playwright as _play_fetch
-                        html_prof = _play_fetch(prof, storage_state=storage_state)
-                    if not html_prof:
-                        html_prof = fetch_html(prof)
+                    html_prof = _fetch_follow_up(prof, storage_state)
                     if html_prof:
-                        pro_basic = parse_ig_profile_basic(html_prof)
+                        pro_basic = parse_basic("ig_profile", html_prof)
+                        html_prof = None
                         if pro_basic.get("followers") is not None:
                             data.setdefault("basic", {})["owner_followers"] = pro_basic["followers"]
     except Exception:
         pass
+    t_stage = _lap(stages, "owner", t_stage)
 
     
     try:
-        is_fb_share = "facebook.com/share/" in (rewritten_url or url)
         if type_tag in ("fb_post", "fb_group_post") and is_fb_share:
             basic = data.get("basic") or {}
             owner_url = basic.get("owner_url")
             if (not owner_url) or (basic.get("page_followers") is None):
                 storage_state = os.getenv("FBIG_STORAGE_STATE") or None
                 
-                final_u = (
-                    _resolve_final_url_playwright(rewritten_url or url, storage_state=storage_state)
-                    or _resolve_final_url_requests(rewritten_url or url)
-                )
-                
-                if (not final_u) or ("facebook.com/share/" in final_u):
-                    
-                    html_source = html if isinstance(html, str) else ""
-                    extracted = _extract_final_permalink_from_html(html_source)
-                    if extracted:
-                        final_u = extracted
+                html_source = html if isinstance(html, str) else ""
+                nav_final = (browser_nav or {}).get("final_url")
+                if nav_final and "facebook.com/share/" not in nav_final:
+                    # 瀏覽器抓取時已跟隨完 JS 轉址，不必再解析一次
+                    final_u, share_resolved_by = nav_final, "browser_session"
+                else:
+                    final_u, share_resolved_by, share_hops = _race_share_resolution(
+                        rewritten_url or url, html_source, storage_state
+                    )
+                    redirect_hops.extend(share_hops)
 
                 
                 if (not final_u) and (not owner_url):
@@ -937,14 +1313,10 @@ def inspect_url(url: str) -> dict:
                         derived_owner = f"https://m.facebook.com/profile.php?id={owner_id}"
                         data.setdefault("basic", {})["owner_url"] = derived_owner
                         
-                        html_owner = None
-                        if storage_state:
-                            from .play_fetcher import fetch_with_playwright as _play_fetch
-                            html_owner = _play_fetch(derived_owner, storage_state=storage_state)
-                        if not html_owner:
-                            html_owner = fetch_html(derived_owner)
+                        html_owner = _fetch_follow_up(derived_owner, storage_state)
                         if html_owner:
-                            page_basic = parse_fb_page_basic(html_owner)
+                            page_basic = parse_basic("fb_page", html_owner)
+                            html_owner = None
                             if page_basic.get("followers") is not None:
                                 data["basic"]["page_followers"] = page_basic["followers"]
 
@@ -1000,76 +1372,36 @@ def inspect_url(url: str) -> dict:
                         except Exception:
                             pass
                         
-                        html_owner = None
-                        if storage_state:
-                            from .play_fetcher import fetch_with_playwright as _play_fetch
-                            html_owner = _play_fetch(derived_owner, storage_state=storage_state)
-                        if not html_owner:
-                            html_owner = fetch_html(derived_owner)
+                        html_owner = _fetch_follow_up(derived_owner, storage_state)
                         if html_owner:
                             if "/groups/" in derived_owner:
-                                grp_basic = parse_fb_group_basic(html_owner)
+                                grp_basic = parse_basic("fb_group", html_owner)
+                                html_owner = None
                                 if grp_basic.get("members") is not None:
                                     data["basic"]["group_members"] = grp_basic["members"]
-                                    if "基礎資訊" in data and "基礎資訊" in locals():
-                                        pass
                             else:
-                                        page_basic = parse_fb_page_basic(html_owner)
-                                        if page_basic.get("followers") is not None:
-                                            data["basic"]["page_followers"] = page_basic["followers"]
+                                        n_owner = _page_followers_from_html(html_owner)
+                                        html_owner = None
+                                        if n_owner is not None:
+                                            data["basic"]["page_followers"] = n_owner
 
                                         
                                         if data["basic"].get("page_followers") is None:
-                                            n = _extract_followers_from_html(html_owner)
-                                            if isinstance(n, int):
-                                                data["basic"]["page_followers"] = n
-
-                                        
-                                        if data["basic"].get("page_followers") is None:
-                                            variants = []
-                                            base = derived_owner.rstrip("/")
-                                            if "profile.php?id=" in derived_owner:
-                                                sep = "&" if "?" in derived_owner else "?"
-                                                variants += [
-                                                    f"{derived_owner}{sep}sk=followers",
-                                                    f"{derived_owner}{sep}v=followers",
-                                                ]
-                                            else:
-                                                variants += [f"{base}/about", f"{base}?v=followers"]
-
-                                            for ov in variants:
-                                                html_owner2 = None
-                                                if storage_state:
-                                                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                                                    html_owner2 = _play_fetch(ov, storage_state=storage_state)
-                                                if not html_owner2:
-                                                    html_owner2 = fetch_html(ov)
-                                                if not html_owner2:
-                                                    continue
-
-                                                pb2 = parse_fb_page_basic(html_owner2)
-                                                if pb2.get("followers") is not None:
-                                                    data["basic"]["page_followers"] = pb2["followers"]
-                                                    break
-
-                                                n2 = _extract_followers_from_html(html_owner2)
-                                                if isinstance(n2, int):
-                                                    data["basic"]["page_followers"] = n2
-                                                    break
+                                            n2 = _owner_followers_by_variants(derived_owner, storage_state)
+                                            if n2 is not None:
+                                                data["basic"]["page_followers"] = n2
 
                     data["final_permalink"] = final_u
+                    # 解析出真正的貼文網址後，中介頁的判定不再適用；改以最終頁面判斷
+                    dead = None
 
                     
-                    html2 = None
-                    if storage_state:
-                        from .play_fetcher import fetch_with_playwright as _play_fetch
-                        html2 = _play_fetch(final_u, storage_state=storage_state)
-                    if not html2:
-                        html2 = fetch_html(final_u)
+                    html2 = _fetch_follow_up(final_u, storage_state)
                     if html2:
                         
                         try:
-                            basic2 = parse_fb_post_basic(html2)
+                            basic2 = parse_basic("fb_post", html2)
+                            dead = dead_reason(html2, basic2)
                             if basic2.get("owner_url"):
                                 data["basic"]["owner_url"] = basic2["owner_url"]
 
@@ -1192,19 +1524,16 @@ def inspect_url(url: str) -> dict:
                             
                             owner_for_follow = data["basic"].get("owner_url")
                             if data["basic"].get("page_followers") is None and owner_for_follow:
-                                html_owner = None
-                                if storage_state:
-                                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                                    html_owner = _play_fetch(owner_for_follow, storage_state=storage_state)
-                                if not html_owner:
-                                    html_owner = fetch_html(owner_for_follow)
+                                html_owner = _fetch_follow_up(owner_for_follow, storage_state)
                                 if html_owner:
                                     if "/groups/" in owner_for_follow:
-                                        grp_basic = parse_fb_group_basic(html_owner)
+                                        grp_basic = parse_basic("fb_group", html_owner)
+                                        html_owner = None
                                         if grp_basic.get("members") is not None:
                                             data["basic"]["group_members"] = grp_basic["members"]
                                     else:
-                                        page_basic = parse_fb_page_basic(html_owner)
+                                        page_basic = parse_basic("fb_page", html_owner)
+                                        html_owner = None
                                         if page_basic.get("followers") is not None:
                                             data["basic"]["page_followers"] = page_basic["followers"]
                             
@@ -1241,51 +1570,55 @@ def inspect_url(url: str) -> dict:
                             
                             if data["basic"].get("page_followers") is None and data["basic"].get("owner_url") and "/groups/" not in data["basic"]["owner_url"]:
                                 owner_for_follow = data["basic"]["owner_url"]
-                                html_owner = None
-                                if storage_state:
-                                    from .play_fetcher import fetch_with_playwright as _play_fetch
-                                    html_owner = _play_fetch(owner_for_follow, storage_state=storage_state)
-                                if not html_owner:
-                                    html_owner = fetch_html(owner_for_follow)
-                                if html_owner:
-                                    page_basic = parse_fb_page_basic(html_owner)
-                                    if page_basic.get("followers") is not None:
-                                        data["basic"]["page_followers"] = page_basic["followers"]
-                                    if data["basic"].get("page_followers") is None:
-                                        n2 = _extract_followers_from_html(html_owner)
-                                        if isinstance(n2, int):
-                                            data["basic"]["page_followers"] = n2
+                                n2 = _fetch_page_followers(owner_for_follow, storage_state)
+                                if n2 is not None:
+                                    data["basic"]["page_followers"] = n2
                         except Exception:
                             pass
+                        html2 = None
                     
                     rewritten_url = final_u or rewritten_url
                     was_rewritten = was_rewritten or bool(final_u and final_u != url)
     except Exception:
         pass
+    t_stage = _lap(stages, "share_resolve", t_stage)
+    if progress is not None:
+        data = Progress.detach(data)
+
+    # 分享連結解析 / final permalink 重抓 / owner 步驟補上任何數值時不算失效；
+    # 所有備援都失敗（仍是 login wall / 不存在）才記入負面快取
+    if dead and any(isinstance(v, int) for v in (data.get("basic") or {}).values()):
+        dead = None
+    if dead and neg is not None:
+        neg.record(url, dead)
 
     zh_basic = _format_basic_zh(type_tag, data.get("basic", {}))
     data["基礎資訊"] = zh_basic
 
-    tag_to_kind = {
-        "fb_page": "page",
-        "fb_post": "post",
-        "fb_group": "group",
-        "ig_profile": "profile",
-        "ig_post": "post",
-    }
-    data["kind"] = tag_to_kind.get(type_tag, "unknown")
+    data["kind"] = TAG_TO_KIND.get(type_tag, "unknown")
 
     return {
         "status": "ok",
         "type": type_tag,
         "data": data,
         "基礎資訊": zh_basic,
-        "meta": {
-            "duration_ms": int((time.time() - t0) * 1000),
-            "fetched_with": fetched_with,
-            "was_rewritten": was_rewritten,
-            "rewritten_url": rewritten_url if was_rewritten else None,
-            "final_permalink": data.get("final_permalink"),
-        },
+        "meta": build_meta(
+            duration_ms=int((time.time() - t0) * 1000),
+            fetched_with=fetched_with,
+            was_rewritten=was_rewritten,
+            rewritten_url=rewritten_url if was_rewritten else None,
+            resolved_url=url if url != input_url else None,
+            final_permalink=data.get("final_permalink"),
+            stages_ms=stages,
+            redirect_hops=redirect_hops,
+            share_resolved_by=share_resolved_by,
+            hedge=hedge_info,
+            variants=variant_report,
+            network_counters=network_counters or None,
+            owner_links=(browser_nav or {}).get("owner_links") or None,
+            fetch_ms=fetch_ms,
+            login_wall=login_wall,
+            dead_reason=dead,
+        ),
         "error": None,
     }
\ No newline at end of file
@@ -0,0 +1,140 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+
+_MB = 1024 * 1024
+
+# HTML 字串 + BeautifulSoup 樹約為原始位元組的數倍，單頁上限取預算的 1/8
+PAGE_CAP_DIVISOR = 8
+
+_local = threading.local()
+
+
+def default_budget_mb() -> int:
+    """每次 inspect 的記憶體預算（MB），FBIG_MEMORY_BUDGET_MB，預設 64。"""
+    return int(os.getenv("FBIG_MEMORY_BUDGET_MB", "64"))
+
+
+def host_limit_mb() -> Optional[int]:
+    """
+    所有 inspect 共用的記憶體上限（MB）：FBIG_MEMORY_LIMIT_MB，
+    未設定時取實體記憶體的一半；無法取得時回傳 None（不限制）。
+    """
+    env = os.getenv("FBIG_MEMORY_LIMIT_MB")
+    if env:
+        return int(env)
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / _MB / 2)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def current_rss_mb() -> Optional[float]:
+    """目前程序 RSS（MB）；Linux 讀 /proc，其他平台退回 ru_maxrss（峰值）。"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource, sys
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / _MB if sys.platform == "darwin" else rss / 1024
+    except Exception:
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """程序啟動以來的 RSS 峰值（MB）。"""
+    try:
+        import resource, sys
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / _MB if sys.platform == "darwin" else rss / 1024
+    except Exception:
+        return None
+
+
+class MemoryGovernor:
+    """
+    以 MB 為單位的加權 semaphore：每個 inspect 先預約自己的預算才開始，
+    總預約量不超過 limit_mb，因此同時進行的數量 ≈ limit_mb / budget_mb。
+    """
+
+    def __init__(self, limit_mb: int):
+        self.limit_mb = max(1, int(limit_mb))
+        self.in_use_mb = 0
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, mb: int, timeout: Optional[float] = None) -> bool:
+        mb = min(max(1, int(mb)), self.limit_mb)
+        with self._cond:
+            self.waiting += 1
+            try:
+                ok = self._cond.wait_for(lambda: self.in_use_mb + mb <= self.limit_mb, timeout=timeout)
+                if not ok:
+                    return False
+                self.in_use_mb += mb
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self, mb: int) -> None:
+        mb = min(max(1, int(mb)), self.limit_mb)
+        with self._cond:
+            self.in_use_mb = max(0, self.in_use_mb - mb)
+            self.active = max(0, self.active - 1)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit_mb": self.limit_mb,
+                "in_use_mb": self.in_use_mb,
+                "active": self.active,
+                "waiting": self.waiting,
+            }
+
+
+_GOVERNOR: Optional[MemoryGovernor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor() -> Optional[MemoryGovernor]:
+    global _GOVERNOR
+    limit = host_limit_mb()
+    if limit is None:
+        return None
+    with _GOVERNOR_LOCK:
+        if _GOVERNOR is None or _GOVERNOR.limit_mb != limit:
+            _GOVERNOR = MemoryGovernor(limit)
+        return _GOVERNOR
+
+
+def current_page_cap() -> Optional[int]:
+    """目前執行緒所在 inspect 的單頁位元組上限；不在 inspection_budget 內時回傳 None。"""
+    return getattr(_local, "page_cap", None)
+
+
+@contextmanager
+def inspection_budget(budget_mb: int):
+    """
+    預約一次 inspect 的記憶體預算，期間 fetch_html 讀取的單頁位元組上限為
+    budget_mb / PAGE_CAP_DIVISOR（超過即截斷，不再往下讀）。
+    """
+    gov = get_governor()
+    if gov is not None:
+        gov.acquire(budget_mb)
+    prev = getattr(_local, "page_cap", None)
+    _local.page_cap = int(budget_mb * _MB // PAGE_CAP_DIVISOR)
+    try:
+        yield
+    finally:
+        _local.page_cap = prev
+        if gov is not None:
+            gov.release(budget_mb)
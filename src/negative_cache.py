@@ -0,0 +1,199 @@
+"""
+已知失效網址的負面快取：被刪除的貼文、私人社團、總是抓取失敗的連結，在 TTL 內不再走
+requests → Playwright → share 解析的整條流程，直接回傳上次的失敗原因。
+
+- key 為 utils.canonical_url；每個網址可同時記錄多個原因，各自有 TTL：
+  fetch_failed（預設 300s，多半是暫時性）、login_wall（1800s）、not_found（6h）
+  以 FBIG_NEGATIVE_TTL="fetch_failed=120,not_found=86400" 覆寫；FBIG_NEGATIVE_CACHE=0 停用。
+- 帶登入狀態的檢測忽略 login_wall 記錄。
+- 啟用 FBIG_SHARED_CACHE 時同時寫入跨程序快取，其他 worker 也會命中。
+- BloomFilter：大量批次用的精簡機率過濾器（見 batch.py --dead-filter），固定記憶體、O(k) 查詢，
+  只會誤判「已失效」（機率由 error_rate 決定），不會漏掉已加入的網址。
+"""
+import hashlib
+import html as _html
+import math
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .fetcher import looks_like_login_wall
+from .shared_cache import get_shared_cache
+from .utils import canonical_url
+
+DEFAULT_TTLS = {
+    "fetch_failed": 300,
+    "login_wall": 1800,
+    "not_found": 6 * 3600,
+}
+
+# 「內容已不存在」頁面的文字（FB / IG，中英文）；只比對 <title> 與可見文字，不分大小寫
+NOT_FOUND_MARKERS = (
+    "This content isn't available",
+    "The link you followed may be broken",
+    "this page isn't available",
+    "此內容目前無法顯示",
+    "目前無法查看此內容",
+    "你所使用的連結可能無效",
+    "很抱歉，此頁面無法使用",
+)
+
+
+def _ttls_from_env() -> Dict[str, float]:
+    ttls = dict(DEFAULT_TTLS)
+    for item in (os.getenv("FBIG_NEGATIVE_TTL") or "").split(","):
+        reason, _, sec = item.partition("=")
+        if reason.strip() and sec.strip():
+            try:
+                ttls[reason.strip()] = float(sec)
+            except ValueError:
+                pass
+    return ttls
+
+
+_INVISIBLE = re.compile(r"<(script|style|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+_TAG = re.compile(r"<[^>]+>")
+_MARKERS_LOWER = tuple(m.lower() for m in NOT_FOUND_MARKERS)
+
+
+def visible_text(html: str) -> str:
+    """<title> 與 body 的可見文字（去掉 script / style / template / 註解與標籤，實體已解碼）。"""
+    return _html.unescape(_TAG.sub(" ", _INVISIBLE.sub(" ", html)))
+
+
+def dead_reason(html: Optional[str], basic: Optional[Dict]) -> Optional[str]:
+    """
+    抓到頁面但什麼都解析不到時，判斷是 not_found 還是 login_wall；有任何數值則回傳 None。
+    not_found 只看可見文字：inline script / i18n 字串表裡常帶有同樣的文案，不代表頁面本身失效。
+    """
+    basic = basic or {}
+    if any(isinstance(v, int) for v in basic.values()):
+        return None
+    h = html or ""
+    text = visible_text(h).lower()
+    if any(m in text for m in _MARKERS_LOWER):
+        return "not_found"
+    if looks_like_login_wall("", h):
+        return "login_wall"
+    return None
+
+
+class NegativeCache:
+    """canonical_url → {原因: 到期時間}；本程序內以 OrderedDict 保存，超過 max_entries 淘汰最舊者。"""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 100_000):
+        self.ttls = ttls or dict(DEFAULT_TTLS)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    def _entry(self, key: str) -> Dict[str, float]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            shared = get_shared_cache()
+            entry = (shared.get("negative", key) if shared else None) or {}
+        return entry
+
+    def check(self, url: str, logged_in: bool = False) -> Optional[Tuple[str, float]]:
+        """未過期的失敗原因與剩餘秒數；沒有記錄回傳 None。"""
+        now = time.time()
+        for reason, expires in self._entry(canonical_url(url)).items():
+            if expires > now and not (logged_in and reason == "login_wall"):
+                self._stats["hits"] += 1
+                return reason, expires - now
+        self._stats["misses"] += 1
+        return None
+
+    def record(self, url: str, reason: str) -> None:
+        key = canonical_url(url)
+        now = time.time()
+        expires = now + self.ttls.get(reason, DEFAULT_TTLS["fetch_failed"])
+        with self._lock:
+            entry = {r: e for r, e in self._entries.pop(key, {}).items() if e > now}
+            entry[reason] = expires
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._stats[f"recorded_{reason}"] += 1
+        shared = get_shared_cache()
+        if shared is not None:
+            shared.put("negative", key, entry, ttl=max(entry.values()) - now)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats, entries=len(self._entries))
+
+
+_neg_lock = threading.Lock()
+_neg: Optional[NegativeCache] = None
+
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    """FBIG_NEGATIVE_CACHE=0 時回傳 None。"""
+    global _neg
+    if os.getenv("FBIG_NEGATIVE_CACHE") == "0":
+        return None
+    with _neg_lock:
+        if _neg is None:
+            _neg = NegativeCache(_ttls_from_env(), int(os.getenv("FBIG_NEGATIVE_MAX", "100000")))
+        return _neg
+
+
+class BloomFilter:
+    """
+    固定大小的 Bloom filter（bit 陣列 + double hashing）。
+    capacity 筆、error_rate 0.0001 時約每筆 2.4 bytes；save() / load() 以單一二進位檔保存。
+    """
+
+    MAGIC = b"FBBF"
+    HEADER = struct.Struct("<4sQII")  # magic, bits, hashes, count
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-4, bits: Optional[int] = None, hashes: Optional[int] = None):
+        if bits is None:
+            bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if hashes is None:
+            hashes = max(1, round(bits / max(1, capacity) * math.log(2)))
+        self.bits = bits
+        self.hashes = hashes
+        self.count = 0
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self._array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.bits, self.hashes, self.count))
+            f.write(self._array)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, bits, hashes, count = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"not a bloom filter file: {path}")
+            bf = cls(bits=bits, hashes=hashes)
+            bf._array = bytearray(f.read())
+            bf.count = count
+        if len(bf._array) != (bits + 7) // 8:
+            raise ValueError(f"truncated bloom filter file: {path}")
+        return bf
@@ -0,0 +1,113 @@
+"""
+只掃描 <head> 的 Open Graph / Twitter / canonical 擷取器。
+
+以 html.parser 的 tokenizer 逐段餵入，遇到 </head> 或 <body> 即停止，不建 DOM；
+可直接處理串流下載的 chunk，head 讀完就能回傳，不必等整頁下載完。
+"""
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Optional, Union
+
+OG_FIELDS = ("og:title", "og:description", "og:image", "og:url", "og:site_name")
+
+
+class _HeadDone(Exception):
+    pass
+
+
+class HeadMetaParser(HTMLParser):
+    """收集 og:* / twitter:* meta 與 <link rel="canonical">；同名標籤以第一個為準。"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            raise _HeadDone
+        if tag == "meta":
+            a = dict(attrs)
+            key = (a.get("property") or a.get("name") or "").strip().lower()
+            content = a.get("content")
+            if content is not None and key.startswith(("og:", "twitter:")):
+                self.meta.setdefault(key, content.strip())
+        elif tag == "link":
+            a = dict(attrs)
+            rel = (a.get("rel") or "").lower().split()
+            if "canonical" in rel and a.get("href"):
+                self.meta.setdefault("canonical", a["href"].strip())
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            raise _HeadDone
+
+    def feed(self, data: str) -> bool:
+        """餵入一段 HTML；head 已結束時回傳 True，之後的資料可以不用再讀。"""
+        if self.done:
+            return True
+        try:
+            super().feed(data)
+        except _HeadDone:
+            self.done = True
+        return self.done
+
+
+def _decoder(encoding: Optional[str]):
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:  # 伺服器宣告了 Python 不認得的編碼
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _finish(meta: Dict[str, str]) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {k: None for k in OG_FIELDS}
+    out.update(meta)
+    if not out["og:url"] and meta.get("canonical"):
+        out["og:url"] = meta["canonical"]
+    for field in ("title", "description", "image"):
+        if not out[f"og:{field}"] and meta.get(f"twitter:{field}"):
+            out[f"og:{field}"] = meta[f"twitter:{field}"]
+    return out
+
+
+class HeadMetaStream:
+    """
+    逐 chunk 餵入下載中的 body（str / bytes）；head 結束的那一次 feed 回傳擷取結果，
+    之前與之後回傳 None。用於在 body 下載完之前就取得 og:*。
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self._parser = HeadMetaParser()
+        self._decoder = _decoder(encoding)
+
+    @property
+    def done(self) -> bool:
+        return self._parser.done
+
+    def feed(self, chunk: Union[str, bytes]) -> Optional[Dict[str, Optional[str]]]:
+        if self._parser.done:
+            return None
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        return self.result() if self._parser.feed(chunk) else None
+
+    def result(self) -> Dict[str, Optional[str]]:
+        return _finish(self._parser.meta)
+
+
+def extract_head_meta(source: Union[str, bytes, Iterable[Union[str, bytes]], None],
+                      encoding: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    從 HTML 字串或 chunk 串流（str / bytes）擷取 head meta。
+    回傳固定包含 OG_FIELDS 的 dict（未找到為 None），另含找到的 twitter:* 與 canonical。
+    og:url 缺少時以 canonical 補上；og:title / description / image 缺少時以 twitter:* 補上。
+    """
+    stream = HeadMetaStream(encoding)
+    if source:
+        chunks = [source] if isinstance(source, (str, bytes)) else source
+        for chunk in chunks:
+            stream.feed(chunk)
+            if stream.done:
+                break
+    return stream.result()
@@ -0,0 +1,98 @@
+"""
+在頁面內（page.evaluate）擷取 owner / slug / 計數所需的片段，不傳回整份 DOM。
+
+EXTRACT_JS 只收集 meta、canonical、<a>（href / role / aria-label / 文字）、
+含計數字樣的文字列與 script 內的 JSON 欄位片段；render_compact_html 再把它們
+還原成精簡 HTML，inspect.py 既有的 _extract_* regex 與 parse_*_basic 可直接沿用。
+"""
+import html as _html
+import json
+from typing import Any, Dict
+
+# 回傳物件各清單的上限，避免異常頁面塞爆結果
+MAX_LINKS = 400
+MAX_LINES = 200
+MAX_FRAGMENTS = 200
+
+EXTRACT_JS = """
+([maxLinks, maxLines, maxFragments]) => {
+  const out = {title: document.title || "", metas: [], canonical: null, links: [], lines: [], fragments: []};
+  for (const m of document.querySelectorAll("meta[property], meta[name]")) {
+    const k = m.getAttribute("property") || m.getAttribute("name");
+    const c = m.getAttribute("content");
+    if (k && c !== null) out.metas.push([k, c]);
+  }
+  const can = document.querySelector('link[rel~="canonical"]');
+  if (can) out.canonical = can.getAttribute("href");
+  for (const a of document.querySelectorAll("a[href]")) {
+    if (out.links.length >= maxLinks) break;
+    const href = a.getAttribute("href");
+    if (!href || href.startsWith("#") || href.startsWith("javascript:")) continue;
+    out.links.push([href, a.getAttribute("role"), a.getAttribute("aria-label"),
+                    (a.innerText || "").trim().slice(0, 120), !!a.closest("h2")]);
+  }
+  const counterRe = /\\d.*(追蹤|粉絲|關注|訂閱|讚|分享|成員|follower|subscriber|like|share|member|comment)/i;
+  for (const line of (document.body ? document.body.innerText : "").split("\\n")) {
+    if (out.lines.length >= maxLines) break;
+    const t = line.trim();
+    if (t && t.length <= 120 && counterRe.test(t)) out.lines.push(t);
+  }
+  const keyRe = /"(followers_count|subscriber_count|subscribers_count|page_fans_count|fan_count|follower_count|subscription_count|subscriberCount|owner_id|pageID|entity_id|profile_id|ownerID|page_id|actorID|reaction_count|share_count|group_member_count|member_count)"\\s*:\\s*(\\{"count":\\d+\\}|"?\\d+"?)/g;
+  const urlRe = /https:\\\\\\/\\\\\\/(?:www|m)\\.facebook\\.com\\\\\\/[A-Za-z0-9._-]+(?:\\\\\\/[A-Za-z0-9._-]+)?/g;
+  for (const s of document.querySelectorAll("script")) {
+    if (out.fragments.length >= maxFragments) break;
+    const txt = s.textContent || "";
+    if (!txt) continue;
+    for (const m of txt.matchAll(keyRe)) {
+      out.fragments.push(m[0]);
+      if (out.fragments.length >= maxFragments) break;
+    }
+    for (const m of txt.matchAll(urlRe)) {
+      out.fragments.push(m[0]);
+      if (out.fragments.length >= maxFragments) break;
+    }
+  }
+  return out;
+}
+"""
+
+
+def _attr(v: Any) -> str:
+    return _html.escape(str(v), quote=True)
+
+
+def render_compact_html(obj: Dict[str, Any]) -> str:
+    """將 EXTRACT_JS 的結果還原成精簡 HTML（屬性順序配合既有 regex：role、aria-label 在 href 之前）。"""
+    parts = ["<html><head>"]
+    if obj.get("title"):
+        parts.append(f"<title>{_html.escape(obj['title'])}</title>")
+    for key, content in obj.get("metas") or []:
+        name = "property" if str(key).startswith("og:") else "name"
+        parts.append(f'<meta {name}="{_attr(key)}" content="{_attr(content)}">')
+    if obj.get("canonical"):
+        parts.append(f'<link rel="canonical" href="{_attr(obj["canonical"])}">')
+    parts.append("</head><body>")
+    for href, role, aria, text, in_h2 in obj.get("links") or []:
+        attrs = ""
+        if role:
+            attrs += f' role="{_attr(role)}"'
+        if aria:
+            attrs += f' aria-label="{_attr(aria)}"'
+        a = f'<a{attrs} href="{_attr(href)}">{_html.escape(text or "")}</a>'
+        parts.append(f"<h2>{a}</h2>" if in_h2 else a)
+    for line in obj.get("lines") or []:
+        parts.append(f"<div>{_html.escape(line)}</div>")
+    if obj.get("fragments"):
+        parts.append("<script>{" + ",".join(obj["fragments"]) + "}</script>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def extract_in_page(page) -> Dict[str, Any]:
+    """在已載入的 Playwright page 內執行 EXTRACT_JS。"""
+    return page.evaluate(EXTRACT_JS, [MAX_LINKS, MAX_LINES, MAX_FRAGMENTS])
+
+
+def payload_size(obj: Dict[str, Any]) -> int:
+    """evaluate 結果序列化後的位元組數（benchmark 用）。"""
+    return len(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
@@ -0,0 +1,261 @@
+import atexit
+import importlib
+import mmap
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, Tuple
+
+from .provenance import observe_basic
+from .parser import (
+    _blank_basic,
+    parse_fb_page_basic, parse_fb_post_basic,
+    parse_fb_group_basic, parse_fb_group_post_basic,
+    parse_ig_profile_basic, parse_ig_post_basic,
+)
+
+PARSERS = {
+    "fb_page": parse_fb_page_basic,
+    "fb_post": parse_fb_post_basic,
+    "fb_group": parse_fb_group_basic,
+    "fb_group_post": parse_fb_group_post_basic,
+    "ig_profile": parse_ig_profile_basic,
+    "ig_post": parse_ig_post_basic,
+}
+
+# 小於此大小的 HTML 直接 pickle 傳給 worker；更大的寫入 spill 檔由 worker mmap 讀取
+SPILL_THRESHOLD = 64 * 1024
+
+_PKG = __name__.rsplit(".", 1)[0]
+
+
+def _spill_dir() -> str:
+    # /dev/shm 為 tmpfs（記憶體），寫入 / mmap 不經過磁碟
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _spill(html: str) -> Tuple[str, Any]:
+    data = html.encode("utf-8")
+    if len(data) < SPILL_THRESHOLD:
+        return ("inline", html)
+    path = os.path.join(_spill_dir(), f"fbig-{os.getpid()}-{uuid.uuid4().hex}.html")
+    with open(path, "wb") as f:
+        f.write(data)
+    return ("file", path)
+
+
+def _unspill(handle: Tuple[str, Any]) -> str:
+    kind, value = handle
+    if kind == "inline":
+        return value
+    with open(value, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:size].decode("utf-8", errors="replace")
+
+
+def _release(handle: Tuple[str, Any]) -> None:
+    if handle[0] == "file":
+        try:
+            os.remove(handle[1])
+        except OSError:
+            pass
+
+
+def _resolve_func(name: str):
+    """name 為 'parse_fb_post_basic' 或 'inspect:_extract_owner_display_name' 形式。"""
+    mod, _, func = name.rpartition(":")
+    module = importlib.import_module(f"{_PKG}.{mod or 'parser'}")
+    return getattr(module, func)
+
+
+def _worker(func_name: str, handle: Tuple[str, Any]):
+    return _resolve_func(func_name)(_unspill(handle))
+
+
+def _serve(conn) -> None:
+    """worker 程序主迴圈：收 (func_name, handle)，回 (True, 結果) 或 (False, 例外)；收到 None 結束。"""
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        try:
+            reply = (True, _worker(*msg))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 結果或例外無法 pickle
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """單一 worker 程序與其 Pipe；一次只執行一個任務（由 ParsePool 的 slot 保證）。"""
+
+    def __init__(self):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, func_name: str, handle: Tuple[str, Any], timeout: float):
+        """執行一個任務；逾時拋出 TimeoutError，程序中途結束拋出 BrokenProcessPool。"""
+        try:
+            self.conn.send((func_name, handle))
+            ready = self.conn.poll(timeout)
+            ok, value = self.conn.recv() if ready else (None, None)
+        except (EOFError, OSError):
+            raise BrokenProcessPool(f"parse worker exited during {func_name}")
+        if not ready:
+            raise TimeoutError(func_name)
+        if not ok:
+            raise value
+        return value
+
+    def kill(self) -> None:
+        try:
+            self.process.terminate()
+            self.process.join(1)
+        except Exception:
+            pass
+        self.conn.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class ParsePool:
+    """
+    以多程序執行 CPU-bound 的解析 / 抽取（BeautifulSoup、get_text、大量 regex），避開 GIL。
+    大型 HTML 透過 spill 檔（/dev/shm + mmap）交給 worker，而不是 pickle 整個字串。
+    每個 worker 是獨立的單程序 slot，任務執行期間獨占一個 slot；單一任務超過 timeout 時
+    只終止該 slot 的程序並重建，其他進行中的解析不受影響。
+    """
+
+    def __init__(self, workers: int, timeout: float = 10.0):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._slots: List[Optional[_Worker]] = [None] * self.workers
+        self._free: "queue.LifoQueue[int]" = queue.LifoQueue()
+        for i in range(self.workers):
+            self._free.put(i)
+
+    def _slot(self, idx: int) -> _Worker:
+        with self._lock:
+            worker = self._slots[idx]
+            if worker is None:
+                worker = self._slots[idx] = _Worker()
+            return worker
+
+    def _recycle(self, idx: int, worker: _Worker) -> None:
+        """終止 slot 內卡住 / 壞掉的程序；下次使用該 slot 時重建。"""
+        with self._lock:
+            if self._slots[idx] is worker:
+                self._slots[idx] = None
+        worker.kill()
+
+    def run(self, func_name: str, html: str, timeout: Optional[float] = None):
+        """在 worker 程序執行 func_name(html)；逾時拋出 TimeoutError（逾時只計執行時間，不含等候空閒 slot）。"""
+        handle = _spill(html or "")
+        idx = self._free.get()
+        try:
+            worker = self._slot(idx)
+            try:
+                return worker.call(func_name, handle, timeout or self.timeout)
+            except TimeoutError:
+                print(f"[parse_pool] timeout: {func_name} ({len(html or '')} chars)")
+                self._recycle(idx, worker)
+                raise
+            except BrokenProcessPool:
+                self._recycle(idx, worker)
+                raise
+        finally:
+            self._free.put(idx)
+            _release(handle)
+
+    def close(self) -> None:
+        with self._lock:
+            slots, self._slots = self._slots, [None] * self.workers
+        for worker in slots:
+            if worker is not None:
+                worker.close()
+
+
+_POOL: Optional[ParsePool] = None
+_POOL_LOCK = threading.Lock()
+_BAD_SPEC: Optional[str] = None  # 已警告過的無效設定
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """
+    依環境變數建立全域解析 pool；未啟用回傳 None（呼叫端於本程序內解析）。
+      FBIG_PARSE_PROCESSES  worker 數；0 / 未設定 = 停用，auto = CPU 核心數
+      FBIG_PARSE_TIMEOUT    單一任務逾時秒數（預設 10）
+    """
+    global _POOL, _BAD_SPEC
+    spec = (os.getenv("FBIG_PARSE_PROCESSES") or "0").strip().lower()
+    try:
+        workers = (os.cpu_count() or 1) if spec == "auto" else int(spec or 0)
+    except ValueError:
+        if _BAD_SPEC != spec:
+            print(f"[parse_pool] invalid FBIG_PARSE_PROCESSES={spec!r}; parsing in-process")
+            _BAD_SPEC = spec
+        return None
+    if workers <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.workers != workers:
+            if _POOL is not None:
+                _POOL.close()
+            _POOL = ParsePool(workers, timeout=float(os.getenv("FBIG_PARSE_TIMEOUT", "10")))
+        return _POOL
+
+
+def _close_pool() -> None:
+    if _POOL is not None:
+        _POOL.close()
+
+
+atexit.register(_close_pool)
+
+
+def parse_basic(type_tag: str, html: str) -> Dict[str, Any]:
+    """
+    依類型解析 basic 欄位；啟用 FBIG_PARSE_PROCESSES 時在 worker 程序執行。
+    未知類型回傳 {}；worker 逾時回傳 note='parse_timeout' 的空白欄位。
+    basic.provenance 記入 provenance 統計後化約為 {欄位: 勝出策略}。
+    """
+    func = PARSERS.get(type_tag)
+    if func is None:
+        return {}
+    pool = get_parse_pool()
+    if pool is None:
+        basic = func(html)
+    else:
+        try:
+            basic = pool.run(func.__name__, html)
+        except TimeoutError:
+            return _blank_basic(note="parse_timeout")
+    # 統計在主程序累計（worker 程序內的計數不會回傳）
+    return observe_basic(type_tag, basic)
@@ -2,6 +2,7 @@ from bs4 import BeautifulSoup
 import re
 from typing import Optional, Dict, Any
 from .utils import normalize_number
+from .provenance import run_strategies, single_strategy
 
 
 
@@ -27,79 +28,75 @@ def _search_number_patterns(text: str, patterns) -> Optional[int]:
             return normalize_number(m.group(1))
     return None
 
+def _first_int(patterns, texts, flags: int = 0) -> Optional[int]:
+    """依序在每段文字中嘗試 patterns，回傳第一個符合的整數。"""
+    for s in texts:
+        if not s:
+            continue
+        for pat in patterns:
+            m = re.search(pat, s, flags)
+            if m:
+                try:
+                    return int(m.group(1))
+                except Exception:
+                    pass
+    return None
+
+
+def _script_texts(soup) -> list:
+    return [sc.string or sc.get_text() or "" for sc in soup.find_all("script")]
+
+
+_PAGE_FOLLOWER_JSON = [
+    r'"followers_count"\s*:\s*([0-9]+)',
+    r'"page_fan_count"\s*:\s*([0-9]+)',
+    r'"page_likers_count"\s*:\s*([0-9]+)',
+    r'"subscriber_count"\s*:\s*([0-9]+)',
+]
+
 # ---------- FB: Page ----------
 
 def parse_fb_page_basic(html: str) -> dict:
     """
     解析 FB 粉絲專頁追蹤數
     目標欄位：basic.followers
+    策略（provenance）：text → meta_description → script_json
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    prov: Dict[str, Any] = {}
 
-    followers = _search_number_patterns(
-        text,
-        [
-            r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:位)?追蹤者",
-            r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*followers",
-            r"追蹤者\s*([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)",
-        ],
-    )
-
-    # Fallback 1: meta[name="description"]
-    if followers is None:
-        desc = None
+    def from_meta_description():
         meta_desc = soup.find("meta", attrs={"name": "description"})
-        if meta_desc and meta_desc.get("content"):
-            desc = meta_desc["content"]
-        if desc:
-            f2 = _search_number_patterns(
-                desc,
-                [
-                    r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:位)?追蹤者",
-                    r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*followers",
-                ],
-            )
-            if f2 is not None:
-                followers = f2
-                source = "meta"
-            else:
-                source = "text"
-        else:
-            source = "text"
-            
-    if followers is None:
-        json_number = None
-        for sc in soup.find_all("script"):
-            s = sc.string or sc.get_text()
-            if not s:
-                continue
-            
-            m = re.search(r'"followers_count"\s*:\s*([0-9]+)', s)
-            if not m:
-                m = re.search(r'"page_fan_count"\s*:\s*([0-9]+)', s)
-            if not m:
-                m = re.search(r'"page_likers_count"\s*:\s*([0-9]+)', s)
-            if not m:
-                m = re.search(r'"subscriber_count"\s*:\s*([0-9]+)', s)
-            if m:
-                try:
-                    json_number = int(m.group(1))
-                    break
-                except Exception:
-                    pass
-        if json_number is not None:
-            followers = json_number
-            source = "json"
-            
-    source_hint = "text"
-    try:
-        source_hint = source
-    except NameError:
-        pass
+        if not (meta_desc and meta_desc.get("content")):
+            return None
+        return _search_number_patterns(
+            meta_desc["content"],
+            [
+                r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:位)?追蹤者",
+                r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*followers",
+            ],
+        )
+
+    followers = run_strategies("fb_page", "followers", [
+        ("text", lambda: _search_number_patterns(
+            text,
+            [
+                r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:位)?追蹤者",
+                r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*followers",
+                r"追蹤者\s*([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)",
+            ],
+        )),
+        ("meta_description", from_meta_description),
+        ("script_json", lambda: _first_int(_PAGE_FOLLOWER_JSON, _script_texts(soup))),
+    ], prov)
+
+    soup.decompose()
+    source_hint = {"meta_description": "meta", "script_json": "json"}.get(prov["followers"]["by"], "text")
 
     basic = _blank_basic(note=None if followers is not None else "not_found", source_hint=source_hint)
     basic["followers"] = followers
+    basic["provenance"] = prov
     return basic
 
 
@@ -111,6 +108,7 @@ def parse_fb_post_basic(html: str) -> dict:
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    soup.decompose()
 
     likes = _search_number_patterns(
         text,
@@ -143,30 +141,166 @@ def parse_fb_post_basic(html: str) -> dict:
 
 # ---------- FB: Post (Enhanced for share/r/p) ----------
 
+_OWNER_SLUG_EXCLUDE = (
+    "share", "login", "watch", "reel", "groups", "permalink",
+    "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
+)
+
+# script 內 JSON（逐一 script 嘗試，同一 script 內依序）
+_LIKES_SCRIPT_JSON = [
+    r'"like_count"\s*:\s*([0-9]+)',
+    r'"feedback"[\s\S]*?"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"__bbox"[\s\S]*?"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"like_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+]
+_SHARES_SCRIPT_JSON = [
+    r'"share_count"\s*:\s*([0-9]+)',
+    r'"feedback"[\s\S]*?"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"__bbox"[\s\S]*?"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"shares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+]
+
+# 整份 HTML 的 raw regex（不分大小寫）
+_LIKES_RAW_JSON = [
+    r'"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"like_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"likers"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"like_count"\s*:\s*([0-9]+)',
+]
+_SHARES_RAW_JSON = [
+    r'"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"shares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"reshares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
+    r'"share_count"\s*:\s*([0-9]+)',
+]
+
+
+def _owner_from_slug(slug: Optional[str]) -> Optional[str]:
+    if slug and slug.lower() not in _OWNER_SLUG_EXCLUDE:
+        return f"https://m.facebook.com/{slug}"
+    return None
+
+
+def _aria_number(soup, word_pattern: str) -> Optional[int]:
+    """第一個 aria-label 含 word_pattern 且帶數字的節點。"""
+    for n in soup.find_all(attrs={"aria-label": True}):
+        label = n.get("aria-label") or ""
+        if re.search(word_pattern, label, re.IGNORECASE):
+            m = re.search(r"([0-9][0-9.,]*)", label)
+            if m:
+                value = normalize_number(m.group(1))
+                if value is not None:
+                    return value
+    return None
+
+
+def _owner_og_url(soup) -> Optional[str]:
+    og = soup.find("meta", attrs={"property": "og:url"})
+    if og and og.get("content"):
+        m = re.search(r"https?://www\\.facebook\\.com/([^/?#]+)/?", og["content"], flags=re.IGNORECASE)
+        if m:
+            return _owner_from_slug(m.group(1))
+    return None
+
+
+def _owner_permalink_url(scripts) -> Optional[str]:
+    for s in scripts:
+        if '"permalink_url"' not in s:
+            continue
+        m = re.search(r'"permalink_url"\\s*:\\s*"(https:\\/\\/www\\.facebook\\.com\\/[^"]+)"', s)
+        if m:
+            perma = m.group(1).replace("\\/", "/")
+            m2 = re.search(r"https?://www\\.facebook\\.com/([^/?#]+)/?", perma, flags=re.IGNORECASE)
+            if m2 and _owner_from_slug(m2.group(1)):
+                return _owner_from_slug(m2.group(1))
+    return None
+
+
+def _owner_anchor_relative(soup) -> Optional[str]:
+    for a in soup.find_all("a", href=True):
+        m = re.search(r"^/([^/?#]+)/?", a["href"])
+        if m and _owner_from_slug(m.group(1)):
+            return _owner_from_slug(m.group(1))
+    return None
+
+
+def _owner_escaped_url(html: str) -> Optional[str]:
+    m = re.search(r'https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?(?=["\\/\\?])', html)
+    return _owner_from_slug(m.group(1)) if m else None
+
+
+def _owner_entity_url(html: str) -> Optional[str]:
+    for pat in [
+        r'"entity_url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
+        r'"actor"\\s*:\\s*\\{[\\s\\S]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
+        r'"page_url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
+    ]:
+        m = re.search(pat, html)
+        if m and _owner_from_slug(m.group(1)):
+            return _owner_from_slug(m.group(1))
+    return None
+
+
+def _owner_numeric_id(html: str) -> Optional[str]:
+    for pat in [
+        r'"pageID"\\s*:\\s*"([0-9]{4,})"',
+        r'"actor_id"\\s*:\\s*"([0-9]{4,})"',
+        r'"entity_id"\\s*:\\s*"([0-9]{4,})"',
+        r'"owner"\\s*:\\s*\\{[\\s\\S]*?"id"\\s*:\\s*"([0-9]{4,})"',
+    ]:
+        m = re.search(pat, html)
+        if m:
+            return f"https://m.facebook.com/profile.php?id={m.group(1)}"
+    return None
+
+
+def _owner_block(html: str, url_pat: str, id_pat: str) -> Optional[str]:
+    m = re.search(url_pat, html)
+    owner_url = _owner_from_slug(m.group(1)) if m else None
+    if owner_url is None:
+        m = re.search(id_pat, html)
+        if m:
+            owner_url = f"https://m.facebook.com/profile.php?id={m.group(1)}"
+    return owner_url
+
+
 def parse_fb_post_basic(html: str) -> dict:
     """
     強化版：解析 FB 貼文頁（如 /share/r/... 或 /share/p/...）的讚數、分享數與所屬粉專追蹤數。
     目標欄位：basic.likes, basic.shares, basic.page_followers
     同時嘗試推導貼文所屬粉專網址（owner_url），供上層二段抓取使用。
+    每個欄位依具名策略逐一嘗試（見 provenance.run_strategies），勝出者記錄在 basic.provenance。
     """
-    soup = BeautifulSoup(html or "", "html.parser")
+    html = html or ""
+    soup = BeautifulSoup(html, "html.parser")
     text = soup.get_text(" ", strip=True)
+    prov: Dict[str, Any] = {}
+    scripts: list = []
 
-    likes = _search_number_patterns(
+    def script_texts() -> list:
+        if not scripts:
+            scripts.extend(_script_texts(soup))
+        return scripts
+
+    # 預設順序與原本相同：三個數值欄位先掃純文字；純文字一個都沒找到時才掃 script 內 JSON，
+    # 之後 aria-label（讚 / 分享）與整份 HTML 的 raw regex
+    likes_text = _search_number_patterns(
         text,
         [
             r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:個)?讚",
             r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*likes?",
         ],
     )
-    shares = _search_number_patterns(
+    shares_text = _search_number_patterns(
         text,
         [
             r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*次分享",
             r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*shares?",
         ],
     )
-    page_followers = _search_number_patterns(
+    followers_text = _search_number_patterns(
         text,
         [
             r"([0-9][0-9.,]*\s*(?:[kKmM]|萬|億)?)\s*(?:位)?追蹤者",
@@ -175,308 +309,57 @@ def parse_fb_post_basic(html: str) -> dict:
         ],
     )
 
+    def with_script_json(strategies: list, patterns: list) -> list:
+        if any([likes_text, shares_text, followers_text]):
+            return strategies
+        return strategies[:1] + [("script_json", lambda: _first_int(patterns, script_texts()))] + strategies[1:]
+
+    likes = run_strategies("fb_post", "likes", with_script_json([
+        ("text", lambda: likes_text),
+        ("aria_label", lambda: _aria_number(soup, r"(讚|likes?)")),
+        ("raw_json", lambda: _first_int(_LIKES_RAW_JSON, [html], re.IGNORECASE)),
+    ], _LIKES_SCRIPT_JSON), prov)
+    shares = run_strategies("fb_post", "shares", with_script_json([
+        ("text", lambda: shares_text),
+        ("aria_label", lambda: _aria_number(soup, r"(分享|shares?)")),
+        ("raw_json", lambda: _first_int(_SHARES_RAW_JSON, [html], re.IGNORECASE)),
+    ], _SHARES_SCRIPT_JSON), prov)
+    page_followers = run_strategies("fb_post", "page_followers", with_script_json([
+        ("text", lambda: followers_text),
+        ("raw_json", lambda: _first_int(_PAGE_FOLLOWER_JSON, [html], re.IGNORECASE)),
+    ], _PAGE_FOLLOWER_JSON), prov)
+
+    owner_url = run_strategies("fb_post", "owner_url", [
+        ("og_url", lambda: _owner_og_url(soup)),
+        ("permalink_url", lambda: _owner_permalink_url(script_texts())),
+        ("anchor_relative", lambda: _owner_anchor_relative(soup)),
+        ("escaped_url", lambda: _owner_escaped_url(html)),
+        ("entity_url", lambda: _owner_entity_url(html)),
+        ("numeric_id", lambda: _owner_numeric_id(html)),
+        ("owner_block", lambda: _owner_block(
+            html,
+            r'"owner"\\s*:\\s*\\{[\\s\\S]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\\\/?#]+)',
+            r'"owner"\\s*:\\s*\\{[\\s\\S]*?"id"\\s*:\\s*"([0-9]{4,})"',
+        )),
+        ("actors_block", lambda: _owner_block(
+            html,
+            r'"actors"\\s*:\\s*\\[\\s*\\{[^}]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\\\/?#]+)',
+            r'"actors"\\s*:\\s*\\[\\s*\\{[^}]*?"id"\\s*:\\s*"([0-9]{4,})"',
+        )),
+    ], prov)
+
+    soup.decompose()
+    # 與原本相同：讚數 / 分享數任一有值即標為 json（即使來自純文字）；追蹤數只有來自 text 以外的策略才算
     source_hint = "text"
-    found_by_text = any([likes, shares, page_followers])
-
-    # 若純文字沒找到，嘗試從 script 標籤內 JSON 結構提取
-    if not found_by_text:
-        for sc in soup.find_all("script"):
-            s = sc.string or sc.get_text()
-            if not s:
-                continue
-            
-            if likes is None:
-                m = re.search(r'"like_count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        likes = int(m.group(1))
-                    except Exception:
-                        pass
-            if shares is None:
-                m = re.search(r'"share_count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        shares = int(m.group(1))
-                    except Exception:
-                        pass
-                    
-            if likes is None:
-                m = re.search(r'"feedback"[\s\S]*?"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"__bbox"[\s\S]*?"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        likes = int(m.group(1))
-                    except Exception:
-                        pass
-
-            if shares is None:
-                m = re.search(r'"feedback"[\s\S]*?"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"__bbox"[\s\S]*?"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"shares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        shares = int(m.group(1))
-                    except Exception:
-                        pass
-                    
-            if likes is None:
-                m = re.search(r'"like_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        likes = int(m.group(1))
-                    except Exception:
-                        pass
-                    
-            if shares is None:
-                m = re.search(r'"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"shares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        shares = int(m.group(1))
-                    except Exception:
-                        pass
-                    
-            if page_followers is None:
-                
-                m = re.search(r'"followers_count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"page_fan_count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"page_likers_count"\s*:\s*([0-9]+)', s)
-                if not m:
-                    m = re.search(r'"subscriber_count"\s*:\s*([0-9]+)', s)
-                if m:
-                    try:
-                        page_followers = int(m.group(1))
-                    except Exception:
-                        pass
-                    
-            if likes is not None and shares is not None and page_followers is not None:
-                break
-        if any([likes, shares, page_followers]):
-            source_hint = "json"
-
-
-    if likes is None or shares is None:
-        try:
-            nodes = soup.find_all(attrs={"aria-label": True})
-            for n in nodes:
-                label = n.get("aria-label") or ""
-                if likes is None and re.search(r"(讚|likes?)", label, re.IGNORECASE):
-                    m = re.search(r"([0-9][0-9.,]*)", label)
-                    if m:
-                        likes = normalize_number(m.group(1))
-                if shares is None and re.search(r"(分享|shares?)", label, re.IGNORECASE):
-                    m = re.search(r"([0-9][0-9.,]*)", label)
-                    if m:
-                        shares = normalize_number(m.group(1))
-        except Exception:
-            pass
-    if any([likes, shares]) and source_hint == "text":
-        
+    if any([likes, shares]) or prov["page_followers"]["by"] not in (None, "text"):
         source_hint = "json"
-
-    if likes is None:
-        for pat in [
-            r'"reaction_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"like_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"likers"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"like_count"\s*:\s*([0-9]+)',
-        ]:
-            m = re.search(pat, html, flags=re.IGNORECASE)
-            if m:
-                try:
-                    likes = int(m.group(1))
-                    source_hint = "json"
-                    break
-                except Exception:
-                    pass
-    if shares is None:
-        for pat in [
-            r'"share_count"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"shares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"reshares"\s*:\s*\{\s*"count"\s*:\s*([0-9]+)',
-            r'"share_count"\s*:\s*([0-9]+)',
-        ]:
-            m = re.search(pat, html, flags=re.IGNORECASE)
-            if m:
-                try:
-                    shares = int(m.group(1))
-                    source_hint = "json"
-                    break
-                except Exception:
-                    pass
-    if page_followers is None:
-        for pat in [
-            r'"followers_count"\s*:\s*([0-9]+)',
-            r'"page_fan_count"\s*:\s*([0-9]+)',
-            r'"page_likers_count"\s*:\s*([0-9]+)',
-            r'"subscriber_count"\s*:\s*([0-9]+)',
-        ]:
-            m = re.search(pat, html, flags=re.IGNORECASE)
-            if m:
-                try:
-                    page_followers = int(m.group(1))
-                    if source_hint == "text":
-                        source_hint = "json"
-                    break
-                except Exception:
-                    pass
-
-    
-    owner_url = None
-
-    
-    try:
-        og = soup.find("meta", attrs={"property": "og:url"})
-        if og and og.get("content"):
-            ogu = og["content"]
-            m = re.search(r"https?://www\\.facebook\\.com/([^/?#]+)/?", ogu, flags=re.IGNORECASE)
-            if m:
-                slug = m.group(1)
-                if slug.lower() not in (
-                    "share", "login", "watch", "reel", "groups", "permalink",
-                    "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                ):
-                    owner_url = f"https://m.facebook.com/{slug}"
-    except Exception:
-        pass
-
-    
-    if owner_url is None:
-        for sc in soup.find_all("script"):
-            s = sc.string or sc.get_text() or ""
-            if '"permalink_url"' in s:
-                m = re.search(r'"permalink_url"\\s*:\\s*"(https:\\/\\/www\\.facebook\\.com\\/[^"]+)"', s)
-                if m:
-                    try:
-                        perma = m.group(1).replace("\\/", "/")
-                        m2 = re.search(r"https?://www\\.facebook\\.com/([^/?#]+)/?", perma, flags=re.IGNORECASE)
-                        if m2:
-                            slug = m2.group(1)
-                            if slug.lower() not in (
-                                "share", "login", "watch", "reel", "groups", "permalink",
-                                "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                            ):
-                                owner_url = f"https://m.facebook.com/{slug}"
-                                break
-                    except Exception:
-                        pass
-
-    
-    if owner_url is None:
-        try:
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                m = re.search(r"^/([^/?#]+)/?", href)
-                if m:
-                    slug = m.group(1)
-                    if slug and slug.lower() not in (
-                        "share", "login", "watch", "reel", "groups", "permalink",
-                        "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                    ):
-                        owner_url = f"https://m.facebook.com/{slug}"
-                        break
-        except Exception:
-            pass
-
-    
-    if owner_url is None:
-        try:
-            
-            m = re.search(r'https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?(?=["\\/\\?])', html)
-            if m:
-                slug = m.group(1)
-                if slug and slug.lower() not in (
-                    "share", "login", "watch", "reel", "groups", "permalink",
-                    "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                ):
-                    owner_url = f"https://m.facebook.com/{slug}"
-            if owner_url is None:
-                
-                for pat in [
-                    r'"entity_url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
-                    r'"actor"\\s*:\\s*\\{[\\s\\S]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
-                    r'"page_url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\/?#]+)\\/?',
-                ]:
-                    m = re.search(pat, html)
-                    if m:
-                        slug = m.group(1)
-                        if slug and slug.lower() not in (
-                            "share", "login", "watch", "reel", "groups", "permalink",
-                            "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                        ):
-                            owner_url = f"https://m.facebook.com/{slug}"
-                            break
-            if owner_url is None:
-                
-                for pat in [
-                    r'"pageID"\\s*:\\s*"([0-9]{4,})"',
-                    r'"actor_id"\\s*:\\s*"([0-9]{4,})"',
-                    r'"entity_id"\\s*:\\s*"([0-9]{4,})"',
-                    r'"owner"\\s*:\\s*\\{[\\s\\S]*?"id"\\s*:\\s*"([0-9]{4,})"',
-                ]:
-                    m = re.search(pat, html)
-                    if m:
-                        owner_url = f"https://m.facebook.com/profile.php?id={m.group(1)}"
-                        break
-        except Exception:
-            pass
-
-    
-    if owner_url is None:
-        try:
-            m = re.search(
-                r'"owner"\\s*:\\s*\\{[\\s\\S]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\\\/?#]+)',
-                html
-            )
-            if m:
-                slug = m.group(1)
-                if slug and slug.lower() not in (
-                    "share", "login", "watch", "reel", "groups", "permalink",
-                    "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                ):
-                    owner_url = f"https://m.facebook.com/{slug}"
-            if owner_url is None:
-                m = re.search(r'"owner"\\s*:\\s*\\{[\\s\\S]*?"id"\\s*:\\s*"([0-9]{4,})"', html)
-                if m:
-                    owner_url = f"https://m.facebook.com/profile.php?id={m.group(1)}"
-        except Exception:
-            pass
-
-    
-    if owner_url is None:
-        try:
-            m = re.search(
-                r'"actors"\\s*:\\s*\\[\\s*\\{[^}]*?"url"\\s*:\\s*"https:\\/\\/www\\.facebook\\.com\\/([^"\\\\/?#]+)',
-                html
-            )
-            if m:
-                slug = m.group(1)
-                if slug and slug.lower() not in (
-                    "share", "login", "watch", "reel", "groups", "permalink",
-                    "photo.php", "friends", "story.php", "marketplace", "profile", "pages", "gaming"
-                ):
-                    owner_url = f"https://m.facebook.com/{slug}"
-            if owner_url is None:
-                m = re.search(r'"actors"\\s*:\\s*\\[\\s*\\{[^}]*?"id"\\s*:\\s*"([0-9]{4,})"', html)
-                if m:
-                    owner_url = f"https://m.facebook.com/profile.php?id={m.group(1)}"
-        except Exception:
-            pass
-
     note = None if any([likes, shares, page_followers]) else "not_found"
     basic = _blank_basic(note=note, source_hint=source_hint)
     basic["likes"] = likes
     basic["shares"] = shares
     basic["page_followers"] = page_followers
     basic["owner_url"] = owner_url
+    basic["provenance"] = prov
     return basic
 
 
@@ -487,6 +370,7 @@ def parse_fb_group_basic(html: str) -> dict:
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    soup.decompose()
 
     members = _search_number_patterns(
         text,
@@ -498,6 +382,7 @@ def parse_fb_group_basic(html: str) -> dict:
 
     basic = _blank_basic(note=None if members is not None else "not_found", source_hint="text")
     basic["members"] = members
+    basic["provenance"] = single_strategy({"members": members})
     return basic
 
 
@@ -509,6 +394,7 @@ def parse_fb_group_post_basic(html: str) -> dict:
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    soup.decompose()
 
     likes = _search_number_patterns(
         text,
@@ -537,6 +423,7 @@ def parse_fb_group_post_basic(html: str) -> dict:
     basic["likes"] = likes
     basic["shares"] = shares
     basic["group_members"] = group_members
+    basic["provenance"] = single_strategy({"likes": likes, "shares": shares, "group_members": group_members})
     return basic
 
 
@@ -549,6 +436,7 @@ def parse_ig_profile_basic(html: str) -> dict:
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    soup.decompose()
 
     followers = _search_number_patterns(
         text,
@@ -561,6 +449,7 @@ def parse_ig_profile_basic(html: str) -> dict:
     note = None if followers is not None else "requires_login"
     basic = _blank_basic(note=note, source_hint="text")
     basic["followers"] = followers
+    basic["provenance"] = single_strategy({"followers": followers})
     return basic
 
 # ---------- IG: Post ----------
@@ -573,6 +462,7 @@ def parse_ig_post_basic(html: str) -> dict:
     """
     soup = BeautifulSoup(html or "", "html.parser")
     text = soup.get_text(" ", strip=True)
+    soup.decompose()
 
     likes = _search_number_patterns(
         text,
@@ -598,4 +488,5 @@ def parse_ig_post_basic(html: str) -> dict:
     basic = _blank_basic(note=note, source_hint="text")
     basic["likes"] = likes
     basic["owner_followers"] = owner_followers
+    basic["provenance"] = single_strategy({"likes": likes, "owner_followers": owner_followers})
     return basic
\ No newline at end of file
@@ -1,12 +1,64 @@
-from typing import Optional
+import os
+import threading
+import time
+from typing import Optional, Tuple, Dict, Any, List
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """cancel event was set while loading (the caller no longer needs the page)."""
+
+
+def _load_page(page, url: str, timeout: int, cancel: Optional[threading.Event] = None) -> None:
+    # First stage: DOM content loaded
+    page.goto(url, timeout=timeout * 1000, wait_until="domcontentloaded")
+    if cancel is not None and cancel.is_set():
+        raise Cancelled(url)
+    try:
+        page.wait_for_selector("body", timeout=3000)
+    except PlaywrightTimeoutError:
+        pass
+    # Second stage: try to reach network idle for fuller content
+    if cancel is None:
+        try:
+            page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+        except PlaywrightTimeoutError:
+            # It's okay if we don't reach full idle; use what we have.
+            pass
+        return
+    # Cancellable: wait for network idle in short steps
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cancel.is_set():
+            raise Cancelled(url)
+        try:
+            page.wait_for_load_state("networkidle", timeout=250)
+            return
+        except PlaywrightTimeoutError:
+            pass
+
+
+# 指定 user_agent 時一併送出的 Accept-Language（browser_pool 的 context 相同）
+UA_ACCEPT_LANGUAGE = "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7"
+
+
+def _page_html(page, compact: bool) -> str:
+    # compact：在頁內擷取所需片段（page_extract.py），不傳回整份 DOM
+    if compact:
+        from .page_extract import extract_in_page, render_compact_html
+        return render_compact_html(extract_in_page(page))
+    return page.content()
+
 
 def fetch_with_playwright(
     url: str,
     timeout: int = 15,  # seconds
     storage_state: Optional[str] = None,
     user_agent: Optional[str] = None,
+    compact: bool = False,
+    cancel: Optional[threading.Event] = None,
 ) -> Optional[str]:
     """
     Fetch fully-rendered HTML using Playwright (Chromium).
@@ -16,10 +68,20 @@ def fetch_with_playwright(
         timeout: Navigation timeout in seconds.
         storage_state: Optional path to Playwright storage state JSON (cookies/session). If provided, a logged-in context is used.
         user_agent: Optional custom User-Agent string.
+        compact: Extract anchors / meta / counter text inside the page and return them as
+            compact HTML (see page_extract.py) instead of the full DOM.
+        cancel: When set while loading, stop waiting, close the browser and return None
+            (e.g. the hedged requests fetch already won).
 
     Returns:
         Page HTML (string) if success, otherwise None.
+
+    With FBIG_BROWSER_POOL=1 the page is opened as a tab in the shared BrowserPool instead of a fresh browser.
     """
+    from .browser_pool import get_browser_pool
+    pool = get_browser_pool()
+    if pool is not None:
+        return pool.fetch(url, storage_state=storage_state, user_agent=user_agent, timeout=timeout, compact=compact, cancel=cancel)[0]
     html = None
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
@@ -32,21 +94,12 @@ def fetch_with_playwright(
         context = browser.new_context(**context_kwargs)
         page = context.new_page()
         if user_agent:
-            page.set_extra_http_headers({"Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7"})
+            page.set_extra_http_headers({"Accept-Language": UA_ACCEPT_LANGUAGE})
         try:
-            # First stage: DOM content loaded
-            page.goto(url, timeout=timeout * 1000, wait_until="domcontentloaded")
-            try:
-                page.wait_for_selector("body", timeout=3000)
-            except PlaywrightTimeoutError:
-                pass
-            # Second stage: try to reach network idle for fuller content
-            try:
-                page.wait_for_load_state("networkidle", timeout=timeout * 1000)
-            except PlaywrightTimeoutError:
-                # It's okay if we don't reach full idle; use what we have.
-                pass
-            html = page.content()
+            _load_page(page, url, timeout, cancel)
+            html = _page_html(page, compact)
+        except Cancelled:
+            html = None
         except Exception as e:
             print(f"[playwright] error: {e}")
             html = None
@@ -55,11 +108,76 @@ def fetch_with_playwright(
             browser.close()
     return html
 
-def resolve_final_url(url: str, timeout: int = 15, storage_state: Optional[str] = None, wait_until: str = "networkidle") -> Optional[str]:
+def fetch_with_capture(
+    url: str,
+    type_tag: str,
+    timeout: int = 15,
+    storage_state: Optional[str] = None,
+    compact: bool = False,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[Optional[str], Dict[str, int]]:
+    """
+    載入頁面時同時監聽 GraphQL / XHR 回應，從 JSON 擷取計數（見 counters.py）。
+    type_tag 需要的欄位都找到後即停止等待 networkidle；cancel 被設定時放棄並關閉瀏覽器，回傳 (None, {})。
+    回傳 (html, 擷取到的計數)。
+    """
+    from .counters import CounterCapture
+
+    capture = CounterCapture(type_tag, url)
+    html = None
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context_kwargs = {}
+        if storage_state:
+            context_kwargs["storage_state"] = storage_state
+        context = browser.new_context(**context_kwargs)
+        page = context.new_page()
+        page.on("response", capture.on_response)
+        try:
+            page.goto(url, timeout=timeout * 1000, wait_until="domcontentloaded")
+            capture.add_target(page.url)
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled(url)
+                capture.drain()
+                if capture.complete:
+                    break
+                try:
+                    page.wait_for_load_state("networkidle", timeout=250)
+                    capture.drain()
+                    break
+                except PlaywrightTimeoutError:
+                    pass
+            html = _page_html(page, compact)
+        except Cancelled:
+            return None, {}
+        except Exception as e:
+            print(f"[playwright] error: {e}")
+            html = None
+        finally:
+            context.close()
+            browser.close()
+    return html, capture.found
+
+
+def resolve_final_url(
+    url: str,
+    timeout: int = 15,
+    storage_state: Optional[str] = None,
+    wait_until: str = "networkidle",
+    cancel: Optional[threading.Event] = None,
+) -> Optional[str]:
     """
     以 Playwright 導航並回傳最終的 page.url（不取 HTML）。
     用於處理 facebook.com/share/r 類型的 JS 轉址。
+    cancel 被設定時停止等待並關閉瀏覽器（回傳當下的 URL）。
+    FBIG_BROWSER_POOL=1 時在共用瀏覽器池開分頁。
     """
+    from .browser_pool import get_browser_pool
+    pool = get_browser_pool()
+    if pool is not None:
+        return pool.navigate(url, storage_state=storage_state, timeout=timeout, cancel=cancel)["final_url"]
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
@@ -68,8 +186,16 @@ def resolve_final_url(url: str, timeout: int = 15, storage_state: Optional[str]
                 context_kwargs["storage_state"] = storage_state
             context = browser.new_context(**context_kwargs)
             page = context.new_page()
+            deadline = time.time() + timeout
             try:
-                page.goto(url, wait_until=wait_until, timeout=timeout * 1000)
+                page.goto(url, wait_until="commit", timeout=timeout * 1000)
+                # 分段等待 wait_until，期間檢查 cancel，被取消時不必等到逾時
+                while not (cancel is not None and cancel.is_set()) and time.time() < deadline:
+                    try:
+                        page.wait_for_load_state(wait_until, timeout=250)
+                        break
+                    except PlaywrightTimeoutError:
+                        pass
             except PlaywrightTimeoutError:
                 # 即便超時也儘量回傳目前的 URL
                 pass
@@ -78,4 +204,155 @@ def resolve_final_url(url: str, timeout: int = 15, storage_state: Optional[str]
             browser.close()
             return final
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+
+def warm_context(storage_state: Optional[str] = None, user_agent: Optional[str] = None):
+    """
+    回傳目前執行緒共用 browser 上的 BrowserContext（每個 storage_state / UA 組合一個），
+    重複呼叫不會重新啟動 Chromium 或重新載入 cookies。
+    storage_state 檔案 mtime 改變時會建立新的 context。
+    （sync API 綁定執行緒，因此 browser 與 context 以 thread-local 保存。）
+    """
+    browser = getattr(_local, "browser", None)
+    if browser is None or not browser.is_connected():
+        if getattr(_local, "pw", None) is None:
+            _local.pw = sync_playwright().start()
+        browser = _local.pw.chromium.launch(headless=True)
+        _local.browser = browser
+        _local.contexts = {}
+
+    path = os.path.abspath(storage_state) if storage_state else None
+    mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+    key = (path, mtime, user_agent)
+    ctx = _local.contexts.get(key)
+    if ctx is None:
+        for old_key in [k for k in _local.contexts if k[0] == path and k[2] == user_agent]:
+            try:
+                _local.contexts.pop(old_key).close()
+            except Exception:
+                pass
+        context_kwargs = {}
+        if path:
+            context_kwargs["storage_state"] = path
+        if user_agent:
+            context_kwargs["user_agent"] = user_agent
+        ctx = browser.new_context(**context_kwargs)
+        _local.contexts[key] = ctx
+    return ctx
+
+
+def fetch_in_context(context, url: str, timeout: int = 15) -> Tuple[Optional[str], Optional[str]]:
+    """
+    在既有（warm）context 開新分頁抓取，回傳 (html, final_url)；只關閉分頁，不關 context。
+    """
+    page = context.new_page()
+    try:
+        _load_page(page, url, timeout)
+        return page.content(), page.url
+    except Exception as e:
+        print(f"[playwright] error: {e}")
+        return None, None
+    finally:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def close_warm_contexts() -> None:
+    """關閉目前執行緒的共用 browser / contexts。"""
+    for ctx in list((getattr(_local, "contexts", None) or {}).values()):
+        try:
+            ctx.close()
+        except Exception:
+            pass
+    _local.contexts = {}
+    browser = getattr(_local, "browser", None)
+    if browser is not None:
+        try:
+            browser.close()
+        except Exception:
+            pass
+        _local.browser = None
+    pw = getattr(_local, "pw", None)
+    if pw is not None:
+        try:
+            pw.stop()
+        except Exception:
+            pass
+        _local.pw = None
+
+
+# owner 連結候選：排除這些第一段路徑（與 inspect.py 的 bad_first 一致）
+OWNER_PATH_EXCLUDE = (
+    "share", "reel", "watch", "photo.php", "story.php", "permalink.php", "marketplace", "gaming", "friends",
+    "groups", "profile.php", "data", "privacy_sandbox", "help", "settings", "policy", "login", "pages",
+)
+
+_OWNER_LINKS_JS = """
+(exclude) => {
+  const seen = new Set(), out = [];
+  for (const a of document.querySelectorAll("a[href]")) {
+    if (!(a.getAttribute("role") === "link" || a.getAttribute("aria-label") || a.closest("h2, h3, strong"))) continue;
+    const m = /^https?:\\/\\/(?:www|m|web)\\.facebook\\.com\\/([^/?#]+)/.exec(a.href);
+    if (!m || exclude.includes(m[1].toLowerCase())) continue;
+    const u = "https://m.facebook.com/" + m[1];
+    if (!seen.has(u)) { seen.add(u); out.push(u); }
+    if (out.length >= 20) break;
+  }
+  return out;
+}
+"""
+
+
+class BrowserSession:
+    """
+    一次 inspect 內共用的瀏覽器導航鏈：navigate() 一次導航同時取得最終網址、HTML
+    與 owner 連結候選；之後的 owner 頁用 fetch() 在同一個 warm context 開啟，
+    共用 cookies、HTTP cache 與連線，不再為每一步冷啟動 Chromium。
+    context 來自 warm_context（thread-local），只能在建立它的執行緒使用；
+    FBIG_BROWSER_POOL=1 時改在共用瀏覽器池中同一 storage_state 的 context 開分頁，不限執行緒。
+    """
+
+    def __init__(self, storage_state: Optional[str] = None, timeout: int = 15, compact: bool = False):
+        self.storage_state = storage_state
+        self.timeout = timeout
+        self.compact = compact
+        self.navigations = 0
+        self._context = None
+
+    def _ctx(self):
+        if self._context is None:
+            self._context = warm_context(self.storage_state)
+        return self._context
+
+    def navigate(self, url: str) -> Dict[str, Any]:
+        """導航一次，回傳 {"final_url", "html", "owner_links"}；失敗時 html 為 None。"""
+        self.navigations += 1
+        from .browser_pool import get_browser_pool
+        pool = get_browser_pool()
+        if pool is not None:
+            return pool.navigate(url, storage_state=self.storage_state, timeout=self.timeout, compact=self.compact, owner_links=True)
+        out: Dict[str, Any] = {"final_url": None, "html": None, "owner_links": []}
+        page = self._ctx().new_page()
+        try:
+            _load_page(page, url, self.timeout)
+            out["final_url"] = page.url
+            try:
+                out["owner_links"] = page.evaluate(_OWNER_LINKS_JS, list(OWNER_PATH_EXCLUDE))
+            except Exception:
+                pass
+            out["html"] = _page_html(page, self.compact)
+        except Exception as e:
+            print(f"[playwright] error: {e}")
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+        return out
+
+    def fetch(self, url: str) -> Optional[str]:
+        """在同一個 context 開啟另一頁（例如 owner 頁），只回傳 HTML。"""
+        return self.navigate(url)["html"]
@@ -0,0 +1,231 @@
+"""
+inspect_url 的選用 profiling。
+
+啟用方式：inspect_url(..., profile=True)，或以 FBIG_PROFILE_RATE（0~1）抽樣。
+- FBIG_PROFILE_MODE=sample（預設）：背景執行緒每 FBIG_PROFILE_INTERVAL_MS（預設 5ms）取樣呼叫堆疊，
+  輸出 folded stacks（flamegraph.pl / speedscope 可直接讀）
+- FBIG_PROFILE_MODE=cprofile：cProfile，輸出 .prof（pstats / snakeviz）
+- 同時統計 parser.py / inspect.py 內每個 re.* 呼叫點的次數與耗時，以及 BeautifulSoup 建構次數
+  （僅計入正在 profiling 的執行緒；FBIG_PARSE_PROCESSES 子程序內的解析不在統計內）
+- FBIG_PROFILE_DIR 有設定時寫檔，否則把前 N 條 folded stacks 附在結果的 meta.profile
+"""
+import cProfile
+import hashlib
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+PROFILED_FILES = ("parser.py", "inspect.py")
+# 以本套件目錄下的完整路徑比對，避免其他套件的同名檔案（例如標準庫的 inspect.py）被計入
+_PROFILED_PATHS = frozenset(
+    os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), name)) for name in PROFILED_FILES
+)
+_profiled_cache: Dict[str, bool] = {}
+_RE_FUNCS = ("search", "match", "fullmatch", "findall", "finditer", "sub", "subn", "split")
+INLINE_STACKS = 50
+
+_install_lock = threading.Lock()
+_installed = 0
+_originals: Dict[str, Any] = {}
+# thread id → 目前的 ProfileState
+_active: Dict[int, "ProfileState"] = {}
+
+
+def should_profile(flag: Optional[bool] = None) -> bool:
+    """flag 明確指定時照辦；否則依 FBIG_PROFILE_RATE 抽樣。"""
+    if flag is not None:
+        return flag
+    try:
+        rate = float(os.getenv("FBIG_PROFILE_RATE", "0") or 0)
+    except ValueError:
+        return False
+    return rate > 0 and random.random() < rate
+
+
+class ProfileState:
+    def __init__(self):
+        self.regex_calls: Counter = Counter()
+        self.regex_time: Dict[str, float] = defaultdict(float)
+        self.soup_count = 0
+        self.samples: Counter = Counter()
+
+    def regex_add(self, key: str, dt: float) -> None:
+        self.regex_calls[key] += 1
+        self.regex_time[key] += dt
+
+
+def _caller_key(depth: int = 2) -> Optional[str]:
+    f = sys._getframe(depth)
+    path = f.f_code.co_filename
+    profiled = _profiled_cache.get(path)
+    if profiled is None:
+        profiled = _profiled_cache[path] = os.path.normcase(os.path.abspath(path)) in _PROFILED_PATHS
+    if not profiled:
+        return None
+    return f"{os.path.basename(path)}:{f.f_code.co_name}:{f.f_lineno}"
+
+
+def _timed_iter(it, st: ProfileState, key: str):
+    while True:
+        t = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            st.regex_add(key, time.perf_counter() - t)
+            return
+        st.regex_add(key, time.perf_counter() - t)
+        yield item
+
+
+def _wrap_re(name: str, orig):
+    def wrapper(*args, **kwargs):
+        st = _active.get(threading.get_ident())
+        if st is None:
+            return orig(*args, **kwargs)
+        key = _caller_key()
+        if key is None:
+            return orig(*args, **kwargs)
+        t = time.perf_counter()
+        result = orig(*args, **kwargs)
+        st.regex_add(key, time.perf_counter() - t)
+        if name == "finditer":
+            return _timed_iter(result, st, key)
+        return result
+
+    wrapper.__wrapped__ = orig
+    return wrapper
+
+
+def _install() -> None:
+    """以 refcount 保護的 monkeypatch：第一個 profiling 開始時安裝，最後一個結束時還原。"""
+    global _installed
+    with _install_lock:
+        _installed += 1
+        if _installed > 1:
+            return
+        for name in _RE_FUNCS:
+            _originals[name] = getattr(re, name)
+            setattr(re, name, _wrap_re(name, _originals[name]))
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError:
+            return
+        orig_init = BeautifulSoup.__init__
+        _originals["bs4_init"] = orig_init
+
+        def counting_init(self, *args, **kwargs):
+            st = _active.get(threading.get_ident())
+            if st is not None:
+                st.soup_count += 1
+            return orig_init(self, *args, **kwargs)
+
+        BeautifulSoup.__init__ = counting_init
+
+
+def _uninstall() -> None:
+    global _installed
+    with _install_lock:
+        _installed -= 1
+        if _installed > 0:
+            return
+        for name in _RE_FUNCS:
+            if name in _originals:
+                setattr(re, name, _originals.pop(name))
+        if "bs4_init" in _originals:
+            from bs4 import BeautifulSoup
+            BeautifulSoup.__init__ = _originals.pop("bs4_init")
+
+
+def _frame_label(f) -> str:
+    return f"{os.path.basename(f.f_code.co_filename)}:{f.f_code.co_name}"
+
+
+def _sampler(target: int, st: ProfileState, stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        f = sys._current_frames().get(target)
+        if f is None:
+            continue
+        stack = []
+        while f is not None:
+            stack.append(_frame_label(f))
+            f = f.f_back
+        st.samples[";".join(reversed(stack))] += 1
+
+
+@contextmanager
+def profile_session(label: str) -> Iterator[Dict[str, Any]]:
+    """
+    對目前執行緒 profiling；離開時把摘要填入 yield 出的 dict：
+    mode / total_ms / regex（耗時前 20 的呼叫點）/ soup_constructions / files 或 folded。
+    """
+    mode = os.getenv("FBIG_PROFILE_MODE", "sample")
+    out_dir = os.getenv("FBIG_PROFILE_DIR")
+    interval = int(os.getenv("FBIG_PROFILE_INTERVAL_MS", "5")) / 1000
+    summary: Dict[str, Any] = {"mode": mode}
+    tid = threading.get_ident()
+    st = ProfileState()
+    _install()
+    _active[tid] = st
+    prof, stop, sampler = None, None, None
+    if mode == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+    else:
+        stop = threading.Event()
+        sampler = threading.Thread(target=_sampler, args=(tid, st, stop, interval), daemon=True)
+        sampler.start()
+    t0 = time.time()
+    try:
+        yield summary
+    finally:
+        if prof is not None:
+            prof.disable()
+        if sampler is not None:
+            stop.set()
+            sampler.join()
+        _active.pop(tid, None)
+        _uninstall()
+
+        summary["total_ms"] = int((time.time() - t0) * 1000)
+        summary["soup_constructions"] = st.soup_count
+        top = sorted(st.regex_time.items(), key=lambda kv: kv[1], reverse=True)[:20]
+        summary["regex"] = [
+            {"site": k, "calls": st.regex_calls[k], "ms": round(v * 1000, 2)} for k, v in top
+        ]
+        summary["regex_total_ms"] = round(sum(st.regex_time.values()) * 1000, 2)
+        folded = [f"{stack} {n}" for stack, n in st.samples.most_common()]
+
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            stem = os.path.join(
+                out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{hashlib.sha1(label.encode('utf-8')).hexdigest()[:8]}"
+            )
+            files = []
+            if prof is not None:
+                prof.dump_stats(stem + ".prof")
+                files.append(stem + ".prof")
+            else:
+                with open(stem + ".folded", "w", encoding="utf-8") as f:
+                    f.write("\n".join(folded) + ("\n" if folded else ""))
+                files.append(stem + ".folded")
+            with open(stem + ".json", "w", encoding="utf-8") as f:
+                json.dump(dict(summary, label=label), f, ensure_ascii=False, indent=1)
+            files.append(stem + ".json")
+            summary["files"] = files
+        elif prof is None:
+            summary["folded"] = folded[:INLINE_STACKS]
+        else:
+            stats = pstats.Stats(prof)
+            rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:20]
+            summary["top_cumulative"] = [
+                {"func": f"{os.path.basename(fn)}:{line}:{name}", "calls": nc, "cum_ms": round(ct * 1000, 2)}
+                for (fn, line, name), (_, nc, _, ct, _) in rows
+            ]
@@ -0,0 +1,112 @@
+"""
+漸進式結果：第一次抓取 + 解析完成就送出 primary 事件，之後 owner / 分享連結等後續步驟
+每補上一個欄位就送出 update 事件，最後送出 final（完整結果，與 inspect_url 回傳值相同）。
+
+requests 串流讀到 </head> 時會先送出 head 事件（只含 og:*，body 尚未下載完；
+之後若改用其他路徑抓取，以 primary / final 為準）。
+
+事件格式（皆為可 JSON 化的 dict）：
+    {"event": "head", "type": ..., "data": {og:*}, "elapsed_ms": ...}
+    {"event": "primary", "type": ..., "data": {og:* / basic / 基礎資訊 / kind}, "elapsed_ms": ...}
+    {"event": "update", "field": "page_followers", "value": 12345, "elapsed_ms": ...}
+    {"event": "final", "result": {...}, "elapsed_ms": ...}
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .og import OG_FIELDS
+
+# 送出 update 事件的欄位（basic.* 與 data.final_permalink）
+PROGRESS_FIELDS = ("page_followers", "owner_url", "owner_name", "final_permalink")
+
+_MISSING = object()
+
+
+class WatchedDict(dict):
+    """PROGRESS_FIELDS 被設為新的非 None 值時呼叫 notify(key, value)。"""
+
+    __slots__ = ("_notify",)
+
+    def __init__(self, notify: Callable[[str, Any], None], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._notify = notify
+
+    def __setitem__(self, key, value):
+        old = self.get(key, _MISSING)
+        super().__setitem__(key, value)
+        if key in PROGRESS_FIELDS and value is not None and value != old:
+            self._notify(key, value)
+
+
+class Progress:
+    """一次 inspect 的事件來源；on_update 拋出的例外不影響檢測本身。"""
+
+    def __init__(self, on_update: Callable[[Dict[str, Any]], None], t0: Optional[float] = None):
+        self.on_update = on_update
+        self.t0 = t0 if t0 is not None else time.time()
+        self._head_sent = False
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        event["elapsed_ms"] = int((time.time() - self.t0) * 1000)
+        try:
+            self.on_update(event)
+        except Exception:
+            pass
+
+    def watch(self, data: Dict[str, Any]) -> WatchedDict:
+        """把 data 與 data["basic"] 換成 WatchedDict，之後的欄位變化會送出 update。"""
+        watched = WatchedDict(self._on_field, data)
+        if isinstance(data.get("basic"), dict):
+            dict.__setitem__(watched, "basic", WatchedDict(self._on_field, data["basic"]))
+        return watched
+
+    @staticmethod
+    def detach(data: Dict[str, Any]) -> Dict[str, Any]:
+        """還原成一般 dict（回傳值不帶 callback）。"""
+        out = dict(data)
+        if isinstance(out.get("basic"), dict):
+            out["basic"] = dict(out["basic"])
+        return out
+
+    def _on_field(self, key: str, value: Any) -> None:
+        self._emit({"event": "update", "field": key, "value": value})
+
+    def head(self, type_tag: Optional[str], meta: Dict[str, Any]) -> None:
+        """只送出第一次；重試 / hedge 的後續 head 不再重複。"""
+        if self._head_sent:
+            return
+        self._head_sent = True
+        self._emit({"event": "head", "type": type_tag, "data": {k: meta.get(k) for k in OG_FIELDS}})
+
+    def primary(self, type_tag: Optional[str], data: Dict[str, Any]) -> None:
+        self._emit({"event": "primary", "type": type_tag, "data": self.detach(data)})
+
+    def final(self, result: Any) -> None:
+        if hasattr(result, "to_dict"):
+            result = result.to_dict()
+        self._emit({"event": "final", "result": result})
+
+
+def iter_events(run: Callable[[Callable[[Dict[str, Any]], None]], Any]) -> Iterator[Dict[str, Any]]:
+    """
+    在背景執行緒執行 run(on_update)，依序產出事件，最後一個必為 final。
+    run 拋出例外時改送 {"event": "final", "result": None, "error": ...}。
+    """
+    q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+
+    def target():
+        try:
+            run(q.put)
+        except Exception as e:
+            q.put({"event": "final", "result": None, "error": f"exception: {type(e).__name__}: {e}"})
+        finally:
+            q.put(None)
+
+    threading.Thread(target=target, name="inspect-progress", daemon=True).start()
+    while True:
+        event = q.get()
+        if event is None:
+            return
+        yield event
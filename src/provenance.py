@@ -0,0 +1,164 @@
+"""
+擷取來源（provenance）：記錄每個欄位是由哪一個 fallback 策略取得，並據此調整策略順序。
+
+extractor 以 run_strategies() 依序嘗試具名策略，把 {"by": 勝出策略, "tried": [...]} 寫入 prov；
+parse_pool.parse_basic 在主程序呼叫 observe_basic() 累計次數（FBIG_PROVENANCE_STATS 指定 JSON 檔時跨次保存）。
+
+策略順序設定：
+- FBIG_STRATEGY_ORDER=auto：依累計命中率排序（預設 declared，即程式內宣告順序）；
+  只有已累計 MIN_ORDER_SAMPLES 次嘗試的策略會移動，其餘留在宣告位置
+- FBIG_DISABLED_STRATEGIES：逗號分隔的 extractor.field.strategy，field 可用 *，例如
+  fb_post.owner_url.anchor_relative,fb_post.*.aria_label
+- FBIG_PRUNE_STRATEGIES=1：嘗試 PRUNE_AFTER 次仍從未命中的策略自動停用
+"""
+import atexit
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+PRUNE_AFTER = 200
+# auto 排序時，嘗試次數少於此值的策略沒有可信的命中率，維持宣告順序的位置
+MIN_ORDER_SAMPLES = 20
+
+
+class StrategyStats:
+    """{extractor: {field: {strategy: {"tries", "hits"}}}}；save() 以原子替換寫回 JSON。"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = {}
+        self._dirty = 0
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    def observe(self, extractor: str, prov: Dict[str, Any]) -> None:
+        with self._lock:
+            ex = self._data.setdefault(extractor, {})
+            for field, rec in prov.items():
+                if not isinstance(rec, dict):
+                    continue
+                fs = ex.setdefault(field, {})
+                for name in rec.get("tried") or []:
+                    st = fs.setdefault(name, {"tries": 0, "hits": 0})
+                    st["tries"] += 1
+                    if name == rec.get("by"):
+                        st["hits"] += 1
+            self._dirty += 1
+            flush = self._dirty >= 50
+        if flush:
+            self.save()
+
+    def get(self, extractor: str, field: str, name: str) -> Dict[str, int]:
+        with self._lock:
+            st = ((self._data.get(extractor) or {}).get(field) or {}).get(name)
+            return dict(st) if st else {"tries": 0, "hits": 0}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            self._dirty = 0
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_stats_lock = threading.Lock()
+_stats: Optional[StrategyStats] = None
+
+
+def get_stats() -> StrategyStats:
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = StrategyStats(os.getenv("FBIG_PROVENANCE_STATS"))
+            atexit.register(_stats.save)
+        return _stats
+
+
+def _disabled(extractor: str, field: str, name: str) -> bool:
+    raw = os.getenv("FBIG_DISABLED_STRATEGIES")
+    if not raw:
+        return False
+    for item in raw.split(","):
+        parts = item.strip().split(".")
+        if len(parts) != 3:
+            continue
+        ex, f, s = parts
+        if ex == extractor and f in (field, "*") and s == name:
+            return True
+    return False
+
+
+def strategy_order(extractor: str, field: str, names: Sequence[str]) -> List[str]:
+    """依設定回傳實際執行順序（停用的策略已移除）。"""
+    stats = get_stats()
+    out = [n for n in names if not _disabled(extractor, field, n)]
+    if os.getenv("FBIG_PRUNE_STRATEGIES") == "1":
+        kept = []
+        for n in out:
+            st = stats.get(extractor, field, n)
+            if not (st["tries"] >= PRUNE_AFTER and st["hits"] == 0):
+                kept.append(n)
+        out = kept
+    if os.getenv("FBIG_STRATEGY_ORDER") == "auto":
+        # 只在「有統計的策略」所佔的位置之間依命中率重排；沒有統計的策略不動
+        rates = {}
+        for n in out:
+            st = stats.get(extractor, field, n)
+            if st["tries"] >= MIN_ORDER_SAMPLES:
+                rates[n] = (st["hits"] + 1) / (st["tries"] + 2)
+        ranked = iter(sorted(rates, key=rates.get, reverse=True))
+        out = [next(ranked) if n in rates else n for n in out]
+    return out
+
+
+def run_strategies(
+    extractor: str,
+    field: str,
+    strategies: Sequence[Tuple[str, Callable[[], Any]]],
+    prov: Dict[str, Any],
+) -> Any:
+    """依 strategy_order 執行策略，第一個回傳非 None 者勝出；過程寫入 prov[field]。"""
+    funcs = dict(strategies)
+    tried: List[str] = []
+    for name in strategy_order(extractor, field, [n for n, _ in strategies]):
+        tried.append(name)
+        try:
+            value = funcs[name]()
+        except Exception:
+            value = None
+        if value is not None:
+            prov[field] = {"by": name, "tried": tried}
+            return value
+    prov[field] = {"by": None, "tried": tried}
+    return None
+
+
+def observe_basic(extractor: str, basic: Dict[str, Any]) -> Dict[str, Any]:
+    """累計 basic["provenance"]，並把它化約為 {field: 勝出策略}（結果內只保留這部分）。"""
+    prov = basic.get("provenance")
+    if not isinstance(prov, dict):
+        return basic
+    get_stats().observe(extractor, prov)
+    basic["provenance"] = {f: (r.get("by") if isinstance(r, dict) else r) for f, r in prov.items()}
+    return basic
+
+
+def single_strategy(values: Dict[str, Any], name: str = "text") -> Dict[str, Any]:
+    """只有一個策略的 extractor：依欄位是否取得值產生 prov。"""
+    return {f: {"by": name if v is not None else None, "tried": [name]} for f, v in values.items()}
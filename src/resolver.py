@@ -0,0 +1,346 @@
+import atexit
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Dict, Any, List
+from urllib.parse import urljoin, urlsplit, parse_qs, unquote
+
+import requests
+
+from .fetcher import UA_POOL, get_session
+from .shared_cache import get_shared_cache
+
+SNIFF_BYTES = 16 * 1024
+MAX_HOPS = 10
+
+# 外連跳轉頁：目標網址就在 u= 參數裡，本地解碼即可
+WRAPPER_HOSTS = ("l.facebook.com", "lm.facebook.com", "l.instagram.com")
+WRAPPER_PATHS = ("/l.php", "/flx/warn/")
+# 本身就是目標站台的網域，不需再跟隨轉址
+TARGET_HOSTS = ("facebook.com", "instagram.com", "fb.watch", "fb.com")
+
+CACHE_TTL_S = 30 * 24 * 3600
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+_META_REFRESH = re.compile(
+    r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]+content=["\'][^"\']*?url\s*=\s*([^"\'>\s]+)',
+    re.I,
+)
+# 只在 <script> 內容中比對；(?<![\w-]) 避免 data-location="..." 之類的屬性被當成轉址
+_JS_LOCATION = re.compile(
+    r'(?<![\w-])(?:(?:window|document|top|self)\.)?location(?:\.href)?\s*=\s*["\']([^"\']+)["\']'
+    r'|(?<![\w-])location\.(?:replace|assign)\(\s*["\']([^"\']+)["\']',
+)
+_JS_LOCATION_HINT = re.compile(r"(?<![\w-])(?:location\.(?:replace|assign|href)|window\.location)")
+# 前段 HTML 可能截在 script 中間，未結束的最後一段也算
+_SCRIPT_BODY = re.compile(r"<script\b[^>]*>([\s\S]*?)(?:</script\s*>|$)", re.I)
+
+
+def _script_text(head: str) -> str:
+    return "\n".join(m.group(1) for m in _SCRIPT_BODY.finditer(head))
+
+
+def _decode(raw: bytes, encoding: Optional[str]) -> str:
+    try:
+        return raw.decode(encoding or "utf-8", errors="replace")
+    except LookupError:  # 伺服器宣告了 Python 不認得的編碼
+        return raw.decode("utf-8", errors="replace")
+
+
+def _shared_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def _unescape_js(u: str) -> str:
+    return u.replace("\\/", "/").replace("\\u0025", "%").replace("&amp;", "&")
+
+
+def follow_redirects(
+    url: str,
+    timeout: float = 8,
+    max_hops: int = MAX_HOPS,
+    storage_state: Optional[str] = None,
+    sniff_bytes: int = SNIFF_BYTES,
+    stop_at: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    不下載整頁地跟隨轉址鏈：每一跳用 allow_redirects=False 的串流 GET，
+    3xx 只讀 header 的 Location；2xx 只讀前 sniff_bytes 尋找 meta refresh / JS location。
+    stop_at(url) 為真時停在該網址、不再請求它。
+
+    回傳：
+      final_url      最後停留的網址
+      hops           [{"url", "status", "location", "via"}]（via：http / meta_refresh / js）
+      bytes          讀取的 body 位元組數
+      needs_browser  頁面疑似以 JS 轉址但無法從前段 HTML 解析出目標
+      error          例外訊息（有的話）
+    """
+    session = get_session(storage_state) if storage_state else None
+    session = session or _shared_session()
+    headers = {"User-Agent": random.choice(UA_POOL), "Accept-Language": "en-US,en;q=0.9"}
+    hops: List[Dict[str, Any]] = []
+    out: Dict[str, Any] = {"final_url": url, "hops": hops, "bytes": 0, "needs_browser": False, "error": None}
+    current = url
+    seen = {url}
+    try:
+        for _ in range(max_hops):
+            if stop_at is not None and current != url and stop_at(current):
+                break
+            r = session.get(current, headers=headers, timeout=timeout, allow_redirects=False, stream=True)
+            try:
+                status = r.status_code
+                loc = r.headers.get("Location")
+                if 300 <= status < 400 and loc:
+                    nxt = urljoin(current, loc)
+                    hops.append({"url": current, "status": status, "location": nxt, "via": "http"})
+                    current = nxt
+                    if current in seen:
+                        break
+                    seen.add(current)
+                    continue
+
+                nxt, via = None, None
+                ctype = (r.headers.get("Content-Type") or "").lower()
+                if status == 200 and "html" in ctype:
+                    raw = b""
+                    for chunk in r.iter_content(4096):
+                        raw += chunk
+                        if len(raw) >= sniff_bytes:
+                            break
+                    out["bytes"] += len(raw)
+                    head = _decode(raw[:sniff_bytes], r.encoding)
+                    m = _META_REFRESH.search(head)
+                    if m:
+                        nxt, via = m.group(1), "meta_refresh"
+                    else:
+                        scripts = _script_text(head)
+                        m = _JS_LOCATION.search(scripts)
+                        if m:
+                            nxt, via = m.group(1) or m.group(2), "js"
+                        elif _JS_LOCATION_HINT.search(scripts):
+                            out["needs_browser"] = True
+                if nxt:
+                    nxt = urljoin(current, _unescape_js(nxt))
+                    if nxt not in seen:
+                        hops.append({"url": current, "status": status, "location": nxt, "via": via})
+                        current = nxt
+                        seen.add(current)
+                        continue
+                break
+            finally:
+                r.close()
+    except requests.RequestException as e:
+        out["error"] = str(e)
+    out["final_url"] = current
+    return out
+
+
+def _host(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def _on_hosts(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def _is_known_link(url: str) -> bool:
+    """已到達 FB / IG 網域（含外連包裝）就不必再連網跟隨。"""
+    return _on_hosts(_host(url), TARGET_HOSTS)
+
+
+def unwrap_url(url: str, max_depth: int = 5) -> str:
+    """
+    不連網地拆開 l.facebook.com / lm.facebook.com / l.instagram.com 的 l.php?u=、
+    facebook.com/flx/warn/?u= 與 instagram.com/l/<encoded> 外連包裝（可巢狀）。
+    不是包裝網址時原樣回傳。
+    """
+    for _ in range(max_depth):
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        target = None
+        if host in WRAPPER_HOSTS or (_on_hosts(host, ("facebook.com",)) and parts.path in WRAPPER_PATHS):
+            target = (parse_qs(parts.query).get("u") or [None])[0]
+        elif _on_hosts(host, ("instagram.com",)) and parts.path.startswith("/l/"):
+            target = (parse_qs(parts.query).get("u") or [None])[0] or unquote(parts.path[len("/l/"):])
+        if not target or not re.match(r"https?://", target, re.I):
+            return url
+        url = target
+    return url
+
+
+class HopCache:
+    """
+    已解析短網址的持久快取（JSON 檔）：url → {"final_url", "hops", "ts"}。
+    短網址的對應幾乎不變，預設保留 30 天（FBIG_RESOLVE_CACHE_TTL，秒）。
+    以 LRU 保留最多 max_entries 筆（FBIG_RESOLVE_CACHE_MAX，預設 50000），載入與寫檔時清掉過期項目。
+    寫檔合併進行：距上次寫入超過 flush_interval 秒或累積 flush_every 筆變更才寫，程序結束時補寫。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = CACHE_TTL_S,
+        max_entries: int = 50_000,
+        flush_interval: float = 5.0,
+        flush_every: int = 100,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = 0
+        self._last_flush = time.time()
+        try:
+            with open(path, encoding="utf-8") as f:
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                # 檔案內依最近使用排序（舊 → 新）
+                self._data = OrderedDict(loaded)
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self._prune(time.time())
+        atexit.register(self.flush)
+
+    def _prune(self, now: float, expired: bool = True) -> None:
+        if expired:
+            for key in [k for k, e in self._data.items() if now - e.get("ts", 0) >= self.ttl]:
+                del self._data[key]
+                self._dirty += 1
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._dirty += 1
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(url)
+            if entry is None:
+                return None
+            if time.time() - entry.get("ts", 0) >= self.ttl:
+                del self._data[url]
+                self._dirty += 1
+                return None
+            self._data.move_to_end(url)
+            return entry
+
+    def put(self, url: str, final_url: str, hops: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[url] = {"final_url": final_url, "hops": hops, "ts": int(now)}
+            self._data.move_to_end(url)
+            self._dirty += 1
+            self._prune(now, expired=False)  # 過期項目在寫檔時才整批清除
+            due = self._dirty >= self.flush_every or now - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """有未寫入的變更時整檔寫出（tmp + os.replace）。"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._prune(time.time())
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+                self._dirty = 0
+                self._last_flush = time.time()
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[HopCache] = None
+
+
+def get_hop_cache() -> Optional[HopCache]:
+    """FBIG_RESOLVE_CACHE 指定快取檔時回傳共用的 HopCache，否則 None。"""
+    global _cache
+    path = os.getenv("FBIG_RESOLVE_CACHE")
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            if _cache is not None:
+                _cache.flush()
+            _cache = HopCache(
+                path,
+                ttl=float(os.getenv("FBIG_RESOLVE_CACHE_TTL", CACHE_TTL_S)),
+                max_entries=int(os.getenv("FBIG_RESOLVE_CACHE_MAX", "50000")),
+            )
+        return _cache
+
+
+def resolve_link(url: str, storage_state: Optional[str] = None, timeout: float = 8) -> Dict[str, Any]:
+    """
+    classify 之前的解析階段：
+      1. 本地拆開 FB / IG 外連包裝（unwrap_url，不連網）
+      2. 仍不在 FB / IG 網域的網址（第三方短網址）以 follow_redirects 跟隨，不下載整頁
+      3. 跟隨結果寫入 HopCache（與 FBIG_SHARED_CACHE 的跨程序快取），下次直接命中
+
+    回傳 {"final_url", "hops", "resolved_with"}，resolved_with：none / local / cache / shared_cache / http。
+    """
+    out: Dict[str, Any] = {"final_url": url, "hops": [], "resolved_with": "none"}
+    unwrapped = unwrap_url(url)
+    if unwrapped != url:
+        out["hops"].append({"url": url, "status": None, "location": unwrapped, "via": "unwrap"})
+        out["final_url"] = unwrapped
+        out["resolved_with"] = "local"
+        url = unwrapped
+
+    if not re.match(r"https?://", url, re.I) or _is_known_link(url):
+        return out
+
+    cache = get_hop_cache()
+    entry = cache.get(url) if cache else None
+    if entry:
+        out["hops"].extend(entry["hops"])
+        out["final_url"] = entry["final_url"]
+        out["resolved_with"] = "cache"
+        return out
+    shared = get_shared_cache()
+    entry = shared.get("resolve", url) if shared else None
+    if entry:
+        out["hops"].extend(entry.get("hops") or [])
+        out["final_url"] = entry["final_url"]
+        out["resolved_with"] = "shared_cache"
+        return out
+
+    res = follow_redirects(url, timeout=timeout, storage_state=storage_state, stop_at=_is_known_link)
+    if res["error"] and not res["hops"]:
+        return out
+    final = unwrap_url(res["final_url"])
+    hops = res["hops"]
+    if final != res["final_url"]:
+        hops.append({"url": res["final_url"], "status": None, "location": final, "via": "unwrap"})
+    if cache and not res["error"]:
+        cache.put(url, final, hops)
+    if shared and not res["error"]:
+        # hops 太長放不進 slot 時只存最終網址
+        if not shared.put("resolve", url, {"final_url": final, "hops": hops}):
+            shared.put("resolve", url, {"final_url": final, "hops": []})
+    out["hops"].extend(hops)
+    out["final_url"] = final
+    out["resolved_with"] = "http"
+    return out
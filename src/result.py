@@ -0,0 +1,180 @@
+"""
+精簡的 inspect 結果物件。
+
+inspect_url 回傳的巢狀 dict（data / basic / 基礎資訊 / meta）每筆約數 KB；
+大量保存於記憶體彙整時，InspectResult 以 __slots__ 與依類型固定欄位的 tuple 保存，
+需要時再以 to_dict() / to_json() 還原成原本的 schema。
+"""
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from .og import OG_FIELDS
+
+# _blank_basic 的欄位順序（to_dict 依此還原）
+BASIC_KEYS = (
+    "followers", "members", "likes", "shares", "page_followers",
+    "group_members", "owner_followers", "owner_url", "source_hint", "note",
+)
+
+# 各類型的（中文欄位, basic 欄位）；同時決定 InspectResult.values 的欄位與順序
+ZH_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "fb_page": (("粉絲專頁追蹤數", "followers"),),
+    "fb_post": (("貼文按讚數", "likes"), ("貼文分享數", "shares"), ("貼文所屬粉絲專頁追蹤數", "page_followers")),
+    "fb_group": (("社團成員數", "members"),),
+    "fb_group_post": (("貼文按讚數", "likes"), ("貼文分享數", "shares"), ("貼文所屬社團成員數", "group_members")),
+    "ig_profile": (("帳號追蹤數", "followers"),),
+    "ig_post": (("貼文按讚數", "likes"), ("貼文所屬帳號追蹤數", "owner_followers")),
+}
+
+TAG_TO_KIND = {
+    "fb_page": "page",
+    "fb_post": "post",
+    "fb_group": "group",
+    "ig_profile": "profile",
+    "ig_post": "post",
+}
+
+# inspect_url 每條回傳路徑（成功 / fetch_failed / 負面快取 / batch 的例外與 dead filter）都帶的 meta 欄位，
+# 依此順序；沒有值時為 None（was_rewritten / login_wall 為 False）。
+# negative_cache / dead_filter / memory_budget_mb / profile 只在適用時附加於後
+META_KEYS = (
+    "duration_ms", "fetched_with", "was_rewritten", "rewritten_url", "resolved_url", "final_permalink",
+    "stages_ms", "redirect_hops", "share_resolved_by", "hedge", "variants", "network_counters",
+    "owner_links", "fetch_ms", "login_wall", "dead_reason",
+)
+_META_DEFAULTS = {"was_rewritten": False, "login_wall": False}
+
+# 保留在 InspectResult 本身的 meta 欄位；其餘診斷只在 keep_meta=True 時保存
+_META_SLOTS = ("duration_ms", "fetched_with")
+
+
+def build_meta(**fields: Any) -> Dict[str, Any]:
+    """以 META_KEYS 建立 meta：未給的欄位補預設值，額外欄位（negative_cache 等）附加在後。"""
+    meta: Dict[str, Any] = dict.fromkeys(META_KEYS)
+    meta.update(_META_DEFAULTS)
+    meta.update(fields)
+    return meta
+_DATA_KEYS = set(OG_FIELDS) | {"basic", "基礎資訊", "kind"}
+
+
+def format_basic_zh(type_tag: str, basic: Dict[str, Any]) -> Dict[str, Any]:
+    """將 internal basic 欄位轉換為中文「基礎資訊」欄位，附加「數據來源」「備註」。"""
+    basic = basic or {}
+    zh: Dict[str, Any] = {label: basic.get(key) for label, key in ZH_FIELDS.get(type_tag, ())}
+    zh["數據來源"] = basic.get("source_hint")
+    zh["備註"] = basic.get("note")
+    return zh
+
+
+class InspectResult:
+    """
+    一筆 inspect 結果的精簡表示。
+    values：ZH_FIELDS[type] 對應的數值 tuple；basic_extra：其他 basic 欄位（BASIC_KEYS 中為 None 者省略，多半為 None）；
+    og：OG_FIELDS 的 tuple（全為 None 時為 None）；meta：完整診斷（keep_meta=False 時為 None）。
+    """
+
+    __slots__ = (
+        "url", "status", "type", "error", "values", "source_hint", "note",
+        "basic_extra", "og", "data_extra", "duration_ms", "fetched_with", "meta",
+    )
+
+    def __init__(self, url, status, type_tag, error=None, values=(), source_hint=None, note=None,
+                 basic_extra=None, og=None, data_extra=None, duration_ms=None, fetched_with=None, meta=None):
+        self.url = url
+        self.status = status
+        self.type = type_tag
+        self.error = error
+        self.values = values
+        self.source_hint = source_hint
+        self.note = note
+        self.basic_extra = basic_extra
+        self.og = og
+        self.data_extra = data_extra
+        self.duration_ms = duration_ms
+        self.fetched_with = fetched_with
+        self.meta = meta
+
+    @classmethod
+    def from_dict(cls, result: Dict[str, Any], url: Optional[str] = None, keep_meta: bool = True) -> "InspectResult":
+        type_tag = result.get("type")
+        meta = result.get("meta") or {}
+        data = result.get("data")
+        values: Tuple = ()
+        source_hint = note = basic_extra = og = data_extra = None
+        if data is not None:
+            basic = data.get("basic") or {}
+            if "source_hint" in basic:
+                fields = [key for _, key in ZH_FIELDS.get(type_tag, ())]
+                values = tuple(basic.get(k) for k in fields)
+                source_hint, note = basic.get("source_hint"), basic.get("note")
+                skip = set(fields) | {"source_hint", "note"}
+                # BASIC_KEYS 的 None 由 basic() 補回，可省略；其他欄位即使是 None 也保留，to_dict 才能原樣還原
+                basic_extra = {
+                    k: v for k, v in basic.items() if k not in skip and (v is not None or k not in BASIC_KEYS)
+                } or None
+            else:
+                # 非標準 basic（例如 {"error": ...}）原樣保存
+                values = None
+                basic_extra = dict(basic)
+            ogv = tuple(data.get(k) for k in OG_FIELDS)
+            og = ogv if any(v is not None for v in ogv) else None
+            data_extra = {k: v for k, v in data.items() if k not in _DATA_KEYS} or None
+        return cls(
+            url if url is not None else result.get("url"),
+            result.get("status"),
+            type_tag,
+            error=result.get("error"),
+            values=values,
+            source_hint=source_hint,
+            note=note,
+            basic_extra=basic_extra,
+            og=og,
+            data_extra=data_extra,
+            duration_ms=meta.get("duration_ms"),
+            fetched_with=meta.get("fetched_with"),
+            meta=dict(meta) if keep_meta else None,
+        )
+
+    def basic(self) -> Dict[str, Any]:
+        if self.values is None:
+            return dict(self.basic_extra or {})
+        out: Dict[str, Any] = dict.fromkeys(BASIC_KEYS)
+        for (_, key), v in zip(ZH_FIELDS.get(self.type, ()), self.values):
+            out[key] = v
+        out["source_hint"] = self.source_hint
+        out["note"] = self.note
+        if self.basic_extra:
+            out.update(self.basic_extra)
+        return out
+
+    def zh_basic(self) -> Dict[str, Any]:
+        return format_basic_zh(self.type, self.basic())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """還原成 inspect_url 的 dict schema。"""
+        if self.meta is not None:
+            meta = dict(self.meta)
+        else:
+            meta = build_meta(**{k: getattr(self, k) for k in _META_SLOTS})
+        out: Dict[str, Any] = {"status": self.status, "type": self.type, "data": None}
+        if self.url is not None:
+            out = {"url": self.url, **out}
+        if self.status == "ok" or self.values or self.basic_extra:
+            data: Dict[str, Any] = dict(zip(OG_FIELDS, self.og or (None,) * len(OG_FIELDS)))
+            data["basic"] = self.basic()
+            if self.data_extra:
+                data.update(self.data_extra)
+            zh = format_basic_zh(self.type, data["basic"])
+            data["基礎資訊"] = zh
+            data["kind"] = TAG_TO_KIND.get(self.type, "unknown")
+            out["data"] = data
+            out["基礎資訊"] = zh
+        out["meta"] = meta
+        out["error"] = self.error
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __repr__(self) -> str:
+        return f"InspectResult({self.type!r}, {self.status!r}, {self.url!r}, values={self.values!r})"
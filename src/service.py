@@ -0,0 +1,230 @@
+"""
+HTTP 服務模式（只用標準函式庫 http.server）：
+
+    python -m src.service --port 8080
+
+- GET /inspect?url=...          完整結果（JSON，與 inspect_url 回傳相同）
+- GET /inspect/stream?url=...   Server-Sent Events：primary → update* → final（見 progress.py）
+- GET /healthz
+- GET /metrics                  去重 flight 計數與 AIMD 各主機 limit / 調整紀錄（--adaptive 時）
+
+前端以 EventSource 訂閱 /inspect/stream 時，type 與貼文本身的讚數 / 分享數在第一次抓取 + 解析後
+即送達，owner 追蹤數、owner_url、final_permalink 等後續欄位再陸續補上。
+
+指向同一實體的請求（entity.py，例如 share 連結與帶 share_url 的社團 permalink）共用一次檢測：
+在途時後到的請求重播已送出的事件並等候其餘事件；完成後 FBIG_ENTITY_TTL_S（預設 60 秒）內直接沿用結果。
+
+--adaptive（FBIG_ADAPTIVE=1）時每個檢測先依主機排隊（adaptive.py）；FBIG_ADAPTIVE_QUEUE_TIMEOUT
+（預設 120 秒）內排不到回傳 503 error=throttled。
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .adaptive import AdaptiveLimiter, get_limiter
+from .entity import EntityIndex, alias_result
+from .inspect import inspect_url
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class Flight:
+    """一個實體的一次檢測：保存已送出的事件，任意數量的請求可從頭重播並等候後續事件。"""
+
+    def __init__(self, eid: str, url: str):
+        self.eid = eid
+        self.url = url
+        self.events: List[Dict[str, Any]] = []
+        self.finished_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            self.events.append(event)
+            if event["event"] == "final":
+                self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def follow(self, url: str) -> Iterator[Dict[str, Any]]:
+        """依序產出事件直到 final；url 不是實際檢測的網址時，final 結果改寫成 alias 結果。"""
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self.events):
+                    self._cond.wait()
+                event = self.events[i]
+            i += 1
+            if event["event"] == "final":
+                if url != self.url and event.get("result") is not None:
+                    event = dict(event, result=alias_result(event["result"], self.eid, self.url))
+                yield event
+                return
+            yield event
+
+
+class FlightTable:
+    """實體 ID → Flight；同一實體同時只有一個檢測在跑。"""
+
+    def __init__(
+        self,
+        ttl_s: float = 60.0,
+        budget_mb: Optional[int] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        queue_timeout: float = 120.0,
+    ):
+        self.ttl_s = ttl_s
+        self.budget_mb = budget_mb
+        self.limiter = limiter
+        self.queue_timeout = queue_timeout
+        self._index = EntityIndex()
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"inspections": 0, "shared": 0}
+
+    def join(self, url: str) -> Flight:
+        now = time.time()
+        with self._lock:
+            for eid in [e for e, f in self._flights.items() if f.finished_at and now - f.finished_at > self.ttl_s]:
+                del self._flights[eid]
+            eid, _ = self._index.assign(url)
+            flight = self._flights.get(eid)
+            if flight is not None:
+                self.stats["shared"] += 1
+                return flight
+            flight = self._flights[eid] = Flight(eid, url)
+            self.stats["inspections"] += 1
+        threading.Thread(target=self._run, args=(flight,), name="inspect-flight", daemon=True).start()
+        return flight
+
+    def _run(self, flight: Flight) -> None:
+        ticket = None
+        if self.limiter is not None:
+            ticket = self.limiter.acquire(flight.url, timeout=self.queue_timeout)
+            if ticket is None:
+                flight.push({"event": "final", "result": None, "error": "throttled"})
+                self._forget(flight)
+                return
+        result = None
+        try:
+            result = inspect_url(flight.url, budget_mb=self.budget_mb, on_update=flight.push)
+        except Exception as e:
+            flight.push({"event": "final", "result": None, "error": f"exception: {type(e).__name__}: {e}"})
+        finally:
+            if ticket is not None:
+                self.limiter.release(ticket, result)
+        if flight.finished_at is None:
+            flight.push({"event": "final", "result": None, "error": "no_result"})
+        if result is None:
+            self._forget(flight)
+
+    def _forget(self, flight: Flight) -> None:
+        """失敗的 flight 不在 TTL 內沿用：已在等候的請求照樣收到錯誤，之後的請求重新檢測。"""
+        with self._lock:
+            if self._flights.get(flight.eid) is flight:
+                del self._flights[flight.eid]
+
+
+class InspectHandler(BaseHTTPRequestHandler):
+    server_version = "fbig-inspect/1"
+    flights: FlightTable
+
+    def _send_json(self, status: int, obj: Any) -> None:
+        body = _dumps(obj)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _target_url(self, query: Dict[str, Any]) -> Optional[str]:
+        url = (query.get("url") or [""])[0].strip()
+        if not url:
+            self._send_json(400, {"error": "missing url parameter"})
+            return None
+        return url
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if parts.path == "/healthz":
+            self._send_json(200, {"status": "ok", "flights": self.flights.stats})
+        elif parts.path == "/metrics":
+            limiter = self.flights.limiter
+            self._send_json(200, {"flights": self.flights.stats, "adaptive": limiter.metrics() if limiter else None})
+        elif parts.path == "/inspect":
+            url = self._target_url(query)
+            if url:
+                final = list(self.flights.join(url).follow(url))[-1]
+                if final.get("result") is None:
+                    self._send_json(503 if final.get("error") == "throttled" else 500, {"error": final.get("error")})
+                else:
+                    self._send_json(200, final["result"])
+        elif parts.path == "/inspect/stream":
+            url = self._target_url(query)
+            if url:
+                self._stream(url)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _stream(self, url: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        try:
+            for event in self.flights.join(url).follow(url):
+                self.wfile.write(b"event: " + event["event"].encode("ascii") + b"\ndata: " + _dumps(event) + b"\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 用戶端已離開；檢測在背景跑完，其他等候同一實體的請求仍會收到結果
+            pass
+
+    def log_message(self, fmt: str, *args) -> None:
+        sys.stderr.write(f"[service] {self.address_string()} {fmt % args}\n")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8080, budget_mb: Optional[int] = None) -> ThreadingHTTPServer:
+    flights = FlightTable(
+        float(os.getenv("FBIG_ENTITY_TTL_S", "60")),
+        budget_mb,
+        limiter=get_limiter(),
+        queue_timeout=float(os.getenv("FBIG_ADAPTIVE_QUEUE_TIMEOUT", "120")),
+    )
+    handler = type("BoundInspectHandler", (InspectHandler,), {"flights": flights})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.service", description="inspect_url HTTP 服務（JSON + SSE）")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--budget-mb", type=int, default=None, help="每筆記憶體預算（預設 FBIG_MEMORY_BUDGET_MB）")
+    ap.add_argument("--adaptive", action="store_true", help="依主機自動調整同時檢測數（AIMD，見 adaptive.py）")
+    args = ap.parse_args(argv)
+    if args.adaptive:
+        os.environ["FBIG_ADAPTIVE"] = "1"
+
+    server = make_server(args.host, args.port, args.budget_mb)
+    print(f"[service] listening on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
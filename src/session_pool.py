@@ -0,0 +1,237 @@
+import glob
+import os
+import threading
+import time
+from typing import Optional, List, Dict, Any, Tuple
+
+from .fetcher import fetch_html, get_session, looks_like_login_wall
+
+
+class AccountSession:
+    """單一登入帳號（一個 storage_state 檔）的狀態與健康度。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.inflight = 0
+        self.next_allowed = 0.0
+        self.health = 1.0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+        self.requests = 0
+        self.login_walls = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.quarantined_until
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "inflight": self.inflight,
+            "health": round(self.health, 3),
+            "requests": self.requests,
+            "login_walls": self.login_walls,
+            "quarantined_for_s": max(0, int(self.quarantined_until - time.time())),
+        }
+
+
+class SessionPool:
+    """
+    多帳號 storage_state 池：
+      - 每個帳號的 cookies 只載入一次（fetcher.get_session），Playwright context 以 warm_context 重用；
+      - 分配策略 round_robin（輪流）或 least_load（進行中請求最少、健康度高者優先）；
+      - 每帳號最小請求間隔（rate limit），帳號越多整體吞吐越高；
+      - 遇到 login wall / checkpoint 自動隔離該帳號，連續被擋時隔離時間加倍（上限 max_quarantine_s）。
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        strategy: str = "round_robin",
+        min_interval: float = 2.0,
+        quarantine_s: float = 1800.0,
+        max_quarantine_s: float = 6 * 3600.0,
+    ):
+        self.accounts = [AccountSession(p) for p in paths]
+        self.strategy = strategy
+        self.min_interval = min_interval
+        self.quarantine_s = quarantine_s
+        self.max_quarantine_s = max_quarantine_s
+        self._rr = 0
+        self._lock = threading.Lock()
+
+    def _pick(self, now: float) -> Optional[AccountSession]:
+        healthy = [a for a in self.accounts if a.available(now)]
+        if not healthy:
+            return None
+        ready = [a for a in healthy if a.next_allowed <= now]
+        if not ready:
+            return min(healthy, key=lambda a: a.next_allowed)
+        if self.strategy == "least_load":
+            return min(ready, key=lambda a: (a.inflight, -a.health))
+        n = len(self.accounts)
+        for i in range(n):
+            a = self.accounts[(self._rr + i) % n]
+            if a in ready:
+                self._rr = (self._rr + i + 1) % n
+                return a
+        return ready[0]
+
+    def acquire(self, prefer: Optional[AccountSession] = None) -> Optional[AccountSession]:
+        """
+        取得一個帳號並預約其下一個請求時段；必要時在鎖外等待 rate limit。
+        所有帳號都被隔離時回傳 None（呼叫端退回匿名抓取）。
+        prefer：同一個請求的備援步驟（requests 失敗後改用瀏覽器）沿用剛才的帳號；
+        未被隔離時直接使用，不再等待 rate limit 也不預約新的時段。
+        """
+        with self._lock:
+            now = time.time()
+            if prefer is not None and prefer.available(now):
+                prefer.inflight += 1
+                prefer.requests += 1
+                return prefer
+            acct = self._pick(now)
+            if acct is None:
+                return None
+            start = max(now, acct.next_allowed)
+            acct.next_allowed = start + self.min_interval
+            acct.inflight += 1
+            acct.requests += 1
+            wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return acct
+
+    def release(self, acct: AccountSession, outcome: str) -> None:
+        """
+        回報結果：ok / error / login_wall（含 checkpoint）。
+        login_wall 立即隔離；ok / error 以 EWMA 更新健康度。
+        """
+        with self._lock:
+            acct.inflight = max(0, acct.inflight - 1)
+            if outcome == "login_wall":
+                acct.login_walls += 1
+                acct.strikes += 1
+                acct.health *= 0.5
+                backoff = min(self.max_quarantine_s, self.quarantine_s * (2 ** min(acct.strikes - 1, 32)))
+                acct.quarantined_until = time.time() + backoff
+                print(f"[pool] quarantine {acct.name} for {int(acct.quarantined_until - time.time())}s")
+            elif outcome == "ok":
+                acct.strikes = 0
+                acct.health = acct.health * 0.9 + 0.1
+            else:
+                acct.health = acct.health * 0.9
+
+    def _fetch_browser(self, acct: AccountSession, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """以帳號的 Playwright context 抓取，回傳 (html, final_url)。"""
+        from .browser_pool import get_browser_pool
+        bpool = get_browser_pool()
+        if bpool is not None:
+            return bpool.fetch(url, storage_state=acct.path)
+        from .play_fetcher import warm_context, fetch_in_context
+        return fetch_in_context(warm_context(acct.path), url)
+
+    def fetch(
+        self,
+        url: str,
+        http: bool = True,
+        browser: bool = True,
+        info: Optional[Dict[str, Any]] = None,
+        account: Optional[str] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        以池中帳號抓取：先帶 cookies 的 requests，再 warm Playwright context
+        （FBIG_BROWSER_POOL=1 時為共用瀏覽器池中該帳號的 context）。
+        回傳 (html, fetched_with)；皆失敗回傳 (None, None)。
+        info 若提供 dict，requests 步驟的診斷欄位（見 fetcher.fetch_html）與使用的帳號（account，
+        state 檔路徑）會寫入其中；瀏覽器步驟遇到登入牆時寫入 login_wall，成功時寫入 network_s（導航耗時）。
+        requests 失敗後的瀏覽器步驟沿用同一個帳號（見 acquire 的 prefer），不必再等一次 rate limit；
+        分開呼叫時以 account 傳入前一次 info["account"]。
+        """
+        held = next((a for a in self.accounts if a.path == account), None) if account else None
+        if http:
+            acct = self.acquire()
+            if acct is not None:
+                if info is None:
+                    info = {}
+                info["account"] = acct.path
+                html = fetch_html(url, storage_state=acct.path, info=info)
+                self.release(acct, "ok" if html else ("login_wall" if info.get("login_wall") else "error"))
+                if html:
+                    return html, "requests_login"
+                held = acct
+        if browser:
+            acct = self.acquire(prefer=held)
+            if acct is not None:
+                html, final_url = None, None
+                t0 = time.time()
+                try:
+                    html, final_url = self._fetch_browser(acct, url)
+                except Exception as e:
+                    print(f"[pool] playwright error ({acct.name}): {e}")
+                if html and looks_like_login_wall(final_url or "", html):
+                    self.release(acct, "login_wall")
+                    html = None
+                    if info is not None:
+                        info["login_wall"] = True
+                else:
+                    self.release(acct, "ok" if html else "error")
+                if html:
+                    if info is not None:
+                        info["network_s"] = time.time() - t0
+                    return html, "playwright_login"
+        return None, None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [a.snapshot() for a in self.accounts]
+
+
+def _expand_state_paths(spec: str) -> List[str]:
+    paths: List[str] = []
+    for part in spec.replace(",", os.pathsep).split(os.pathsep):
+        part = part.strip()
+        if not part:
+            continue
+        if os.path.isdir(part):
+            paths.extend(sorted(glob.glob(os.path.join(part, "*.json"))))
+        else:
+            paths.extend(sorted(glob.glob(part)) or [part])
+    return [p for p in paths if os.path.exists(p)]
+
+
+_POOL: Optional[SessionPool] = None
+_POOL_SPEC: Optional[str] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> Optional[SessionPool]:
+    """
+    依環境變數建立（並快取）全域帳號池；未設定 FBIG_STORAGE_STATES 時回傳 None。
+      FBIG_STORAGE_STATES        state 檔路徑，逗號 / os.pathsep 分隔，可為資料夾或 glob
+      FBIG_SESSION_STRATEGY      round_robin（預設）| least_load
+      FBIG_ACCOUNT_MIN_INTERVAL  每帳號兩次請求的最小間隔秒數（預設 2）
+      FBIG_QUARANTINE_SECONDS    被擋後的隔離秒數（預設 1800，連續被擋加倍）
+      FBIG_POOL_MAX_QUARANTINE   隔離秒數上限（預設 21600）
+    """
+    global _POOL, _POOL_SPEC
+    spec = os.getenv("FBIG_STORAGE_STATES") or ""
+    if not spec:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_SPEC != spec:
+            paths = _expand_state_paths(spec)
+            if not paths:
+                return None
+            for p in paths:
+                get_session(p)
+            _POOL = SessionPool(
+                paths,
+                strategy=os.getenv("FBIG_SESSION_STRATEGY", "round_robin"),
+                min_interval=float(os.getenv("FBIG_ACCOUNT_MIN_INTERVAL", "2")),
+                quarantine_s=float(os.getenv("FBIG_QUARANTINE_SECONDS", "1800")),
+                max_quarantine_s=float(os.getenv("FBIG_POOL_MAX_QUARANTINE", str(6 * 3600))),
+            )
+            _POOL_SPEC = spec
+        return _POOL
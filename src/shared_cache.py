@@ -0,0 +1,176 @@
+"""
+同一台主機上所有 worker 程序共用的快取（memory-mapped 檔案，例如 /dev/shm 底下）。
+
+只存擷取後的欄位與解析後的網址（小型 JSON），不存 HTML：
+- owner：owner 頁網址 → {"followers", "name"}
+- share：share 連結 → {"final_url", "by"}
+- resolve：第三方短網址 → {"final_url", "hops"}
+
+結構：header 之後是 nsets 個 set，每個 set 有 WAYS 個固定大小的 slot（set-associative）。
+key 以 64-bit blake2b 雜湊決定 set；讀取對該 set 取 fcntl 共享鎖、寫入取排他鎖，
+不同 set 互不阻擋。寫入時同 key 原地覆寫；否則用空的或已過期的 slot，set 滿時淘汰最接近過期的 slot
+（同 namespace TTL 相同，即最早寫入者）。檔案大小固定，不會無限成長。
+
+    FBIG_SHARED_CACHE=/dev/shm/fbig-cache   啟用（未設定或平台沒有 fcntl 時不使用）
+    FBIG_SHARED_CACHE_MB=32                 新建檔案的大小
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MAGIC = b"FBIGSC01"
+HEADER = struct.Struct("<8sIII")  # magic, nsets, ways, slot_size
+HEADER_SIZE = 4096
+# slot：key 雜湊（0 = 空）、到期時間、payload 長度，之後是 JSON payload
+SLOT_HEAD = struct.Struct("<QdH")
+WAYS = 8
+SLOT_SIZE = 512
+THREAD_STRIPES = 64
+
+# 各 namespace 的預設 TTL（秒）
+DEFAULT_TTL = {
+    "owner": 6 * 3600,
+    "share": 7 * 86400,
+    "resolve": 7 * 86400,
+}
+
+
+class SharedCache:
+    def __init__(self, path: str, size_mb: int = 32):
+        self.path = path
+        self._pid = os.getpid()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._init_file(size_mb * 1024 * 1024)
+        self._mm = mmap.mmap(self._fd, self._size)
+        # fcntl 鎖以程序為單位，同一程序內的執行緒另以分段 Lock 互斥
+        self._tlocks = [threading.Lock() for _ in range(THREAD_STRIPES)]
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "puts": 0, "evictions": 0, "too_large": 0}
+
+    def _init_file(self, size: int) -> None:
+        """第一個開啟的程序寫入 header；之後的程序沿用檔案內的幾何設定。"""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            head = os.pread(self._fd, HEADER.size, 0)
+            if len(head) == HEADER.size and head[:8] == MAGIC:
+                _, self.nsets, self.ways, self.slot_size = HEADER.unpack(head)
+            else:
+                self.ways, self.slot_size = WAYS, SLOT_SIZE
+                self.nsets = max(1, (size - HEADER_SIZE) // (WAYS * SLOT_SIZE))
+                os.ftruncate(self._fd, HEADER_SIZE + self.nsets * WAYS * SLOT_SIZE)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, self.nsets, self.ways, self.slot_size), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+        self._set_bytes = self.ways * self.slot_size
+        self._size = HEADER_SIZE + self.nsets * self._set_bytes
+
+    @staticmethod
+    def _hash(namespace: str, key: str) -> int:
+        h = int.from_bytes(hashlib.blake2b(f"{namespace}\0{key}".encode("utf-8"), digest_size=8).digest(), "little")
+        return h or 1
+
+    @contextmanager
+    def _locked(self, set_idx: int, exclusive: bool) -> Iterator[int]:
+        base = HEADER_SIZE + set_idx * self._set_bytes
+        with self._tlocks[set_idx % THREAD_STRIPES]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, self._set_bytes, base)
+            try:
+                yield base
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._set_bytes, base)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        h = self._hash(namespace, key)
+        now = time.time()
+        with self._locked(h % self.nsets, exclusive=False) as base:
+            for w in range(self.ways):
+                off = base + w * self.slot_size
+                kh, expires, length = SLOT_HEAD.unpack_from(self._mm, off)
+                if kh != h or not length:
+                    continue
+                if expires < now:
+                    # 舊版檔案可能留有同 key 的過期副本，繼續找其他 way
+                    self._stats["expired"] += 1
+                    continue
+                payload = self._mm[off + SLOT_HEAD.size: off + SLOT_HEAD.size + length]
+                self._stats["hits"] += 1
+                try:
+                    return json.loads(payload)
+                except ValueError:
+                    return None
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """寫入；payload 超過 slot 大小時不存並回傳 False。"""
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.slot_size - SLOT_HEAD.size:
+            self._stats["too_large"] += 1
+            return False
+        if ttl is None:
+            ttl = DEFAULT_TTL.get(namespace, 3600)
+        h = self._hash(namespace, key)
+        now = time.time()
+        with self._locked(h % self.nsets, exclusive=True) as base:
+            # 先找同 key 的 slot 原地覆寫（避免同一 key 在 set 內留下兩份）；
+            # 沒有時依序用空的、已過期的、最接近過期的 slot
+            same, free, stale, oldest, oldest_exp = None, None, None, None, None
+            for w in range(self.ways):
+                off = base + w * self.slot_size
+                kh, expires, length = SLOT_HEAD.unpack_from(self._mm, off)
+                if kh == h:
+                    same = off
+                    break
+                if not kh:
+                    if free is None:
+                        free = off
+                elif expires < now:
+                    if stale is None:
+                        stale = off
+                elif oldest_exp is None or expires < oldest_exp:
+                    oldest, oldest_exp = off, expires
+            victim = same or free or stale
+            if victim is None:
+                victim = oldest
+                self._stats["evictions"] += 1
+            self._mm[victim + SLOT_HEAD.size: victim + SLOT_HEAD.size + len(payload)] = payload
+            SLOT_HEAD.pack_into(self._mm, victim, h, now + ttl, len(payload))
+        self._stats["puts"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """本程序的命中統計與檔案幾何（各程序各自計數）。"""
+        return dict(self._stats, path=self.path, nsets=self.nsets, ways=self.ways, slot_size=self.slot_size)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """依 FBIG_SHARED_CACHE 取得本程序的 SharedCache；fork 後的子程序會重新開啟。"""
+    global _cache
+    path = os.getenv("FBIG_SHARED_CACHE")
+    if not path or fcntl is None:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache._pid != os.getpid() or _cache.path != path:
+            try:
+                _cache = SharedCache(path, int(os.getenv("FBIG_SHARED_CACHE_MB", "32")))
+            except (OSError, ValueError):
+                _cache = None
+        return _cache
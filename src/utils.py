@@ -23,4 +23,39 @@ def normalize_number(text: str):
     elif unit == "億":
         num *= 100_000_000
 
-    return int(num)
\ No newline at end of file
+    return int(num)
+
+# 不影響頁面內容的追蹤 / 來源參數（canonical_url 會移除）
+_TRACKING_PARAMS = {
+    "fbclid", "mibextid", "rdid", "refsrc", "ref", "_rdr", "_rdc", "sfnsn", "igshid", "igsh",
+    "__cft__", "__tn__", "paipv", "eav", "notif_id", "notif_t", "extid", "hc_ref", "fref", "locale",
+}
+_HOST_ALIASES = {
+    "www.facebook.com": "facebook.com", "m.facebook.com": "facebook.com",
+    "mbasic.facebook.com": "facebook.com", "web.facebook.com": "facebook.com",
+    "touch.facebook.com": "facebook.com", "fb.com": "facebook.com", "www.fb.com": "facebook.com",
+    "www.instagram.com": "instagram.com", "m.instagram.com": "instagram.com",
+}
+
+
+def canonical_url(url: str) -> str:
+    """
+    同一頁面的不同寫法化為同一字串（快取 key 用）：
+    FB / IG 子網域（www / m / mbasic …）合併、移除追蹤參數與 fragment、其餘參數排序、去掉結尾斜線。
+    """
+    from urllib.parse import parse_qsl, urlencode, urlsplit
+
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    host = _HOST_ALIASES.get(host, host)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    out = f"https://{host}{path}"
+    if query:
+        out += "?" + urlencode(query)
+    return out
@@ -0,0 +1,246 @@
+"""
+輕量頁面變體層：同一個目標可由多個較輕的網址取得（m / mbasic / www、IG embed、
+owner 的 /about 與 ?v=followers）。依記錄到的成功率與平均位元組排序，
+先試「每次成功的預期下載量」最小的變體，拿到所需欄位就停止。
+
+統計存於 FBIG_VARIANT_STATS 指定的 JSON 檔（未設定時只在程序內累積）。
+"""
+import atexit
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .counters import NEEDED_FIELDS
+
+# 沒有統計時的先驗平均大小（bytes），讓新變體也有合理的初始排序
+PRIOR_BYTES = 300 * 1024
+# 試過這麼多次仍從未成功的變體不再嘗試
+PRUNE_AFTER = 20
+
+_FB_HOST = re.compile(r"^(?:www\.|m\.|mbasic\.|web\.)?facebook\.com$", re.I)
+
+
+def _with_host(url: str, host: str) -> str:
+    parts = urlsplit(url)
+    if not _FB_HOST.match(parts.hostname or ""):
+        return url
+    return urlunsplit(("https", host, parts.path, parts.query, ""))
+
+
+def _add_query(url: str, q: str) -> str:
+    return f"{url}{'&' if '?' in url else '?'}{q}"
+
+
+def _ig_embed(url: str, suffix: str) -> Optional[str]:
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    if not path or "/embed" in path:
+        return None
+    return urlunsplit(("https", "www.instagram.com", f"{path}/{suffix}", "", ""))
+
+
+def _owner_about(url: str) -> Optional[str]:
+    if "profile.php" in url:
+        return _add_query(url, "sk=followers")
+    return url.split("?")[0].rstrip("/") + "/about"
+
+
+def _owner_followers(url: str) -> Optional[str]:
+    if "profile.php" in url:
+        return _add_query(url, "v=followers")
+    return url.split("?")[0].rstrip("/") + "?v=followers"
+
+
+# 各類型的變體（宣告順序即沒有統計時的預設順序：目前已知最輕且可用的在前）
+VARIANTS: Dict[str, List[Tuple[str, Callable[[str], Optional[str]]]]] = {
+    "fb_page": [
+        ("m", lambda u: _with_host(u, "m.facebook.com")),
+        ("mbasic", lambda u: _with_host(u, "mbasic.facebook.com")),
+        ("m_about", lambda u: _owner_about(_with_host(u, "m.facebook.com"))),
+        ("m_followers", lambda u: _owner_followers(_with_host(u, "m.facebook.com"))),
+        ("www", lambda u: _with_host(u, "www.facebook.com")),
+    ],
+    "fb_post": [
+        ("m", lambda u: _with_host(u, "m.facebook.com")),
+        ("mbasic", lambda u: _with_host(u, "mbasic.facebook.com")),
+        ("www", lambda u: _with_host(u, "www.facebook.com")),
+    ],
+    "fb_group": [
+        ("m", lambda u: _with_host(u, "m.facebook.com")),
+        ("mbasic", lambda u: _with_host(u, "mbasic.facebook.com")),
+        ("www", lambda u: _with_host(u, "www.facebook.com")),
+    ],
+    "fb_group_post": [
+        ("m", lambda u: _with_host(u, "m.facebook.com")),
+        ("mbasic", lambda u: _with_host(u, "mbasic.facebook.com")),
+        ("www", lambda u: _with_host(u, "www.facebook.com")),
+    ],
+    "ig_profile": [
+        ("www", lambda u: u),
+        ("embed", lambda u: _ig_embed(u, "embed/")),
+    ],
+    "ig_post": [
+        ("www", lambda u: u),
+        ("embed_captioned", lambda u: _ig_embed(u, "embed/captioned/")),
+    ],
+    # owner 頁追蹤數的二段變體（inspect.py 在 owner 頁本身找不到追蹤數時使用）
+    "fb_owner": [
+        ("about", _owner_about),
+        ("followers", _owner_followers),
+    ],
+}
+
+# 變體命中所需的欄位：貼文的分享數常常不顯示（沒人分享或被隱藏），
+# 若與網路擷取一樣要求 likes + shares，多數貼文都會多抓一個變體；拿到讚數即停止，分享數缺少時維持 None
+NEEDED = dict(NEEDED_FIELDS, fb_post=("likes",), fb_group_post=("likes",), fb_owner=("followers",))
+
+
+class VariantStats:
+    """每個 (type, variant) 的 tries / hits / bytes 累計；save() 以原子替換寫回 JSON。"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._dirty = 0
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    def record(self, type_tag: str, name: str, hit: bool, nbytes: Optional[int]) -> None:
+        with self._lock:
+            st = self._data.setdefault(type_tag, {}).setdefault(name, {"tries": 0, "hits": 0, "bytes": 0, "measured": 0})
+            st["tries"] += 1
+            st["hits"] += int(hit)
+            if nbytes is not None:
+                st["bytes"] += nbytes
+                st["measured"] += 1
+            self._dirty += 1
+            flush = self._dirty >= 20
+        if flush:
+            self.save()
+
+    def expected_cost(self, type_tag: str, name: str) -> float:
+        """每次成功的預期下載量：平均 bytes / 成功率（Laplace 平滑）。"""
+        with self._lock:
+            st = (self._data.get(type_tag) or {}).get(name)
+        if not st:
+            return float(PRIOR_BYTES)
+        avg = st["bytes"] / st["measured"] if st.get("measured") else PRIOR_BYTES
+        rate = (st["hits"] + 1) / (st["tries"] + 2)
+        return avg / rate
+
+    def hits(self, type_tag: str, name: str) -> int:
+        with self._lock:
+            st = (self._data.get(type_tag) or {}).get(name)
+        return st["hits"] if st else 0
+
+    def pruned(self, type_tag: str, name: str) -> bool:
+        with self._lock:
+            st = (self._data.get(type_tag) or {}).get(name)
+        return bool(st) and st["tries"] >= PRUNE_AFTER and st["hits"] == 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            self._dirty = 0
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_stats_lock = threading.Lock()
+_stats: Optional[VariantStats] = None
+
+
+def get_stats() -> VariantStats:
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = VariantStats(os.getenv("FBIG_VARIANT_STATS"))
+            atexit.register(_stats.save)
+        return _stats
+
+
+def variants_enabled() -> bool:
+    return os.getenv("FBIG_VARIANTS", "1") != "0"
+
+
+def ranked_variants(type_tag: str, url: str) -> List[Tuple[str, str]]:
+    """回傳依預期成本排序的 [(variant 名稱, 網址)]；相同網址只留一個，已判定無效的變體略過。"""
+    stats = get_stats()
+    out: List[Tuple[str, str]] = []
+    seen = set()
+    decl = VARIANTS.get(type_tag) or []
+    for name, make in decl:
+        v = make(url)
+        if not v or v in seen or stats.pruned(type_tag, name):
+            continue
+        seen.add(v)
+        out.append((name, v))
+    order = {name: i for i, (name, _) in enumerate(decl)}
+    out.sort(key=lambda nv: (stats.expected_cost(type_tag, nv[0]), order[nv[0]]))
+    return out
+
+
+def has_needed(type_tag: str, basic: Optional[dict]) -> bool:
+    needed = NEEDED.get(type_tag, ())
+    return bool(basic) and all(basic.get(f) is not None for f in needed)
+
+
+def fetch_variants(
+    url: str,
+    type_tag: str,
+    max_tries: Optional[int] = None,
+    infos: Optional[List[Dict[str, Any]]] = None,
+    on_head: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Tuple[Optional[str], Optional[dict], Optional[str], List[dict]]:
+    """
+    依排序逐一以 requests 抓取變體，解析出所需欄位即停止（最多 FBIG_VARIANT_MAX_TRIES 個，預設 2）。
+    每次抓取都帶隨機間隔，因此第一個之後的變體只有統計上確實命中過才追加嘗試；
+    從未命中的變體靠排序輪替（第一名一直失敗時預期成本上升、被換下）取得樣本，不在同一筆檢測裡多抓。
+    回傳 (html, basic, 使用的網址, 逐變體報告 [{"variant", "url", "bytes", "network_ms", "hit"}])；
+    都沒有命中時回傳第一個抓得到的變體（仍可供 owner 探索等後續步驟使用）。
+    infos 若提供 list，依報告順序附加每個變體的 fetch_html 診斷 dict（login_wall / head_meta / final_url 等）；
+    on_head 原樣交給 fetch_html。
+    """
+    from .fetcher import fetch_html
+    from .parse_pool import parse_basic
+
+    if max_tries is None:
+        max_tries = int(os.getenv("FBIG_VARIANT_MAX_TRIES", "2"))
+    stats = get_stats()
+    report: List[dict] = []
+    fallback: Tuple[Optional[str], Optional[dict], Optional[str]] = (None, None, None)
+    for i, (name, v) in enumerate(ranked_variants(type_tag, url)[:max(1, max_tries)]):
+        if i and not stats.hits(type_tag, name):
+            continue
+        info: Dict[str, Any] = {}
+        if infos is not None:
+            infos.append(info)
+        html = fetch_html(v, info=info, on_head=on_head)
+        basic = parse_basic(type_tag, html) if html else None
+        hit = has_needed(type_tag, basic)
+        stats.record(type_tag, name, hit, info.get("bytes"))
+        network_ms = int(info["network_s"] * 1000) if info.get("network_s") is not None else None
+        report.append({"variant": name, "url": v, "bytes": info.get("bytes"), "network_ms": network_ms, "hit": hit})
+        if hit:
+            return html, basic, v, report
+        if html and fallback[0] is None:
+            fallback = (html, basic, v)
+    return fallback[0], fallback[1], fallback[2], report
@@ -0,0 +1,56 @@
+from src.adaptive import AdaptiveLimiter, outcome_of
+
+URL = "https://www.facebook.com/somepage/posts/1"
+
+
+def _ok(path, fetch_ms, **meta):
+    return {"status": "ok", "error": None, "meta": dict(fetched_with=path, fetch_ms=fetch_ms, **meta)}
+
+
+def test_latency_baseline_is_per_fetch_path():
+    limiter = AdaptiveLimiter(initial=2)
+    for _ in range(5):
+        assert limiter.release(limiter.acquire(URL), _ok("requests", 100)) == "ok"
+    # 瀏覽器路徑本來就慢，不應以 requests 的基準判定為 slow
+    assert limiter.release(limiter.acquire(URL), _ok("playwright", 3000)) == "ok"
+    assert limiter.release(limiter.acquire(URL), _ok("requests", 900)) == "slow"
+    latency = limiter.metrics()["hosts"]["facebook.com"]["latency"]
+    assert set(latency) == {"requests", "playwright"}
+
+
+def test_login_wall_from_meta_backs_off():
+    assert outcome_of(_ok("playwright", 10, login_wall=True), 1, 30) == "login_wall"
+    assert outcome_of({"status": "error", "error": "fetch_failed", "meta": {"login_wall": True}}, 1, 30) == "login_wall"
+    limiter = AdaptiveLimiter(initial=4)
+    limiter.release(limiter.acquire(URL), _ok("requests", 10, login_wall=True))
+    assert limiter.metrics()["hosts"]["facebook.com"]["limit"] == 2
+
+
+def test_variant_login_wall_reaches_meta(monkeypatch):
+    from src import fetcher, variants
+    from src import inspect as inspect_mod
+    from src import negative_cache
+
+    monkeypatch.setenv("FBIG_DISABLE_PLAYWRIGHT", "1")
+    monkeypatch.delenv("FBIG_VARIANTS", raising=False)
+    monkeypatch.delenv("FBIG_STORAGE_STATE", raising=False)
+    monkeypatch.delenv("FBIG_STORAGE_STATES", raising=False)
+    monkeypatch.setattr(variants, "_stats", variants.VariantStats())
+    monkeypatch.setattr(negative_cache, "_neg", negative_cache.NegativeCache())
+    monkeypatch.setattr(inspect_mod, "_fetch_follow_up", lambda *a, **kw: None)
+
+    def fake_fetch(url, info=None, on_head=None, **kw):
+        info.update(network_s=0.2, head_meta=dict.fromkeys(inspect_mod.OG_FIELDS, None))
+        info["head_meta"]["og:title"] = url
+        if url.startswith("https://m."):
+            info["login_wall"] = True
+            return "<html><body>log in</body></html>"
+        return "<html><body>12 likes</body></html>"
+
+    monkeypatch.setattr(fetcher, "fetch_html", fake_fetch)
+    result = inspect_mod.inspect_url(URL)
+    [used] = result["meta"]["variants"]
+    assert not used["hit"] and result["meta"]["login_wall"] is True
+    assert result["meta"]["fetch_ms"] == 200
+    # og 取自採用的變體的串流 head
+    assert result["data"]["og:title"] == used["url"]
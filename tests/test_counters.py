@@ -0,0 +1,48 @@
+from src.counters import entity_ids, target_ids, walk_target_counters
+
+
+def test_entity_ids_from_urls():
+    assert entity_ids("https://www.facebook.com/NASA/") == {"nasa"}
+    assert entity_ids("https://www.facebook.com/profile.php?id=1234") == {"1234"}
+    assert entity_ids("https://www.facebook.com/groups/5678/") == {"5678"}
+    assert entity_ids("https://www.facebook.com/people/Some-Name/100099/") == {"100099"}
+    assert entity_ids("https://www.instagram.com/nasa/") == {"nasa"}
+    assert entity_ids("https://www.facebook.com/share/abc/") == set()
+
+
+def test_page_ignores_suggested_page_counters():
+    # 推薦粉專的 follower_count 出現在目標粉專之前
+    payload = {"data": {
+        "suggestions": [{"id": "999", "username": "other", "follower_count": 5}],
+        "page": {"id": "111", "url": "https://www.facebook.com/nasa",
+                 "related": [{"username": "x", "follower_count": 7}],
+                 "follower_count": 100},
+    }}
+    found = {}
+    walk_target_counters(payload, found, entity_ids("https://www.facebook.com/nasa"), entity=True)
+    assert found == {"followers": 100}
+
+
+def test_profile_without_matching_node_takes_nothing():
+    payload = {"data": {"user": {"username": "someone_else", "edge_followed_by": {"count": 9}}}}
+    found = {}
+    walk_target_counters(payload, found, entity_ids("https://www.instagram.com/nasa/"), entity=True)
+    assert found == {}
+
+
+def test_profile_matches_username_case_insensitively():
+    payload = {"data": {"user": {"username": "NASA", "follower_count": 42}}}
+    found = {}
+    walk_target_counters(payload, found, entity_ids("https://www.instagram.com/nasa/"), entity=True)
+    assert found == {"followers": 42}
+
+
+def test_post_scoping_still_uses_post_id():
+    targets = target_ids("https://www.facebook.com/nasa/posts/12345")
+    payload = {"data": {"feed": [
+        {"post_id": "777", "reaction_count": {"count": 1}},
+        {"post_id": "12345", "reaction_count": {"count": 50}},
+    ]}}
+    found = {}
+    walk_target_counters(payload, found, targets)
+    assert found.get("likes") == 50
@@ -0,0 +1,59 @@
+import io
+import json
+import threading
+
+from src import batch
+from src.entity import EntityIndex, entity_keys
+
+SHARE = "https://www.facebook.com/share/p/17cWYoTQPo/"
+PERMALINK = (
+    "https://www.facebook.com/groups/1704458599779581/permalink/5307390156153056/"
+    "?share_url=https%3A%2F%2Fwww.facebook.com%2Fshare%2Fp%2F17cWYoTQPo%2F"
+)
+
+
+def test_share_and_permalink_pair_share_a_key():
+    assert entity_keys(SHARE) == ["fb:share:17cWYoTQPo"]
+    keys = entity_keys(PERMALINK)
+    assert keys[0] == "fb:post:5307390156153056"
+    assert "fb:share:17cWYoTQPo" in keys
+    # 社團貼文不產生社團 key，避免同社團的不同貼文被合併
+    assert not any(k.startswith("fb:group:") for k in keys)
+
+
+def test_pfbid_story_and_permalink_merge():
+    story = entity_keys("https://m.facebook.com/story.php?story_fbid=pfbid0y&id=8")
+    perma = entity_keys("https://www.facebook.com/permalink.php?story_fbid=pfbid0y&id=8")
+    assert story == perma == ["fb:story:8:pfbid0y"]
+    assert entity_keys("https://www.facebook.com/permalink.php?story_fbid=pfbid0y&id=9") != story
+
+
+def test_numeric_story_fbid_matches_posts_path():
+    assert "fb:post:123" in entity_keys("https://www.facebook.com/story.php?story_fbid=123&id=8")
+    assert "fb:post:123" in entity_keys("https://www.facebook.com/8/posts/123/")
+
+
+def test_entity_index_assigns_aliases_to_first_entity():
+    index = EntityIndex()
+    eid, new = index.assign(SHARE)
+    assert new
+    assert index.assign(PERMALINK) == (eid, False)
+    assert index.assign("https://www.facebook.com/groups/1/permalink/2/")[1] is True
+
+
+def test_batch_writes_repeated_waiting_alias_once(monkeypatch):
+    release = threading.Event()
+
+    def fake_inspect(url, budget_mb=None):
+        release.wait(5)
+        return {"status": "ok", "type": "fb_post", "data": {}, "meta": {"duration_ms": 1}, "error": None}
+
+    monkeypatch.setattr(batch, "inspect_url", fake_inspect)
+    urls = [SHARE, PERMALINK, PERMALINK, PERMALINK]
+    threading.Timer(0.2, release.set).start()
+    out, checkpoint = io.StringIO(), io.StringIO()
+    stats = batch.run_batch(iter(urls), out, checkpoint, set(), concurrency=2)
+
+    written = [json.loads(line)["url"] for line in out.getvalue().splitlines()]
+    assert written == [SHARE, PERMALINK]
+    assert stats["deduped"] == 1 and stats["skipped"] == 2
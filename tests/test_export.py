@@ -0,0 +1,59 @@
+import csv
+import json
+import os
+
+from src.export import ZH_COLUMNS, export, zh_row
+from src.result import InspectResult, ZH_FIELDS, format_basic_zh
+
+ROOT_CSV = os.path.join(os.path.dirname(__file__), "..", "experiments", "results", "basic_metrics_zh.csv")
+
+
+def _result(type_tag, values, duration_ms=10):
+    basic = {key: v for (_, key), v in zip(ZH_FIELDS[type_tag], values)}
+    basic.update(source_hint="text", note=None)
+    zh = format_basic_zh(type_tag, basic)
+    return {
+        "status": "ok", "type": type_tag, "data": {"basic": basic, "基礎資訊": zh},
+        "基礎資訊": zh, "meta": {"duration_ms": duration_ms}, "error": None,
+    }
+
+
+def test_columns_match_reference_csv():
+    with open(ROOT_CSV, encoding="utf-8-sig", newline="") as f:
+        assert tuple(next(csv.reader(f))) == ZH_COLUMNS
+    # 每個類型的中文欄位都有對應的欄
+    assert {label for fields in ZH_FIELDS.values() for label, _ in fields} <= set(ZH_COLUMNS)
+
+
+def test_row_places_values_in_column_order():
+    url = "https://www.facebook.com/x/posts/1"
+    row = zh_row(url, _result("fb_post", (12, 3, 3400), duration_ms=77))
+    assert dict(zip(ZH_COLUMNS, row)) == {
+        **dict.fromkeys(ZH_COLUMNS),
+        "網址": url, "類型": "fb_post", "耗時(ms)": 77,
+        "貼文按讚數": 12, "貼文分享數": 3, "貼文所屬粉絲專頁追蹤數": 3400, "數據來源": "text",
+    }
+    # dict 與 InspectResult 產生同一列
+    assert zh_row(url, InspectResult.from_dict(_result("fb_post", (12, 3, 3400), 77))) == row
+
+
+def test_failed_result_puts_error_in_note():
+    row = zh_row("u", {"status": "error", "type": "fb_page", "data": None, "meta": {}, "error": "fetch_failed"})
+    assert row[ZH_COLUMNS.index("備註")] == "fetch_failed"
+
+
+def test_csv_and_jsonl_keep_column_order(tmp_path):
+    rows = [("https://facebook.com/g", _result("fb_group", (5000,))), ("https://instagram.com/p/X", _result("ig_post", (7, 900)))]
+    csv_path, jsonl_path = tmp_path / "out.csv", tmp_path / "out.jsonl"
+    assert export(iter(rows), str(csv_path)) == 2
+    assert export(iter(rows), str(jsonl_path)) == 2
+
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        table = list(csv.reader(f))
+    assert tuple(table[0]) == ZH_COLUMNS
+    assert table[1][ZH_COLUMNS.index("社團成員數")] == "5000"
+    assert table[2][ZH_COLUMNS.index("貼文所屬帳號追蹤數")] == "900"
+
+    records = [json.loads(line) for line in jsonl_path.read_text(encoding="utf-8").splitlines()]
+    assert [tuple(r) for r in records] == [ZH_COLUMNS, ZH_COLUMNS]
+    assert records[1]["貼文按讚數"] == 7
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from src import hedge
+from src.hedge import HedgeBudget, LatencyTracker, hedged_fetch
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(hedge, "_tracker", LatencyTracker(min_samples=3))
+    monkeypatch.setattr(hedge, "_budget", HedgeBudget(ratio=0.1, burst=1))
+    monkeypatch.setenv("FBIG_HEDGE_DEFAULT_MS", "50")
+    monkeypatch.delenv("FBIG_HEDGE_PERCENTILE", raising=False)
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=5)
+    for s in (1, 2, 3, 4):
+        tracker.record(s)
+    assert tracker.percentile(0.9) is None
+    for s in range(5, 11):
+        tracker.record(s)
+    assert tracker.percentile(0.9) == 9
+    assert tracker.percentile(0.0) == 1 and tracker.percentile(1.0) == 10
+
+
+def test_percentile_uses_recent_window():
+    tracker = LatencyTracker(window=3, min_samples=1)
+    for s in (100, 1, 2, 3):
+        tracker.record(s)
+    assert tracker.percentile(1.0) == 3
+
+
+def test_budget_refills_at_ratio():
+    budget = HedgeBudget(ratio=0.1, burst=2)
+    assert budget.try_spend() and budget.try_spend() and not budget.try_spend()
+    for _ in range(10):
+        budget.on_request()
+    assert budget.try_spend() and not budget.try_spend()
+    for _ in range(100):
+        budget.on_request()
+    # 上限為 burst
+    assert budget.try_spend() and budget.try_spend() and not budget.try_spend()
+
+
+def test_hedge_delay_falls_back_to_default_then_percentile():
+    assert hedge.hedge_delay() == pytest.approx(0.05)
+    for s in (0.1, 0.2, 0.3):
+        hedge._tracker.record(s)
+    assert hedge.hedge_delay() == pytest.approx(0.3)
+
+
+def _primary(html, delay=0.0):
+    def run(info):
+        time.sleep(delay)
+        info["network_s"] = delay
+        return html
+    return run
+
+
+def test_fast_primary_does_not_hedge():
+    backup_calls = []
+    html, winner, info, extra = hedged_fetch(_primary("<p>"), lambda cancel: backup_calls.append(1))
+    assert (html, winner, info["hedged"], extra) == ("<p>", "primary", False, None)
+    assert backup_calls == []
+
+
+def test_slow_primary_loses_to_backup_and_backup_wins_counters():
+    html, winner, info, extra = hedged_fetch(_primary("<slow>", 0.5), lambda cancel: ("<fast>", {"likes": 1}))
+    assert (html, winner, info["hedged"], extra) == ("<fast>", "backup", True, {"likes": 1})
+
+
+def test_backup_is_cancelled_when_primary_wins():
+    cancelled = threading.Event()
+
+    def backup(cancel):
+        cancel.wait(2)
+        if cancel.is_set():
+            cancelled.set()
+        return None, None
+
+    html, winner, info, _ = hedged_fetch(_primary("<p>", 0.15), backup)
+    assert (html, winner, info["hedged"]) == ("<p>", "primary", True)
+    assert cancelled.wait(1)
+
+
+def test_budget_denied_waits_for_primary():
+    hedge._budget.try_spend()  # 用掉唯一的 token
+    backup_calls = []
+    html, winner, info, _ = hedged_fetch(_primary("<p>", 0.15), lambda cancel: backup_calls.append(1))
+    assert (html, winner, info.get("budget_denied")) == ("<p>", "primary", True)
+    assert backup_calls == []
@@ -0,0 +1,168 @@
+import pytest
+
+from src import negative_cache
+from src.negative_cache import BloomFilter, NegativeCache, dead_reason
+from src.result import META_KEYS
+from src.utils import canonical_url
+
+
+@pytest.fixture(autouse=True)
+def no_shared_cache(monkeypatch):
+    monkeypatch.delenv("FBIG_SHARED_CACHE", raising=False)
+
+
+@pytest.mark.parametrize("url", [
+    "https://M.facebook.com//x/posts/1/?utm_source=a&b=2&a=1#frag",
+    "http://www.facebook.com/x/posts/1?fbclid=z&a=1&b=2",
+    "https://mbasic.facebook.com/x/posts/1/?b=2&a=1&mibextid=q",
+])
+def test_canonical_url_merges_variants(url):
+    assert canonical_url(url) == "https://facebook.com/x/posts/1?a=1&b=2"
+
+
+def test_canonical_url_keeps_distinct_pages_apart():
+    assert canonical_url("https://www.instagram.com/p/X/") == "https://instagram.com/p/X"
+    assert canonical_url("https://facebook.com/x/posts/1") != canonical_url("https://facebook.com/x/posts/2")
+    assert canonical_url("https://facebook.com/story.php?story_fbid=1&id=2") != canonical_url(
+        "https://facebook.com/story.php?story_fbid=1&id=3"
+    )
+
+
+def test_bloom_filter_save_load_roundtrip(tmp_path):
+    bf = BloomFilter(capacity=1000, error_rate=1e-3)
+    urls = [f"https://facebook.com/p/{i}" for i in range(200)]
+    for u in urls:
+        bf.add(u)
+    path = str(tmp_path / "dead.bf")
+    bf.save(path)
+
+    loaded = BloomFilter.load(path)
+    assert (loaded.bits, loaded.hashes, loaded.count) == (bf.bits, bf.hashes, 200)
+    assert all(u in loaded for u in urls)
+    misses = sum(f"https://facebook.com/other/{i}" in loaded for i in range(1000))
+    assert misses <= 10
+
+
+def test_bloom_filter_rejects_bad_files(tmp_path):
+    bf = BloomFilter(capacity=100)
+    path = tmp_path / "dead.bf"
+    bf.save(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
+    path.write_bytes(b"XXXX" + b"\0" * 40)
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
+
+
+def test_negative_cache_ttl_per_reason(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(negative_cache.time, "time", lambda: now[0])
+    neg = NegativeCache({"fetch_failed": 10, "not_found": 100, "login_wall": 50})
+    neg.record("https://m.facebook.com/x/posts/1?fbclid=a", "fetch_failed")
+    # 同一網址的其他寫法也命中
+    reason, left = neg.check("https://www.facebook.com/x/posts/1/")
+    assert reason == "fetch_failed" and left == pytest.approx(10)
+
+    now[0] += 11
+    assert neg.check("https://facebook.com/x/posts/1") is None
+
+    neg.record("https://facebook.com/x/posts/1", "not_found")
+    now[0] += 99
+    assert neg.check("https://facebook.com/x/posts/1")[0] == "not_found"
+    now[0] += 2
+    assert neg.check("https://facebook.com/x/posts/1") is None
+
+
+def test_negative_cache_login_wall_ignored_when_logged_in():
+    neg = NegativeCache()
+    neg.record("https://facebook.com/x/posts/1", "login_wall")
+    assert neg.check("https://facebook.com/x/posts/1")[0] == "login_wall"
+    assert neg.check("https://facebook.com/x/posts/1", logged_in=True) is None
+
+
+def test_negative_cache_evicts_oldest():
+    neg = NegativeCache(max_entries=2)
+    for i in range(3):
+        neg.record(f"https://facebook.com/x/posts/{i}", "not_found")
+    assert neg.check("https://facebook.com/x/posts/0") is None
+    assert neg.check("https://facebook.com/x/posts/2")[0] == "not_found"
+
+
+def test_dead_reason():
+    assert dead_reason("<p>This content isn't available</p>", {"likes": None}) == "not_found"
+    assert dead_reason('<form id="login_form">', {}) == "login_wall"
+    assert dead_reason('<form id="login_form">', {"likes": 3}) is None
+    assert dead_reason("<p>ok</p>", {}) is None
+
+
+def test_dead_reason_ignores_markers_in_scripts():
+    bundle = '<script>{"i18n":{"gone":"This content isn\'t available"}}</script><style>/* 此內容目前無法顯示 */</style>'
+    assert dead_reason(f"<html><head>{bundle}</head><body><p>ok</p></body></html>", {}) is None
+    assert dead_reason("<html><head><title>This content isn&#039;t available</title></head></html>", {}) == "not_found"
+    assert dead_reason("<body><div>此內容目前無法顯示</div></body>", {}) == "not_found"
+
+
+def test_share_interstitial_is_resolved_before_judging(monkeypatch):
+    from src import inspect as inspect_mod
+
+    monkeypatch.setenv("FBIG_DISABLE_PLAYWRIGHT", "1")
+    monkeypatch.setenv("FBIG_VARIANTS", "0")
+    monkeypatch.delenv("FBIG_STORAGE_STATE", raising=False)
+    monkeypatch.delenv("FBIG_STORAGE_STATES", raising=False)
+    neg = NegativeCache()
+    monkeypatch.setattr(negative_cache, "_neg", neg)
+    final = "https://www.facebook.com/somepage/posts/777"
+    monkeypatch.setattr(inspect_mod, "resolve_link", lambda url, **kw: {"final_url": url, "hops": []})
+    monkeypatch.setattr(inspect_mod, "fetch_html", lambda url, **kw: "<body><p>This content isn't available</p></body>")
+    monkeypatch.setattr(inspect_mod, "_race_share_resolution", lambda *a, **kw: (final, "requests", []))
+    monkeypatch.setattr(inspect_mod, "_fetch_follow_up", lambda url, *a, **kw: "<body><p>post</p></body>")
+
+    share = "https://www.facebook.com/share/p/AbCdEf123/"
+    result = inspect_mod.inspect_url(share)
+    assert result["meta"]["share_resolved_by"] == "requests"
+    assert result["meta"]["final_permalink"] == final.replace("www.", "m.")
+    assert result["meta"]["dead_reason"] is None
+    assert neg.check(share) is None
+
+
+def test_cached_dead_result_has_fresh_shape(monkeypatch):
+    from src import inspect as inspect_mod
+
+    monkeypatch.setenv("FBIG_DISABLE_PLAYWRIGHT", "1")
+    monkeypatch.setenv("FBIG_VARIANTS", "0")
+    monkeypatch.delenv("FBIG_STORAGE_STATE", raising=False)
+    monkeypatch.delenv("FBIG_STORAGE_STATES", raising=False)
+    monkeypatch.setattr(negative_cache, "_neg", NegativeCache())
+    monkeypatch.setattr(inspect_mod, "fetch_html", lambda url, **kw: "<body>This content isn't available</body>")
+    monkeypatch.setattr(inspect_mod, "_fetch_follow_up", lambda *a, **kw: None)
+
+    url = "https://www.facebook.com/somepage/posts/123456"
+    fresh = inspect_mod.inspect_url(url)
+    cached = inspect_mod.inspect_url(url)
+    assert "negative_cache" not in fresh["meta"] and cached["meta"]["negative_cache"]["reason"] == "not_found"
+    for r in (fresh, cached):
+        assert (r["status"], r["error"], r["meta"]["dead_reason"]) == ("ok", None, "not_found")
+    assert set(fresh) == set(cached)
+    assert set(fresh["data"]) == set(cached["data"])
+    assert set(fresh["data"]["basic"]) == set(cached["data"]["basic"])
+    assert tuple(fresh["meta"])[:len(META_KEYS)] == tuple(cached["meta"])[:len(META_KEYS)] == META_KEYS
+    assert set(fresh["meta"]) == set(cached["meta"]) - {"negative_cache"}
+    assert fresh["基礎資訊"] == cached["基礎資訊"]
+
+
+def test_fetch_failed_meta_has_full_schema(monkeypatch):
+    from src import inspect as inspect_mod
+
+    monkeypatch.setenv("FBIG_DISABLE_PLAYWRIGHT", "1")
+    monkeypatch.setenv("FBIG_VARIANTS", "0")
+    monkeypatch.delenv("FBIG_STORAGE_STATE", raising=False)
+    monkeypatch.delenv("FBIG_STORAGE_STATES", raising=False)
+    monkeypatch.setattr(negative_cache, "_neg", NegativeCache())
+    monkeypatch.setattr(inspect_mod, "fetch_html", lambda url, **kw: None)
+
+    url = "https://www.facebook.com/somepage/posts/654321"
+    fresh, cached = inspect_mod.inspect_url(url), inspect_mod.inspect_url(url)
+    for r in (fresh, cached):
+        assert (r["status"], r["error"], r["meta"]["dead_reason"]) == ("error", "fetch_failed", "fetch_failed")
+        assert tuple(r["meta"])[:len(META_KEYS)] == META_KEYS
@@ -0,0 +1,50 @@
+from src.og import OG_FIELDS, HeadMetaParser, HeadMetaStream, extract_head_meta
+
+HEAD = (
+    '<html><head><title>t</title>'
+    '<meta property="og:title" content=" First &amp; best ">'
+    '<meta property="og:title" content="second">'
+    '<meta name="twitter:description" content="tw desc">'
+    '<meta name="twitter:image" content="https://img/1.jpg">'
+    '<link rel="alternate canonical" href="https://www.facebook.com/p/1">'
+    '</head>'
+)
+
+
+def test_extract_fields_and_fallbacks():
+    meta = extract_head_meta(HEAD + "<body></body></html>")
+    assert set(OG_FIELDS) <= set(meta)
+    assert meta["og:title"] == "First & best"  # 第一個為準、實體已解碼、去空白
+    assert meta["og:description"] == "tw desc"
+    assert meta["og:image"] == "https://img/1.jpg"
+    assert meta["og:url"] == meta["canonical"] == "https://www.facebook.com/p/1"
+    assert meta["og:site_name"] is None
+
+
+def test_stops_at_head_end_or_body():
+    after_head = '<html><head></head><meta property="og:title" content="late">'
+    assert extract_head_meta(after_head)["og:title"] is None
+    no_head_end = '<html><head><meta property="og:url" content="u"><body><meta property="og:title" content="x">'
+    meta = extract_head_meta(no_head_end)
+    assert meta["og:url"] == "u" and meta["og:title"] is None
+
+    parser = HeadMetaParser()
+    assert parser.feed("<head>") is False
+    assert parser.feed("</head>") is True and parser.feed("<meta property='og:title' content='x'>") is True
+    assert parser.meta == {}
+
+
+def test_stream_returns_once_when_head_completes():
+    stream = HeadMetaStream("utf-8")
+    chunks = [b"<html><head><meta property='og:title' content='", "貼文".encode()[:4],
+              "貼文".encode()[4:] + b"'></he", b"ad><body>", b"rest"]
+    results = [stream.feed(c) for c in chunks]
+    assert results[:3] == [None, None, None]
+    assert results[3]["og:title"] == "貼文"  # 多位元組字元跨 chunk 仍正確解碼
+    assert results[4] is None and stream.done
+
+
+def test_iterable_source_and_unknown_encoding():
+    meta = extract_head_meta(iter([b"<head><meta property='og:site_name' content='FB'>", b"</head>"]), "x-unknown")
+    assert meta["og:site_name"] == "FB"
+    assert extract_head_meta(None) == dict.fromkeys(OG_FIELDS)
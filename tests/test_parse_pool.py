@@ -0,0 +1,43 @@
+import pytest
+
+from src import parse_pool
+from src.parse_pool import ParsePool, parse_basic
+
+# 大量數字文字讓 parse_fb_post_basic 跑上數百毫秒，遠超過測試用的逾時
+SLOW_HTML = "<html><body>" + "<p>12 likes 3 shares</p>" * 40000 + "</body></html>"
+
+
+@pytest.fixture
+def pool():
+    p = ParsePool(1, timeout=10)
+    yield p
+    p.close()
+
+
+def test_run_returns_worker_result(pool):
+    basic = pool.run("parse_fb_post_basic", "<html><body>12 likes</body></html>")
+    assert basic["likes"] == 12
+
+
+def test_timeout_recycles_slot(pool):
+    pool.run("parse_fb_post_basic", "<html></html>")  # 先啟動 worker，逾時只計執行時間
+    first = pool._slots[0]
+    with pytest.raises(TimeoutError):
+        pool.run("parse_fb_post_basic", SLOW_HTML, timeout=0.01)
+    assert pool._slots[0] is None
+    first.process.join(2)
+    assert not first.process.is_alive()
+    # slot 重建後仍可使用
+    assert pool.run("parse_fb_post_basic", "<html><body>5 likes</body></html>")["likes"] == 5
+
+
+def test_parse_basic_timeout_returns_blank(monkeypatch):
+    monkeypatch.setenv("FBIG_PARSE_PROCESSES", "1")
+    monkeypatch.setenv("FBIG_PARSE_TIMEOUT", "0.01")
+    monkeypatch.setattr(parse_pool, "_POOL", None)
+    try:
+        basic = parse_basic("fb_post", SLOW_HTML)
+    finally:
+        parse_pool._close_pool()
+        parse_pool._POOL = None
+    assert basic["note"] == "parse_timeout" and basic["likes"] is None
@@ -0,0 +1,76 @@
+import pytest
+
+from src import provenance
+from src.parser import parse_fb_post_basic
+from src.provenance import StrategyStats, observe_basic, run_strategies, strategy_order
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.delenv("FBIG_STRATEGY_ORDER", raising=False)
+    monkeypatch.delenv("FBIG_DISABLED_STRATEGIES", raising=False)
+    monkeypatch.delenv("FBIG_PRUNE_STRATEGIES", raising=False)
+    stats = StrategyStats()
+    monkeypatch.setattr(provenance, "_stats", stats)
+    return stats
+
+
+def test_first_non_none_wins_and_records_tried():
+    prov = {}
+    value = run_strategies("ex", "likes", [
+        ("a", lambda: None),
+        ("b", lambda: 1 / 0),
+        ("c", lambda: 7),
+        ("d", lambda: 9),
+    ], prov)
+    assert value == 7
+    assert prov["likes"] == {"by": "c", "tried": ["a", "b", "c"]}
+
+
+def test_observe_basic_counts_tries_and_hits(fresh_stats):
+    for winner in ("b", "b", None):
+        prov = {}
+        run_strategies("ex", "likes", [("a", lambda: None), ("b", lambda w=winner: 1 if w else None)], prov)
+        basic = observe_basic("ex", {"likes": None, "provenance": prov})
+    assert basic["provenance"] == {"likes": None}
+    assert fresh_stats.get("ex", "likes", "a") == {"tries": 3, "hits": 0}
+    assert fresh_stats.get("ex", "likes", "b") == {"tries": 3, "hits": 2}
+
+
+def test_auto_order_moves_only_sampled_strategies(fresh_stats, monkeypatch):
+    monkeypatch.setenv("FBIG_STRATEGY_ORDER", "auto")
+    assert strategy_order("ex", "f", ["a", "b", "c"]) == ["a", "b", "c"]
+    for _ in range(provenance.MIN_ORDER_SAMPLES):
+        fresh_stats.observe("ex", {"f": {"by": "c", "tried": ["a", "c"]}})
+    # a、c 都有統計：c 命中率較高，換到 a 的位置；b 沒有統計，留在原位
+    assert strategy_order("ex", "f", ["a", "b", "c"]) == ["c", "b", "a"]
+
+
+def test_disabled_strategy_is_skipped(monkeypatch):
+    monkeypatch.setenv("FBIG_DISABLED_STRATEGIES", "ex.*.a")
+    prov = {}
+    assert run_strategies("ex", "f", [("a", lambda: 1), ("b", lambda: 2)], prov) == 2
+    assert prov["f"]["tried"] == ["b"]
+
+
+def test_fb_post_script_json_only_when_text_finds_nothing():
+    with_text = parse_fb_post_basic('<html><body>12 likes<script>{"share_count": 5}</script></body></html>')
+    assert with_text["likes"] == 12
+    assert with_text["provenance"]["likes"] == {"by": "text", "tried": ["text"]}
+    # 純文字有找到讚數時不掃 script JSON；分享數由整份 HTML 的 raw regex 取得
+    assert with_text["provenance"]["shares"] == {"by": "raw_json", "tried": ["text", "aria_label", "raw_json"]}
+
+    no_text = parse_fb_post_basic('<html><body>none<script>{"share_count": 5}</script></body></html>')
+    assert no_text["shares"] == 5
+    assert no_text["provenance"]["shares"] == {"by": "script_json", "tried": ["text", "script_json"]}
+    assert no_text["source_hint"] == "json"
+
+
+def test_fb_post_source_hint_matches_baseline():
+    # 讚數 / 分享數有值時一律為 json（匯出的「數據來源」欄沿用原本的值），即使由純文字找到
+    assert parse_fb_post_basic("<html><body>12 likes</body></html>")["source_hint"] == "json"
+    assert parse_fb_post_basic("<html><body>3 shares</body></html>")["source_hint"] == "json"
+    # 只有純文字的追蹤數時維持 text
+    only_followers = parse_fb_post_basic("<html><body>5,000 followers</body></html>")
+    assert only_followers["page_followers"] == 5000 and only_followers["source_hint"] == "text"
+    assert parse_fb_post_basic("<html><body>nothing</body></html>")["source_hint"] == "text"
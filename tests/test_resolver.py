@@ -0,0 +1,111 @@
+import json
+from urllib.parse import quote
+
+import pytest
+
+from src import resolver
+from src.resolver import HopCache, follow_redirects, resolve_link, unwrap_url
+
+TARGET = "https://www.facebook.com/somepage/posts/1?a=1&b=2"
+
+
+@pytest.mark.parametrize("wrapped", [
+    f"https://l.facebook.com/l.php?u={quote(TARGET, safe='')}&h=AT0",
+    f"https://lm.facebook.com/l.php?u={quote(TARGET, safe='')}",
+    f"https://www.facebook.com/flx/warn/?u={quote(TARGET, safe='')}",
+    f"https://l.instagram.com/?u={quote(TARGET, safe='')}&e=x",
+    f"https://www.instagram.com/l/{quote(TARGET, safe='')}",
+])
+def test_unwrap_url(wrapped):
+    assert unwrap_url(wrapped) == TARGET
+
+
+def test_unwrap_nested_and_passthrough():
+    inner = f"https://l.facebook.com/l.php?u={quote(TARGET, safe='')}"
+    assert unwrap_url(f"https://lm.facebook.com/l.php?u={quote(inner, safe='')}") == TARGET
+    assert unwrap_url(TARGET) == TARGET
+    # 不是 http(s) 目標時不拆
+    bad = "https://l.facebook.com/l.php?u=javascript%3Aalert(1)"
+    assert unwrap_url(bad) == bad
+
+
+def test_resolve_link_unwraps_locally_without_network(monkeypatch):
+    monkeypatch.delenv("FBIG_RESOLVE_CACHE", raising=False)
+    monkeypatch.setattr(resolver, "follow_redirects", lambda *a, **kw: pytest.fail("network used"))
+    out = resolve_link(f"https://l.facebook.com/l.php?u={quote(TARGET, safe='')}")
+    assert out["final_url"] == TARGET and out["resolved_with"] == "local"
+    assert [h["via"] for h in out["hops"]] == ["unwrap"]
+    assert resolve_link(TARGET)["resolved_with"] == "none"
+
+
+class _Resp:
+    def __init__(self, status, location=None, body=b"", ctype="text/html"):
+        self.status_code = status
+        self.headers = {"Content-Type": ctype}
+        if location:
+            self.headers["Location"] = location
+        self.encoding = "utf-8"
+        self._body = body
+
+    def iter_content(self, n):
+        for i in range(0, len(self._body), n):
+            yield self._body[i:i + n]
+
+    def close(self):
+        pass
+
+
+class _Session:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, **kw):
+        assert kw["allow_redirects"] is False
+        self.requested.append(url)
+        return self.pages[url]
+
+
+def test_follow_redirects_reads_headers_and_sniffs(monkeypatch):
+    session = _Session({
+        "https://bit.ly/x": _Resp(301, "https://t.co/y"),
+        "https://t.co/y": _Resp(200, body=b'<html><head><meta http-equiv="refresh" content="0;URL=https://example.com/z"></head>'),
+        "https://example.com/z": _Resp(200, body=b"<script>location.replace(\"https:\\/\\/www.facebook.com\\/p\\/1\")</script>"),
+    })
+    monkeypatch.setattr(resolver, "_shared_session", lambda: session)
+    res = follow_redirects("https://bit.ly/x", stop_at=lambda u: "facebook.com" in u)
+    assert res["final_url"] == "https://www.facebook.com/p/1"
+    assert [h["via"] for h in res["hops"]] == ["http", "meta_refresh", "js"]
+    # 停在 FB 網址，不再請求它
+    assert "https://www.facebook.com/p/1" not in session.requested
+
+
+def test_hop_cache_lru_and_ttl(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(resolver.time, "time", lambda: now[0])
+    cache = HopCache(str(tmp_path / "hops.json"), ttl=100, max_entries=2, flush_interval=1e9, flush_every=1000)
+    cache.put("a", "A", [])
+    cache.put("b", "B", [])
+    assert cache.get("a")["final_url"] == "A"  # a 變成最近使用
+    cache.put("c", "C", [])
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+
+    now[0] += 100
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_hop_cache_persists_and_prunes_on_load(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(resolver.time, "time", lambda: now[0])
+    path = tmp_path / "hops.json"
+    cache = HopCache(str(path), ttl=100, flush_interval=1e9, flush_every=1000)
+    cache.put("old", "OLD", [])
+    now[0] += 60
+    cache.put("new", "NEW", [{"via": "http"}])
+    cache.flush()
+    assert set(json.loads(path.read_text(encoding="utf-8"))) == {"old", "new"}
+
+    now[0] += 50
+    reloaded = HopCache(str(path), ttl=100)
+    assert reloaded.get("old") is None
+    assert reloaded.get("new") == {"final_url": "NEW", "hops": [{"via": "http"}], "ts": 1_000_060}
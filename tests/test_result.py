@@ -0,0 +1,53 @@
+import json
+
+from src.og import OG_FIELDS
+from src.parser import _blank_basic
+from src.result import META_KEYS, InspectResult, build_meta, format_basic_zh
+
+
+def _ok_result():
+    basic = dict(_blank_basic(), likes=12, shares=None, page_followers=3400, source_hint="json")
+    basic["provenance"] = {"likes": {"by": "text", "tried": ["text"]}}
+    basic["extra_flag"] = None  # BASIC_KEYS 以外、值為 None 的欄位也要保留
+    zh = format_basic_zh("fb_post", basic)
+    data = dict.fromkeys(OG_FIELDS)
+    data["og:title"] = "title"
+    data.update(basic=basic, 基礎資訊=zh, kind="post", owner_url_hint="https://facebook.com/x")
+    return {
+        "url": "https://www.facebook.com/x/posts/1",
+        "status": "ok",
+        "type": "fb_post",
+        "data": data,
+        "基礎資訊": zh,
+        "meta": build_meta(duration_ms=321, fetched_with="requests", stages_ms={"fetch": 300}),
+        "error": None,
+    }
+
+
+def test_round_trip_ok_result():
+    result = _ok_result()
+    assert InspectResult.from_dict(result).to_dict() == result
+    assert json.loads(InspectResult.from_dict(result).to_json()) == result
+
+
+def test_round_trip_without_meta_keeps_slots():
+    result = _ok_result()
+    compact = InspectResult.from_dict(result, keep_meta=False)
+    assert compact.meta is None
+    assert compact.to_dict()["meta"] == build_meta(duration_ms=321, fetched_with="requests")
+    assert tuple(compact.to_dict()["meta"]) == META_KEYS
+    assert compact.to_dict()["data"] == result["data"]
+
+
+def test_round_trip_error_and_nonstandard_basic():
+    failed = {
+        "url": "https://www.facebook.com/x/posts/2", "status": "error", "type": "fb_post",
+        "data": None, "meta": build_meta(duration_ms=5, dead_reason="fetch_failed"), "error": "fetch_failed",
+    }
+    assert InspectResult.from_dict(failed).to_dict() == failed
+
+    odd = InspectResult.from_dict({
+        "status": "ok", "type": "fb_page", "data": {"basic": {"error": "boom"}}, "meta": {}, "error": None,
+    })
+    assert odd.values is None
+    assert odd.to_dict()["data"]["basic"] == {"error": "boom"}
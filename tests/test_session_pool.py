@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from src import session_pool
+from src.session_pool import SessionPool
+
+
+def _pool(n=3, **kw):
+    kw.setdefault("min_interval", 0)
+    return SessionPool([f"/tmp/acct{i}.json" for i in range(n)], **kw)
+
+
+def test_round_robin_cycles_accounts():
+    pool = _pool()
+    picked = []
+    for _ in range(4):
+        acct = pool.acquire()
+        picked.append(acct.name)
+        pool.release(acct, "ok")
+    assert picked == ["acct0", "acct1", "acct2", "acct0"]
+
+
+def test_least_load_prefers_idle_healthy_account():
+    pool = _pool(strategy="least_load")
+    busy = pool.acquire()
+    assert busy.name == "acct0"
+    pool.accounts[1].health = 0.5
+    # acct0 在途；acct1、acct2 都閒置，健康度高的 acct2 優先
+    assert pool.acquire().name == "acct2"
+
+
+def test_login_wall_quarantines_with_doubling_backoff():
+    pool = _pool(n=2, quarantine_s=100, max_quarantine_s=300)
+    acct = pool.accounts[0]
+    expected = [100, 200, 300, 300]
+    for backoff in expected:
+        pool.acquire()
+        pool.release(acct, "login_wall")
+        assert acct.quarantined_until - time.time() == pytest.approx(backoff, abs=1)
+    assert acct.login_walls == 4 and acct.health == pytest.approx(0.5 ** 4)
+    # 被隔離的帳號不再被選到
+    assert all(pool.acquire().name == "acct1" for _ in range(3))
+    pool.release(acct, "ok")
+    assert acct.strikes == 0
+
+
+def test_all_quarantined_returns_none():
+    pool = _pool(n=1)
+    pool.release(pool.acquire(), "login_wall")
+    assert pool.acquire() is None
+
+
+def test_rate_limit_spaces_requests_per_account():
+    pool = _pool(n=1, min_interval=0.2)
+    t0 = time.time()
+    pool.acquire()
+    pool.acquire()
+    assert time.time() - t0 >= 0.19
+
+
+def test_browser_fallback_keeps_account_without_waiting(monkeypatch):
+    pool = _pool(n=2, min_interval=2.0)
+    used = []
+    monkeypatch.setattr(session_pool, "fetch_html", lambda url, storage_state=None, info=None: None)
+    monkeypatch.setattr(pool, "_fetch_browser", lambda acct, url: used.append(acct.name) or ("<html>ok</html>", url))
+
+    t0 = time.time()
+    assert pool.fetch("https://facebook.com/x") == ("<html>ok</html>", "playwright_login")
+    assert used == ["acct0"] and time.time() - t0 < 1
+
+    # 分開呼叫時以 info["account"] 延續同一個帳號
+    info = {}
+    assert pool.fetch("https://facebook.com/y", browser=False, info=info) == (None, None)
+    t0 = time.time()
+    pool.fetch("https://facebook.com/y", http=False, account=info["account"])
+    assert used[-1] == "acct1" and time.time() - t0 < 1
+
+
+def test_browser_fallback_switches_account_after_login_wall(monkeypatch):
+    pool = _pool(n=2)
+
+    def walled(url, storage_state=None, info=None):
+        info["login_wall"] = True
+
+    used = []
+    monkeypatch.setattr(session_pool, "fetch_html", walled)
+    monkeypatch.setattr(pool, "_fetch_browser", lambda acct, url: used.append(acct.name) or ("<html>ok</html>", url))
+    pool.fetch("https://facebook.com/x")
+    assert used == ["acct1"] and not pool.accounts[0].available(time.time())
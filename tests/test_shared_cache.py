@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from src import shared_cache
+from src.shared_cache import SharedCache
+
+pytestmark = pytest.mark.skipif(shared_cache.fcntl is None, reason="需要 fcntl")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = SharedCache(str(tmp_path / "cache"), size_mb=1)
+    yield c
+    c.close()
+
+
+def _same_set_keys(c, n):
+    """n 個落在同一個 set 的 key。"""
+    target = c._hash("owner", "k0") % c.nsets
+    keys, i = [], 0
+    while len(keys) < n:
+        k = f"k{i}"
+        if c._hash("owner", k) % c.nsets == target:
+            keys.append(k)
+        i += 1
+    return keys
+
+
+def _slots_with(c, key):
+    h = c._hash("owner", key)
+    base = shared_cache.HEADER_SIZE + (h % c.nsets) * c._set_bytes
+    return [w for w in range(c.ways) if shared_cache.SLOT_HEAD.unpack_from(c._mm, base + w * c.slot_size)[0] == h]
+
+
+def test_put_replaces_in_place(cache):
+    keys = _same_set_keys(cache, 3)
+    for k in keys:
+        cache.put("owner", k, {"v": 1})
+    # 讓前面的 slot 過期後再覆寫最後一個 key：仍應寫回原本的 slot，而不是前面的過期 slot
+    cache.put("owner", keys[0], {"v": 0}, ttl=-1)
+    cache.put("owner", keys[2], {"v": 2})
+    assert _slots_with(cache, keys[2]) == [2]
+    assert cache.get("owner", keys[2]) == {"v": 2}
+    assert cache.stats()["evictions"] == 0
+
+
+def test_get_skips_expired_duplicate(cache):
+    key = _same_set_keys(cache, 1)[0]
+    h = cache._hash("owner", key)
+    base = shared_cache.HEADER_SIZE + (h % cache.nsets) * cache._set_bytes
+    # 模擬舊版檔案：同 key 在 way 0 留有過期副本，way 1 是有效值
+    payload = b'{"v":1}'
+    cache._mm[base + shared_cache.SLOT_HEAD.size: base + shared_cache.SLOT_HEAD.size + len(payload)] = payload
+    shared_cache.SLOT_HEAD.pack_into(cache._mm, base, h, time.time() - 1, len(payload))
+    off1 = base + cache.slot_size
+    payload = b'{"v":2}'
+    cache._mm[off1 + shared_cache.SLOT_HEAD.size: off1 + shared_cache.SLOT_HEAD.size + len(payload)] = payload
+    shared_cache.SLOT_HEAD.pack_into(cache._mm, off1, h, time.time() + 60, len(payload))
+    assert cache.get("owner", key) == {"v": 2}
+
+
+def test_full_set_evicts_soonest_expiring(cache):
+    keys = _same_set_keys(cache, cache.ways + 1)
+    for i, k in enumerate(keys[:cache.ways]):
+        cache.put("owner", k, {"i": i}, ttl=100 + i)
+    cache.put("owner", keys[-1], {"i": "new"})
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("owner", keys[0]) is None
+    assert cache.get("owner", keys[1]) == {"i": 1}
+    assert cache.get("owner", keys[-1]) == {"i": "new"}
+
+
+def test_too_large_payload_is_rejected(cache):
+    assert cache.put("owner", "big", {"x": "a" * cache.slot_size}) is False
+    assert cache.get("owner", "big") is None
+    assert cache.stats()["too_large"] == 1
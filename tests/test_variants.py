@@ -0,0 +1,60 @@
+import pytest
+
+from src import fetcher, variants
+from src.variants import PRIOR_BYTES, PRUNE_AFTER, VariantStats, fetch_variants, ranked_variants
+
+POST = "https://www.facebook.com/somepage/posts/1"
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    monkeypatch.delenv("FBIG_VARIANT_MAX_TRIES", raising=False)
+    st = VariantStats()
+    monkeypatch.setattr(variants, "_stats", st)
+    return st
+
+
+def test_declared_order_without_stats(stats):
+    assert [name for name, _ in ranked_variants("fb_post", POST)] == ["m", "mbasic", "www"]
+    assert ranked_variants("fb_post", POST)[0][1] == "https://m.facebook.com/somepage/posts/1"
+
+
+def test_cheaper_successful_variant_moves_first(stats):
+    for _ in range(5):
+        stats.record("fb_post", "m", False, PRIOR_BYTES)
+        stats.record("fb_post", "www", True, PRIOR_BYTES // 4)
+    assert [name for name, _ in ranked_variants("fb_post", POST)] == ["www", "mbasic", "m"]
+
+
+def test_never_hitting_variant_is_pruned(stats):
+    for _ in range(PRUNE_AFTER):
+        stats.record("fb_post", "m", False, 1000)
+    assert "m" not in [name for name, _ in ranked_variants("fb_post", POST)]
+
+
+def test_duplicate_urls_are_collapsed(stats):
+    # 非 FB 網域套 _with_host 不變，m / mbasic / www 收斂成同一個網址
+    names = [name for name, _ in ranked_variants("fb_owner", "https://m.facebook.com/profile.php?id=1")]
+    assert names == ["about", "followers"]
+    urls = [u for _, u in ranked_variants("fb_post", "https://example.com/x")]
+    assert urls == ["https://example.com/x"]
+
+
+def test_later_variants_need_recorded_hits(stats, monkeypatch):
+    def fake_fetch(url, info=None, on_head=None, **kw):
+        return "<html><body>12 likes</body></html>" if "mbasic" in url else "<html><body></body></html>"
+
+    monkeypatch.setattr(fetcher, "fetch_html", fake_fetch)
+    # 排序：m（便宜但沒命中過）、www（沒有統計）、mbasic（命中過）
+    stats.record("fb_post", "m", False, PRIOR_BYTES // 10)
+    stats.record("fb_post", "mbasic", True, PRIOR_BYTES)
+    assert [name for name, _ in ranked_variants("fb_post", POST)] == ["m", "www", "mbasic"]
+
+    html, basic, used, report = fetch_variants(POST, "fb_post")
+    # 預設最多 2 個，但 www 從未命中，只抓第一個
+    assert [r["variant"] for r in report] == ["m"] and basic["likes"] is None
+    assert used == "https://m.facebook.com/somepage/posts/1"
+
+    html, basic, used, report = fetch_variants(POST, "fb_post", max_tries=3)
+    assert [r["variant"] for r in report] == ["m", "mbasic"]
+    assert basic["likes"] == 12 and used == "https://mbasic.facebook.com/somepage/posts/1"